@@ -0,0 +1,15 @@
+"""
+Performance benchmarks for the rules, the environments and the HTTP API.
+
+Usage (from the server directory):
+    python -m benchmarks run --output baseline.json
+    python -m benchmarks run --suite rules env --compare baseline.json --threshold 0.1
+    python -m benchmarks compare baseline.json current.json
+
+Every suite returns `Result`s; `run` prints them and can write them as JSON,
+and a comparison flags every benchmark that got worse than the threshold
+(exit status 1), so a rules or env change comes with its measured impact.
+
+The `bench_*.py` scripts next to this package are standalone, more detailed
+comparisons for individual optimizations.
+"""
@@ -0,0 +1,57 @@
+import argparse
+import importlib
+import sys
+
+from benchmarks import harness
+
+SUITES = ['rules', 'env', 'api', 'startup']
+
+
+def run(args) -> int:
+    results = []
+    for suite in args.suite:
+        module = importlib.import_module(f"benchmarks.{suite}")
+        print(f"running {suite}...", file=sys.stderr)
+        results.extend(module.run(quick=args.quick))
+    print(harness.report(results))
+    if args.output:
+        harness.save(args.output, results)
+    if args.compare:
+        changes = harness.compare(harness.load(args.compare), {result.name: result for result in results},
+                                  args.threshold)
+        print()
+        print(harness.report_changes(changes, args.threshold))
+        return 1 if any(change.regression for change in changes) else 0
+    return 0
+
+
+def compare(args) -> int:
+    changes = harness.compare(harness.load(args.baseline), harness.load(args.current), args.threshold)
+    print(harness.report_changes(changes, args.threshold))
+    return 1 if any(change.regression for change in changes) else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Mahjong performance benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run benchmark suites")
+    run_parser.add_argument("--suite", nargs="+", choices=SUITES, default=SUITES)
+    run_parser.add_argument("--quick", action="store_true", help="smaller corpora and fewer repeats")
+    run_parser.add_argument("--output", help="write results to this JSON file")
+    run_parser.add_argument("--compare", metavar="BASELINE", help="compare against a saved JSON result file")
+    run_parser.add_argument("--threshold", type=float, default=0.1, help="relative slowdown counted as a regression")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="compare two saved result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+`/api/users/login` and `/api/users/me` latency through an in-process ASGI client.
+
+Requests go through the whole FastAPI stack (routing, validation,
+dependencies, password hashing, JWT) over httpx's ASGI transport, without a
+socket or server process. The app's database dependency is pointed at a
+throwaway SQLite file so the benchmark never touches real data.
+"""
+import asyncio
+import os
+import tempfile
+import time
+from typing import List
+
+import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from mahjong.app.main import app
+from mahjong.app.api.models.user import Base
+from mahjong.app.config.database import create_tables, get_db
+
+from benchmarks.harness import Result, latency
+
+USER = {"username": "bench", "email": "bench@example.com", "password": "bench-password"}
+
+
+async def _measure(engine, logins: int, requests: int) -> List[Result]:
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(create_tables, Base.metadata)
+        return await _requests(logins, requests)
+    finally:
+        # The engine's connections belong to this event loop
+        await engine.dispose()
+
+
+async def _requests(logins: int, requests: int) -> List[Result]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.post("/api/users/register", json=USER)
+        response.raise_for_status()
+        credentials = {"username": USER["username"], "password": USER["password"]}
+
+        samples = []
+        for _ in range(logins):
+            start = time.perf_counter()
+            response = await client.post("/api/users/login", json=credentials)
+            samples.append(time.perf_counter() - start)
+            response.raise_for_status()
+        login = latency("api.users.login", samples)
+
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        await client.get("/api/users/me", headers=headers)
+        samples = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = await client.get("/api/users/me", headers=headers)
+            samples.append(time.perf_counter() - start)
+            response.raise_for_status()
+        me = latency("api.users.me", samples)
+    return [login, me]
+
+
+def run(quick: bool = False) -> List[Result]:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.db')
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        session = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+
+        async def bench_db():
+            async with session() as db:
+                yield db
+
+        app.dependency_overrides[get_db] = bench_db
+        try:
+            return asyncio.run(_measure(engine, logins=5 if quick else 30, requests=50 if quick else 500))
+        finally:
+            app.dependency_overrides.pop(get_db, None)
@@ -0,0 +1,76 @@
+"""
+Cold-start import time of the entry points workers load.
+
+Each target is imported in a fresh interpreter under `python -X importtime`;
+the cumulative time of the target itself is reported (interpreter start-up
+is excluded), as the median over `--repeat` runs, followed by the modules
+spending the most time of their own. `--budget MODULE=MS` fails the run
+(exit status 1) when a target's median exceeds its budget, so CI can guard
+the start-up of rollout workers and uvicorn workers.
+
+Usage:
+    python benchmarks/bench_importtime.py --repeat 5 --top 10
+    python benchmarks/bench_importtime.py --budget mahjong.core=50 --budget mahjong.ai.rollout=400
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Library imports (`mahjong.core.types`), a rollout worker and a uvicorn worker
+TARGETS = ['mahjong.core.types', 'mahjong.core', 'mahjong.ai.rollout', 'mahjong.app.main']
+
+
+def import_times(module: str) -> Dict[str, Tuple[float, float]]:
+    """
+    (self, cumulative) milliseconds of every module loaded by `import module`
+    in a fresh interpreter; what `site` imported before it is left out.
+    """
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)  # Cached bytecode, as in a deployed worker
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               capture_output=True, text=True, env=env, check=True)
+    times: Dict[str, Tuple[float, float]] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        # Children are printed before their parent; a top-level module other than the target ends a subtree
+        if not name.startswith("  ") and name.strip() != module:
+            times.clear()
+            continue
+        times[name.strip()] = (int(own) / 1000, int(cumulative) / 1000)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", nargs="+", default=TARGETS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="slowest modules listed per target")
+    parser.add_argument("--budget", action="append", default=[], metavar="MODULE=MS")
+    args = parser.parse_args()
+    budgets = {module: float(ms) for module, ms in (budget.split("=") for budget in args.budget)}
+
+    failures: List[str] = []
+    for module in dict.fromkeys(args.targets + list(budgets)):
+        runs = [import_times(module) for _ in range(args.repeat)]
+        median = float(np.median([times[module][1] for times in runs]))
+        budget = budgets.get(module)
+        status = "" if budget is None else f" (budget {budget:.0f} ms{', EXCEEDED' if median > budget else ''})"
+        print(f"{module}: {median:.1f} ms{status}")
+        slowest = sorted(runs[-1].items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+        for name, (own, cumulative) in slowest:
+            print(f"    {own:>8.1f} self {cumulative:>8.1f} cumulative  {name}")
+        if budget is not None and median > budget:
+            failures.append(module)
+    if failures:
+        print(f"over budget: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Bot decisions per second with and without micro-batching.
+
+`--tables` simulated tables share one event loop; every step each table asks
+for the current player's action and applies it. "unbatched" runs the policy
+once per request on the event loop; "batched" goes through an
+`InferenceServer` for each `--max-batch`, waiting at most `--max-wait-us`.
+The random linear policy is nearly free next to encoding and stepping;
+`--hidden` swaps in a NumPy MLP to stand in for a real model, whose per-call
+overhead is what batching amortizes.
+
+Usage:
+    python benchmarks/bench_inference.py --tables 256 --seconds 5 --max-batch 1 16 64 256 --hidden 1024
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from mahjong.core.env import MahjongEnv
+from mahjong.ai.policy import NUM_ACTIONS, load_policy, masked_argmax
+from mahjong.app.inference import InferenceServer
+
+
+def mlp_policy(num_features: int, hidden: int, layers: int = 2, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    sizes = [num_features] + [hidden] * layers + [NUM_ACTIONS]
+    weights = [rng.normal(0, 0.05, size=shape).astype(np.float32) for shape in zip(sizes, sizes[1:])]
+
+    def policy(features):
+        x = features.reshape(len(features), -1).astype(np.float32)
+        for w in weights[:-1]:
+            x = np.maximum(x @ w, 0)
+        return x @ weights[-1]
+    return policy
+
+
+async def play(envs, decide, seconds: float) -> int:
+    deadline = time.perf_counter() + seconds
+    steps = 0
+
+    async def table(env):
+        nonlocal steps
+        while time.perf_counter() < deadline:
+            _, _, terminated, truncated, _ = env.step(await decide(env))
+            steps += 1
+            if terminated or truncated:
+                env.reset()
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*(table(env) for env in envs))
+    return steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables", type=int, default=256)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--max-batch", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--max-wait-us", type=float, default=2000)
+    parser.add_argument("--model", default="", help="an .onnx model or .npz linear weights (random by default)")
+    parser.add_argument("--hidden", type=int, default=0, help="use a random NumPy MLP with this hidden width")
+    args = parser.parse_args()
+
+    server = InferenceServer(max_batch=1)
+    if args.hidden:
+        policy = mlp_policy(server.encoder.num_channels * server.encoder.shape[1], args.hidden)
+    else:
+        policy = load_policy(args.model, server.encoder)
+    envs = []
+    for seed in range(args.tables):
+        env = MahjongEnv()
+        env.reset(seed=seed)
+        envs.append(env)
+
+    async def unbatched(env):
+        features = server.encoder.encode(env)[None]
+        return int(masked_argmax(policy(features), env.action_mask[None])[0])
+
+    steps = asyncio.run(play(envs, unbatched, args.seconds))
+    print(f"{'mode':<16} {'decisions/s':>12} {'batch':>7} {'batch ms p50':>13} {'wait ms p99':>12}")
+    print(f"{'unbatched':<16} {steps / args.seconds:>12,.0f} {1:>7} {'':>13} {'':>12}")
+
+    for max_batch in args.max_batch:
+        server = InferenceServer(policy, max_batch=max_batch, max_wait_us=args.max_wait_us)
+
+        async def run():
+            try:
+                return await play(envs, server.act, args.seconds)
+            finally:
+                await server.stop()
+
+        steps = asyncio.run(run())
+        metrics = server.metrics()
+        print(f"{f'batched/{max_batch}':<16} {steps / args.seconds:>12,.0f} {metrics['batch_size_mean']:>7.1f} "
+              f"{metrics['batch_ms_p50']:>13.3f} {metrics['wait_ms_p99']:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Concurrent /api/users/login and /api/users/me load through an in-process ASGI client.
+
+The database is a throwaway SQLite file selected with MAHJONG_DATABASE_URL
+before the app is imported.
+
+The burst phase fires --burst logins at once, as at a tournament start, while
+another user keeps calling /me and logging in. With the bounded hashing
+pool the excess logins get 503 + Retry-After quickly instead of queueing,
+and the other user's latency stays close to the idle numbers.
+
+Usage:
+    python benchmarks/bench_login.py --concurrency 1 8 32 --requests 200 --burst 200
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import numpy as np
+
+DIRECTORY = tempfile.mkdtemp(prefix="mahjong-bench-")
+os.environ.setdefault("MAHJONG_DATABASE_URL", f"sqlite+aiosqlite:///{os.path.join(DIRECTORY, 'bench.db')}")
+
+import httpx  # noqa: E402
+
+from mahjong.app.main import app  # noqa: E402
+
+
+async def measure(client: httpx.AsyncClient, requests, concurrency: int):
+    """Run the request factories with at most `concurrency` in flight; returns (req/s, latencies)"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(request):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await request()
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(request) for request in requests))
+    return len(requests) / (time.perf_counter() - start), np.asarray(latencies)
+
+
+async def run(args):
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            users = [{"username": f"bench{i}", "email": f"bench{i}@example.com", "password": f"password-{i}"}
+                     for i in range(args.users)]
+            for user in users:
+                (await client.post("/api/users/register", json=user)).raise_for_status()
+            credentials = [{"username": user["username"], "password": user["password"]} for user in users]
+            token = (await client.post("/api/users/login", json=credentials[0])).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+
+            print(f"{'endpoint':<8} {'concurrency':>11} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+            for concurrency in args.concurrency:
+                for name, count, factory in (
+                    ("login", args.logins, lambda i: lambda: client.post(
+                        "/api/users/login", json=credentials[i % len(credentials)])),
+                    ("me", args.requests, lambda i: lambda: client.get("/api/users/me", headers=headers)),
+                ):
+                    rate, latencies = await measure(client, [factory(i) for i in range(count)], concurrency)
+                    print(f"{name:<8} {concurrency:>11} {rate:>10,.1f} {np.percentile(latencies, 50) * 1000:>9.1f} "
+                          f"{np.percentile(latencies, 99) * 1000:>9.1f}")
+            if args.burst:
+                await burst(client, credentials, headers, args.burst)
+
+
+async def burst(client: httpx.AsyncClient, credentials, headers, size: int):
+    statuses = []
+
+    async def login(i):
+        response = await client.post("/api/users/login", json=credentials[i % len(credentials)])
+        statuses.append(response.status_code)
+
+    burst_task = asyncio.gather(*(login(i) for i in range(1, size + 1)))
+    me, other = [], []
+    while not burst_task.done():
+        start = time.perf_counter()
+        await client.get("/api/users/me", headers=headers)
+        me.append(time.perf_counter() - start)
+        if len(me) % 10 == 0:
+            start = time.perf_counter()
+            response = await client.post("/api/users/login", json=credentials[0])
+            if response.status_code == 200:
+                other.append(time.perf_counter() - start)
+        await asyncio.sleep(0.01)
+    await burst_task
+
+    print(f"\nburst of {size} logins: {statuses.count(200)} ok, {statuses.count(503)} answered 503")
+    for name, samples in (("me", me), ("other login", other)):
+        if samples:
+            print(f"{name:<12} during burst: p50 {np.percentile(samples, 50) * 1000:.1f} ms, "
+                  f"p99 {np.percentile(samples, 99) * 1000:.1f} ms ({len(samples)} requests)")
+    metrics = (await client.get("/api/metrics/hashing")).json()
+    print("hashing pool:", ", ".join(f"{key}={value:.4g}" for key, value in metrics.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--burst", type=int, default=0, help="size of a simultaneous login burst")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
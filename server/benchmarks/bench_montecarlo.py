@@ -0,0 +1,63 @@
+"""
+Latency of a Monte Carlo evaluation of one discard decision.
+
+Positions are taken a few turns into seeded games; every legal action of the
+acting player is evaluated over `--determinizations` deals. The first call of
+each worker count warms the pool (process start, batched env construction)
+and is not timed.
+
+Usage:
+    python benchmarks/bench_montecarlo.py --workers 0 1 2 4 8 --determinizations 256
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from mahjong.core.types import TileType
+from mahjong.core.env import MahjongEnv
+from mahjong.ai.montecarlo import MonteCarloEvaluator
+
+PASS = len(TileType) + 5
+
+
+def positions(count: int, turns: int):
+    rng = np.random.default_rng(0)
+    envs = []
+    for seed in range(count):
+        env = MahjongEnv()
+        env.reset(seed=seed)
+        for _ in range(turns):
+            env.step(int(rng.choice(np.flatnonzero(env.action_mask[:len(TileType)]))))
+            while env.discarder is not None:
+                env.step(PASS)
+        envs.append(env)
+    return envs
+
+
+def main():
+    default_workers = sorted({0, 1, os.cpu_count() or 1})
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers)
+    parser.add_argument("--determinizations", type=int, default=256)
+    parser.add_argument("--positions", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=12)
+    args = parser.parse_args()
+
+    envs = positions(args.positions, args.turns)
+    print(f"{'workers':>7} {'mean ms':>9} {'max ms':>9} {'playouts/s':>12}")
+    for workers in args.workers:
+        with MonteCarloEvaluator(workers=workers) as evaluator:
+            evaluator.evaluate(envs[0], args.determinizations)
+            times, playouts = [], 0
+            for env in envs:
+                start = time.perf_counter()
+                values = evaluator.evaluate(env, args.determinizations)
+                times.append(time.perf_counter() - start)
+                playouts += len(values) * args.determinizations
+        print(f"{workers:>7} {np.mean(times) * 1e3:>9.1f} {max(times) * 1e3:>9.1f} {playouts / sum(times):>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Measure game-record size, write speed, sequential read speed and random restores.
+
+Usage:
+    python benchmarks/bench_records.py --games 2000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from mahjong.core.env import MahjongEnv
+from mahjong.core.record import GameWriter, GameReader
+
+
+def write_games(path: str, num_games: int, seed: int) -> float:
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    with GameWriter(path) as writer:
+        env = MahjongEnv(recorder=writer)
+        obs, info = env.reset(seed=seed)
+        games = 0
+        while games < num_games:
+            action = int(rng.choice(np.flatnonzero(info['action_mask'])))
+            obs, reward, terminated, truncated, info = env.step(action)
+            if terminated or truncated:
+                games += 1
+                obs, info = env.reset()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--restores", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "games.mjr")
+        elapsed = write_games(path, args.games, args.seed)
+        size = os.path.getsize(path)
+        print(f"write:   {args.games / elapsed:>12,.0f} games/s (including env steps), {size / args.games:,.0f} bytes/game")
+
+        with GameReader(path) as reader:
+            start = time.perf_counter()
+            steps = checksum = 0
+            for game in reader:
+                # Touch every action so the pages are actually read
+                checksum += int(game.steps['action'].sum(dtype=np.int64))
+                steps += len(game.steps)
+            elapsed = time.perf_counter() - start
+            print(f"read:    {args.games / elapsed:>12,.0f} games/s, {steps / elapsed:,.0f} steps/s")
+
+            rng = np.random.default_rng(args.seed)
+            env = MahjongEnv()
+            games = rng.integers(len(reader), size=args.restores)
+            start = time.perf_counter()
+            for game in games:
+                reader.restore(env, int(game), int(rng.integers(len(reader[int(game)].steps) + 1)))
+            elapsed = time.perf_counter() - start
+            print(f"restore: {args.restores / elapsed:>12,.0f} random (game, turn) states/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Report self-play rollout throughput for an increasing number of worker processes.
+
+Usage:
+    python benchmarks/bench_rollout.py --workers 1 2 4 8 --seconds 10
+"""
+import argparse
+import os
+import time
+
+from mahjong.ai.buffers import empty_batch
+from mahjong.ai.rollout import RolloutPool
+
+
+def measure(num_workers: int, envs_per_worker: int, batch_size: int, seconds: float) -> float:
+    batch = empty_batch(batch_size)
+    with RolloutPool(num_workers, envs_per_worker=envs_per_worker, capacity=4 * batch_size) as pool:
+        # Warm up: let every worker import, reset and fill part of its buffer
+        pool.collect(batch_size, out=batch)
+        steps = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            pool.collect(batch_size, out=batch)
+            steps += batch_size
+        return steps / (time.perf_counter() - start)
+
+
+def main():
+    default_workers = sorted({1, 2, 4, os.cpu_count() or 1})
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers)
+    parser.add_argument("--envs-per-worker", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=4096)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    baseline = None
+    print(f"{'workers':>8} {'steps/s':>12} {'per worker':>12} {'scaling':>8}")
+    for num_workers in args.workers:
+        rate = measure(num_workers, args.envs_per_worker, args.batch_size, args.seconds)
+        baseline = baseline or rate
+        print(f"{num_workers:>8} {rate:>12,.0f} {rate / num_workers:>12,.0f} {rate / baseline / num_workers:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
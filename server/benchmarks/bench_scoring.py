@@ -0,0 +1,78 @@
+"""
+Per-hand cost of `mahjong.core.scoring` on random winning hands.
+
+"cold" clears the score and decomposition caches first, so every hand is
+decomposed and evaluated from scratch (the per-suit split tables stay warm,
+as they do in a running process); "warm" scores the same hands again and
+only hits the score cache. `score_batch` is timed cold on the whole set.
+
+Usage:
+    python benchmarks/bench_scoring.py --hands 20000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from mahjong.core import scoring
+from mahjong.core.scoring import SYSTEMS, score_batch, score_hand
+
+
+def random_winning_hands(rng, count: int):
+    """Four sets (60% sequences) and a pair, with the winning tile picked from the hand"""
+    counts, win_tiles = [], []
+    while len(counts) < count:
+        tiles = []
+        for _ in range(4):
+            if rng.random() < 0.6:
+                start = int(rng.integers(0, 3)) * 9 + int(rng.integers(0, 7))
+                tiles += [start, start + 1, start + 2]
+            else:
+                tiles += [int(rng.integers(0, 34))] * 3
+        tiles += [int(rng.integers(0, 34))] * 2
+        hand = np.bincount(tiles, minlength=34)
+        if hand.max() <= 4:
+            counts.append(hand)
+            win_tiles.append(int(rng.choice(tiles)))
+    return np.stack(counts).astype(np.int8), np.array(win_tiles)
+
+
+def clear_caches():
+    scoring._score.cache_clear()
+    scoring._decompose.cache_clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hands", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    counts, win_tiles = random_winning_hands(np.random.default_rng(args.seed), args.hands)
+    rows = [(row, tile) for row, tile in zip(counts, win_tiles.tolist())]
+    for system in SYSTEMS:
+        for row, tile in rows:  # build the per-suit split tables once
+            score_hand(row, tile, system)
+
+    print(f"{'system':<8} {'cold us':>9} {'warm us':>9} {'batch us':>9}")
+    for system in SYSTEMS:
+        clear_caches()
+        start = time.perf_counter()
+        for row, tile in rows:
+            score_hand(row, tile, system)
+        cold = (time.perf_counter() - start) / len(rows) * 1e6
+
+        start = time.perf_counter()
+        for row, tile in rows:
+            score_hand(row, tile, system)
+        warm = (time.perf_counter() - start) / len(rows) * 1e6
+
+        clear_caches()
+        start = time.perf_counter()
+        score_batch(counts, win_tiles, system)
+        batch = (time.perf_counter() - start) / len(rows) * 1e6
+        print(f"{system:<8} {cold:>9.1f} {warm:>9.1f} {batch:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Load-test the table manager with simulated bot clients.
+
+Every table gets one bot per seat. Bots subscribe like the WebSocket endpoint
+does, serialize every message they receive to JSON (the endpoint's send cost)
+and answer with a random legal action when it is their turn. The reported
+latency is from submitting an action to receiving the diff for it.
+
+"tables per core" divides the actions the process handles per CPU second by
+the action rate of one table at human pace (--pace actions/s per table).
+
+Usage:
+    python benchmarks/bench_tables.py --tables 1000 --seconds 10
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import numpy as np
+
+from mahjong.app.game import TableManager
+
+
+async def bot(table, seat: int, latencies: list, think: float, stop: asyncio.Event):
+    rng = random.Random(f"{table.id}-{seat}")
+    subscription = table.subscribe(seat)
+    sent_at = None
+    try:
+        while not stop.is_set():
+            message = await subscription.get()
+            json.dumps(message)
+            if sent_at is not None and message['type'] == 'diff' and message['p'] == seat:
+                latencies.append(time.perf_counter() - sent_at)
+                sent_at = None
+            if message.get('legal') and message['turn'] == seat:
+                if think:
+                    await asyncio.sleep(rng.random() * 2 * think)
+                sent_at = time.perf_counter()
+                table.submit(seat, rng.choice(message['legal']))
+    finally:
+        subscription.close()
+
+
+async def run(num_tables: int, seconds: float, think: float, timeout: float):
+    manager = TableManager(max_tables=num_tables, turn_timeout=timeout)
+    stop = asyncio.Event()
+    latencies = []
+    tables = [manager.create(seed=i) for i in range(num_tables)]
+    bots = [asyncio.create_task(bot(table, seat, latencies, think, stop))
+            for table in tables for seat in range(table.num_players)]
+
+    await asyncio.sleep(min(1.0, seconds / 5))  # Warm up
+    latencies.clear()
+    timeouts_before = sum(table.timeouts for table in tables)
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    await asyncio.sleep(seconds)
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    actions = len(latencies)
+    timeouts = sum(table.timeouts for table in tables) - timeouts_before
+
+    stop.set()
+    for task in bots:
+        task.cancel()
+    await asyncio.gather(*bots, return_exceptions=True)
+    await manager.shutdown()
+    return actions, timeouts, wall, cpu, np.asarray(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables", type=int, default=1000)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--think", type=float, default=0.0, help="mean bot think time in seconds")
+    parser.add_argument("--timeout", type=float, default=15.0, help="turn timeout in seconds")
+    parser.add_argument("--pace", type=float, default=0.5, help="actions per second of one human table")
+    args = parser.parse_args()
+
+    actions, timeouts, wall, cpu, latencies = asyncio.run(run(args.tables, args.seconds, args.think, args.timeout))
+    print(f"tables:          {args.tables}")
+    print(f"actions:         {actions:,} ({actions / wall:,.0f}/s, {timeouts} turn timeouts)")
+    if len(latencies):
+        print(f"latency p50:     {np.percentile(latencies, 50) * 1000:.2f} ms")
+        print(f"latency p99:     {np.percentile(latencies, 99) * 1000:.2f} ms")
+    print(f"cpu:             {cpu / wall:.0%} of one core")
+    if cpu > 0:
+        print(f"tables per core: {actions / cpu / args.pace:,.0f} at {args.pace} actions/s per table")
+
+
+if __name__ == "__main__":
+    main()
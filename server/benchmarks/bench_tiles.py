@@ -0,0 +1,93 @@
+"""
+Per-call cost of tile attribute lookups before and after `mahjong.core.tiles`.
+
+Times the enum-arithmetic versions that rules and env used to run (building
+`TileType(value)` and computing `// 9`, `% 9` per call) against lookups in
+the precomputed tables, on the same seeded hands and discards.
+
+Usage:
+    python benchmarks/bench_tiles.py --calls 200000
+"""
+import argparse
+import time
+from collections import Counter
+from typing import List
+
+import numpy as np
+
+from mahjong.core.types import TileType
+from mahjong.core.rules import MahjongRules
+from mahjong.core.tiles import SUIT_OF, RANK_OF, CHI_PAIRS
+
+
+def legacy_is_valid_chi(hand: List[TileType], target_tile: TileType) -> bool:
+    """The enum-based check `MahjongRules.is_valid_chi` used to run"""
+    if target_tile >= TileType.WIND_EAST:
+        return False
+    tile_value = target_tile.value
+    tile_number = tile_value % 9
+    possible_sequences = []
+    if tile_number <= 6:
+        possible_sequences.append([tile_value, tile_value + 1, tile_value + 2])
+    if 1 <= tile_number <= 7:
+        possible_sequences.append([tile_value - 1, tile_value, tile_value + 1])
+    if tile_number >= 2:
+        possible_sequences.append([tile_value - 2, tile_value - 1, tile_value])
+    hand_counter = Counter(hand)
+    for seq in possible_sequences:
+        if all(tile_val == tile_value or hand_counter[TileType(tile_val)] >= 1 for tile_val in seq):
+            return True
+    return False
+
+
+def legacy_is_valid_chi_counts(counts, target_tile: int) -> bool:
+    if target_tile >= TileType.WIND_EAST:
+        return False
+    tile_number = target_tile % 9
+    if tile_number <= 6 and counts[target_tile + 1] and counts[target_tile + 2]:
+        return True
+    if 1 <= tile_number <= 7 and counts[target_tile - 1] and counts[target_tile + 1]:
+        return True
+    return tile_number >= 2 and bool(counts[target_tile - 2] and counts[target_tile - 1])
+
+
+def timed(fn, cases) -> float:
+    """Nanoseconds per call"""
+    start = time.perf_counter()
+    for args in cases:
+        fn(*args)
+    return (time.perf_counter() - start) / len(cases) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    values = rng.integers(0, 34, size=args.calls).tolist()
+    hands = [[TileType(int(t)) for t in row] for row in rng.integers(0, 34, size=(min(args.calls, 20_000), 13))]
+    counts = [list(np.bincount(hand, minlength=len(TileType))) for hand in hands]
+    chi_cases = [(hands[i % len(hands)], TileType(v)) for i, v in enumerate(values)]
+    count_cases = [(counts[i % len(counts)], v) for i, v in enumerate(values)]
+    value_cases = [(v,) for v in values]
+    rules = MahjongRules()
+
+    rows = [
+        ("suit and rank", lambda v: (TileType(v).value // 9, TileType(v).value % 9),
+         lambda v: (SUIT_OF[v], RANK_OF[v]), value_cases),
+        ("chi neighbours", lambda v: [TileType(v + d) for d in (-2, -1, 1, 2)
+                                      if 0 <= v + d < 34 and (v + d) // 9 == v // 9],
+         lambda v: CHI_PAIRS[v], value_cases),
+        ("is_valid_chi (list)", legacy_is_valid_chi, rules.is_valid_chi, chi_cases),
+        ("is_valid_chi_counts", legacy_is_valid_chi_counts, rules.is_valid_chi_counts, count_cases),
+    ]
+    print(f"{'operation':<22} {'enum ns':>9} {'table ns':>9} {'speedup':>8}")
+    for name, legacy, table, cases in rows:
+        before, after = timed(legacy, cases), timed(table, cases)
+        print(f"{name:<22} {before:>9.0f} {after:>9.0f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+User listing, batch lookup and NDJSON export against a large users table.
+
+The database is a throwaway SQLite file selected with MAHJONG_DATABASE_URL
+before the app is imported, filled with --users rows in bulk. Keyset pages
+are timed near the start, the middle and the end of the table; OFFSET pages
+at the same depths are shown for comparison.
+
+Usage:
+    python benchmarks/bench_users.py --users 1000000 --limit 100
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+
+DIRECTORY = tempfile.mkdtemp(prefix="mahjong-bench-")
+PATH = os.path.join(DIRECTORY, 'bench.db')
+os.environ.setdefault("MAHJONG_DATABASE_URL", f"sqlite+aiosqlite:///{PATH}")
+
+import httpx  # noqa: E402
+
+from mahjong.app.main import app  # noqa: E402
+from mahjong.app.api.models.user import Base  # noqa: E402
+from mahjong.app.api.routers.users import _encode_cursor  # noqa: E402
+from mahjong.app.config.database import async_engine, init_db  # noqa: E402
+
+
+async def create_schema():
+    await init_db(Base.metadata, create_schema=True)
+    # The engine's connections belong to this event loop
+    await async_engine.dispose()
+
+
+def populate(count: int, chunk: int = 100_000):
+    start = datetime(2024, 1, 1)
+    with sqlite3.connect(PATH) as connection:
+        for first in range(0, count, chunk):
+            rows = [(f"user{i}", f"user{i}@example.com", "x", (start + timedelta(seconds=i)).isoformat(" "),
+                     0, 0, 0.0) for i in range(first, min(first + chunk, count))]
+            connection.executemany(
+                "INSERT INTO users (username, email, hashed_password, created_at, win_count, lose_count, "
+                "total_score) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        connection.execute("ANALYZE")
+
+
+def cursor_for(depth: int, order: str) -> str:
+    """The `next` cursor of the page ending at row `depth`"""
+    with sqlite3.connect(PATH) as connection:
+        user_id, created_at = connection.execute("SELECT id, created_at FROM users WHERE id = ?", (depth,)).fetchone()
+    return _encode_cursor(SimpleNamespace(id=user_id, created_at=datetime.fromisoformat(created_at)), order)
+
+
+async def timed(request, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = await request()
+        samples.append(time.perf_counter() - start)
+        response.raise_for_status()
+    return np.asarray(samples) * 1000
+
+
+async def run(args):
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            print(f"{'query':<28} {'p50 ms':>9} {'p99 ms':>9}")
+
+            def report(name, samples):
+                print(f"{name:<28} {np.percentile(samples, 50):>9.2f} {np.percentile(samples, 99):>9.2f}")
+
+            for depth in (0, args.users // 2, args.users - args.limit):
+                for order in ("id", "created_at"):
+                    params = {"limit": args.limit, "order": order}
+                    if depth:
+                        params["after"] = cursor_for(depth, order)
+                    report(f"keyset {order} @{depth}", await timed(
+                        lambda: client.get("/api/users/users", params=params), args.repeat))
+
+            ids = list(range(1, args.users, max(1, args.users // 500)))[:500]
+            report("batch 500 ids", await timed(
+                lambda: client.post("/api/users/users/batch", json={"ids": ids}), args.repeat))
+
+            start = time.perf_counter()
+            lines = 0
+            async with client.stream("GET", "/api/users/users", params={"format": "ndjson"}) as response:
+                async for chunk in response.aiter_bytes():
+                    lines += chunk.count(b"\n")
+            elapsed = time.perf_counter() - start
+            print(f"ndjson export: {lines:,} users in {elapsed:.1f}s ({lines / elapsed:,.0f} users/s)")
+
+    with sqlite3.connect(PATH) as connection:
+        for depth in (0, args.users // 2, args.users - args.limit):
+            start = time.perf_counter()
+            connection.execute("SELECT id FROM users ORDER BY id LIMIT ? OFFSET ?", (args.limit, depth)).fetchall()
+            print(f"{'offset (raw sqlite) @' + str(depth):<28} {(time.perf_counter() - start) * 1000:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(create_schema())
+    start = time.perf_counter()
+    populate(args.users)
+    print(f"inserted {args.users:,} users in {time.perf_counter() - start:.1f}s")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
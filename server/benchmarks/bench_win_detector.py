@@ -0,0 +1,133 @@
+"""
+Benchmark the table-driven win detector against the previous recursive implementation.
+
+Usage:
+    python benchmarks/bench_win_detector.py --hands 2000000
+"""
+import argparse
+import time
+from collections import Counter
+from typing import List
+
+import numpy as np
+
+from mahjong.core.types import TileType
+from mahjong.core.rules import MahjongRules
+from mahjong.core.decompose import is_complete_batch
+
+
+def legacy_is_winning_hand(hand: List[TileType]) -> bool:
+    """The recursive detector that `MahjongRules.is_winning_hand` used to run"""
+    if len(hand) != 14:
+        return False
+    hand_counter = Counter(hand)
+    for tile, count in hand_counter.items():
+        if count >= 2:
+            remaining_tiles = list(hand)
+            remaining_tiles.remove(tile)
+            remaining_tiles.remove(tile)
+            if _legacy_can_form_sets(remaining_tiles):
+                return True
+    return False
+
+
+def _legacy_can_form_sets(tiles: List[TileType]) -> bool:
+    if not tiles:
+        return True
+    counter = Counter(tiles)
+    for tile, count in counter.items():
+        if count >= 3:
+            remaining = list(tiles)
+            for _ in range(3):
+                remaining.remove(tile)
+            if _legacy_can_form_sets(remaining):
+                return True
+    for tile in tiles:
+        if tile >= TileType.WIND_EAST:
+            continue
+        tile_value = tile.value
+        if (TileType(tile_value + 1) in tiles and
+            TileType(tile_value + 2) in tiles and
+            tile_value % 9 <= 6):
+            remaining = list(tiles)
+            remaining.remove(tile)
+            remaining.remove(TileType(tile_value + 1))
+            remaining.remove(TileType(tile_value + 2))
+            if _legacy_can_form_sets(remaining):
+                return True
+    return False
+
+
+def random_hands(rng: np.random.Generator, n: int, winning_share: float) -> np.ndarray:
+    """Draw `n` 14-tile hands; a `winning_share` of them are built as 4 sets and a pair"""
+    tiles = np.repeat(np.arange(34, dtype=np.int8), 4)
+    hands = rng.permuted(np.broadcast_to(tiles, (n, tiles.size)), axis=1)[:, :14].copy()
+
+    num_winning = int(n * winning_share)
+    for row in range(num_winning):
+        counts = np.zeros(34, dtype=np.int8)
+        hand = []
+        pair = rng.integers(34)
+        counts[pair] += 2
+        hand += [pair, pair]
+        while len(hand) < 14:
+            if rng.random() < 0.5:
+                tile = rng.integers(34)
+                meld = [tile] * 3
+            else:
+                start = rng.integers(3) * 9 + rng.integers(7)
+                meld = [start, start + 1, start + 2]
+            if all(counts[t] + meld.count(t) <= 4 for t in meld):
+                for t in meld:
+                    counts[t] += 1
+                hand += meld
+        hands[row] = hand
+    return hands
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hands", type=int, default=2_000_000, help="number of random 14-tile hands")
+    parser.add_argument("--chunk", type=int, default=100_000, help="hands generated per chunk")
+    parser.add_argument("--winning-share", type=float, default=0.1, help="share of hands built to be winning")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    legacy_time = table_time = batch_time = 0.0
+    winners = 0
+    done = 0
+    while done < args.hands:
+        n = min(args.chunk, args.hands - done)
+        hands = random_hands(rng, n, args.winning_share)
+        tile_lists = [[TileType(t) for t in row] for row in hands.tolist()]
+        counts = np.zeros((n, 34), dtype=np.int8)
+        np.add.at(counts, (np.arange(n)[:, None], hands), 1)
+
+        start = time.perf_counter()
+        expected = [legacy_is_winning_hand(hand) for hand in tile_lists]
+        legacy_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = [MahjongRules.is_winning_hand(hand) for hand in tile_lists]
+        table_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        batched = is_complete_batch(counts)
+        batch_time += time.perf_counter() - start
+
+        if expected != actual or expected != batched.tolist():
+            raise SystemExit("mismatch between legacy and table-driven detectors")
+        winners += sum(expected)
+        done += n
+
+    print(f"hands:            {done:,} ({winners:,} winning)")
+    print(f"legacy recursion: {legacy_time:8.2f}s  {legacy_time / done * 1e6:8.3f} us/hand")
+    print(f"lookup tables:    {table_time:8.2f}s  {table_time / done * 1e6:8.3f} us/hand"
+          f"  ({legacy_time / table_time:.1f}x)")
+    print(f"batched tables:   {batch_time:8.2f}s  {batch_time / done * 1e6:8.3f} us/hand"
+          f"  ({legacy_time / batch_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Full-game `MahjongEnv` and `BatchedMahjongEnv` stepping for every `MahjongType`,
+`FeatureEncoder` encoding of the stepped tables, and `GameState` checkpoints
+(`get_state` plus `set_state`) of a game in progress.
+
+Games are seeded and the policy is deterministic (take any legal claim, else
+discard the lowest tile), so every run plays the same games.
+"""
+from typing import List
+
+import numpy as np
+
+from mahjong.core.types import TileType, MahjongType
+from mahjong.core.env import MahjongEnv
+from mahjong.core.batch_env import BatchedMahjongEnv
+from mahjong.core.features import FeatureEncoder
+
+from benchmarks.harness import Result, throughput
+
+NUM_TILES = len(TileType)
+
+
+def first_legal(mask: np.ndarray) -> int:
+    special = mask[NUM_TILES:]
+    if special.any():
+        return NUM_TILES + int(special.argmax())
+    return int(mask.argmax())
+
+
+def play(mahjong_type: MahjongType, games: int):
+    env = MahjongEnv(mahjong_type=mahjong_type)
+
+    def run_once():
+        steps = 0
+        for seed in range(games):
+            _, info = env.reset(seed=seed)
+            done = False
+            while not done:
+                _, _, terminated, truncated, info = env.step(first_legal(info['action_mask']))
+                done = terminated or truncated
+                steps += 1
+        return steps
+    return run_once
+
+
+def play_batched(mahjong_type: MahjongType, num_envs: int, steps: int):
+    env = BatchedMahjongEnv(num_envs, mahjong_type=mahjong_type)
+
+    def run_once():
+        _, info = env.reset(seed=0)
+        for _ in range(steps):
+            mask = info['action_mask']
+            special = mask[:, NUM_TILES:]
+            actions = np.where(special.any(axis=1), NUM_TILES + special.argmax(axis=1), mask.argmax(axis=1))
+            _, _, _, _, info = env.step(actions)
+        return num_envs * steps
+    return run_once
+
+
+def encode(num_envs: int, steps: int):
+    """Step a batched env and encode every table after each step, into one reused buffer"""
+    env = BatchedMahjongEnv(num_envs)
+    encoder = FeatureEncoder()
+    out = encoder.buffer(num_envs)
+
+    def run_once():
+        _, info = env.reset(seed=0)
+        for _ in range(steps):
+            _, _, _, _, info = env.step(info['action_mask'].argmax(axis=1))
+            encoder.encode_batch(env, out=out)
+        return num_envs * steps
+    return run_once
+
+
+def checkpoint(count: int):
+    """Take a `GameState` of a game in progress and put it back, `count` times"""
+    env = MahjongEnv()
+    env.reset(seed=0)
+    for _ in range(20):
+        env.step(first_legal(env.action_mask))
+
+    def run_once():
+        for _ in range(count):
+            env.set_state(env.get_state())
+        return count
+    return run_once
+
+
+def run(quick: bool = False) -> List[Result]:
+    games = 20 if quick else 200
+    repeat = 3 if quick else 5
+    results = []
+    for mahjong_type in MahjongType:
+        name = mahjong_type.name.lower()
+        results.append(throughput(f"env.{name}.steps", play(mahjong_type, games), repeat, "steps/s"))
+        results.append(throughput(f"batch_env.{name}.steps", play_batched(mahjong_type, 256, 20 if quick else 100),
+                                  repeat, "steps/s"))
+    results.append(throughput("features.encode_batch", encode(256, 20 if quick else 100), repeat, "tables/s"))
+    results.append(throughput("env.checkpoint", checkpoint(2000 if quick else 20000), repeat, "states/s"))
+    return results
@@ -0,0 +1,127 @@
+"""
+Timing helpers, JSON result files and regression comparison.
+"""
+import gc
+import json
+import platform
+import subprocess
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+@dataclass
+class Result:
+    """One measured quantity; `higher_is_better` decides which direction is a regression"""
+    name: str
+    value: float
+    unit: str
+    higher_is_better: bool = True
+    extra: Dict[str, float] = field(default_factory=dict)
+
+
+def throughput(name: str, fn: Callable[[], int], repeat: int = 5, unit: str = "ops/s") -> Result:
+    """
+    Best-of-`repeat` rate of `fn`, which runs one pass and returns how many operations it did.
+    The best run is the least disturbed by the rest of the machine, so it is the most stable to compare.
+    """
+    fn()  # Warm up caches and lazy imports
+    rates = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            count = fn()
+            rates.append(count / (time.perf_counter() - start))
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return Result(name, max(rates), unit, extra={'median': float(np.median(rates)), 'runs': repeat})
+
+
+def latency(name: str, samples: Sequence[float]) -> Result:
+    """Median latency in milliseconds, with p90/p99 alongside"""
+    ms = np.asarray(samples) * 1000
+    return Result(name, float(np.percentile(ms, 50)), "ms", higher_is_better=False, extra={
+        'p90': float(np.percentile(ms, 90)),
+        'p99': float(np.percentile(ms, 99)),
+        'mean': float(ms.mean()),
+        'samples': len(ms),
+    })
+
+
+def environment() -> Dict[str, str]:
+    """What the numbers were measured on"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor() or platform.machine(),
+        'platform': platform.platform(),
+    }
+
+
+def save(path: str, results: List[Result]):
+    with open(path, "w") as f:
+        json.dump({'environment': environment(), 'results': [asdict(result) for result in results]}, f, indent=2)
+
+
+def load(path: str) -> Dict[str, Result]:
+    with open(path) as f:
+        data = json.load(f)
+    return {item['name']: Result(**item) for item in data['results']}
+
+
+@dataclass
+class Change:
+    name: str
+    baseline: float
+    current: float
+    unit: str
+    change: float  # Relative change, positive means faster
+    regression: bool
+
+
+def compare(baseline: Dict[str, Result], current: Dict[str, Result], threshold: float) -> List[Change]:
+    """Compare benchmarks present in both runs; a change worse than `threshold` (e.g. 0.1) is a regression"""
+    changes = []
+    for name, result in current.items():
+        if name not in baseline or baseline[name].value <= 0 or result.value <= 0:
+            continue
+        before = baseline[name].value
+        ratio = result.value / before if result.higher_is_better else before / result.value
+        change = ratio - 1
+        changes.append(Change(name, before, result.value, result.unit, change, change < -threshold))
+    return changes
+
+
+def report(results: List[Result]) -> str:
+    width = max([len(result.name) for result in results] + [9])
+    lines = [f"{'benchmark':<{width}} {'value':>14}  unit"]
+    for result in results:
+        lines.append(f"{result.name:<{width}} {result.value:>14,.3f}  {result.unit}")
+    return "\n".join(lines)
+
+
+def report_changes(changes: List[Change], threshold: Optional[float] = None) -> str:
+    width = max([len(change.name) for change in changes] + [9])
+    lines = [f"{'benchmark':<{width}} {'baseline':>14} {'current':>14} {'change':>8}"]
+    for change in changes:
+        flag = "  REGRESSION" if change.regression else ""
+        lines.append(f"{change.name:<{width}} {change.baseline:>14,.3f} {change.current:>14,.3f} "
+                     f"{change.change:>+8.1%}{flag}")
+    regressions = sum(change.regression for change in changes)
+    if threshold is not None:
+        lines.append(f"{regressions} regression(s) beyond {threshold:.0%}")
+    return "\n".join(lines)
@@ -0,0 +1,114 @@
+"""
+`MahjongRules` checks, `ClaimEngine` discard lookups and hand scoring on fixed hand corpora.
+
+The corpora are rebuilt from fixed seeds on every run, so two runs time the
+exact same hands.
+"""
+from typing import List, Tuple
+
+import numpy as np
+
+from mahjong.core.types import TileType, MahjongType
+from mahjong.core.rules import MahjongRules
+from mahjong.core.claims import ClaimEngine
+from mahjong.core.scoring import SYSTEMS, score_batch
+from mahjong.core.wall import wall_from_seed
+
+from benchmarks.harness import Result, throughput
+
+CORPUS_SEED = 20240101
+
+
+def random_hands(count: int, size: int) -> List[List[TileType]]:
+    """Hands dealt from seeded walls, sorted like the env's hand lists"""
+    hands = []
+    for seed in range(CORPUS_SEED, CORPUS_SEED + count):
+        wall = wall_from_seed(seed, MahjongType.JAPAN)
+        hands.append(sorted(TileType(int(tile)) for tile in wall[:size]))
+    return hands
+
+
+def winning_hands(count: int) -> List[List[TileType]]:
+    """Complete hands of four sets and a pair"""
+    rng = np.random.default_rng(CORPUS_SEED)
+    hands = []
+    while len(hands) < count:
+        counts = np.zeros(len(TileType), dtype=np.int64)
+        for _ in range(4):
+            if rng.random() < 0.6:
+                suit, start = rng.integers(3), rng.integers(7)
+                counts[suit * 9 + start:suit * 9 + start + 3] += 1
+            else:
+                counts[rng.integers(TileType.DRAGON_WHITE + 1)] += 3
+        counts[rng.integers(TileType.DRAGON_WHITE + 1)] += 2
+        if counts.max() <= 4:
+            hands.append([TileType(tile) for tile in np.repeat(np.arange(len(TileType)), counts)])
+    return hands
+
+
+def claim_cases(count: int) -> List[Tuple[List[TileType], TileType]]:
+    """13-tile hands paired with the next tile of their wall as the discard"""
+    cases = []
+    for seed in range(CORPUS_SEED, CORPUS_SEED + count):
+        wall = wall_from_seed(seed, MahjongType.JAPAN)
+        cases.append(([TileType(int(tile)) for tile in wall[:13]], TileType(int(wall[13]))))
+    return cases
+
+
+def run(quick: bool = False) -> List[Result]:
+    size = 500 if quick else 5000
+    repeat = 3 if quick else 5
+    random_14 = random_hands(size, 14)
+    winning = winning_hands(size)
+    claims = claim_cases(size)
+    rules = MahjongRules()
+
+    def check_hands(hands):
+        def run_once():
+            for hand in hands:
+                rules.is_winning_hand(hand)
+            return len(hands)
+        return run_once
+
+    def check_claims(check):
+        def run_once():
+            for hand, tile in claims:
+                check(hand, tile)
+            return len(claims)
+        return run_once
+
+    # Four-player tables dealt from the claim corpus; every discard is checked against all seats
+    tables = [claims[i:i + 4] for i in range(0, len(claims) - 3, 4)]
+    engines = []
+    for table in tables:
+        counts = np.zeros((4, len(TileType)), dtype=np.int8)
+        for player, (hand, _) in enumerate(table):
+            np.add.at(counts[player], hand, 1)
+        engine = ClaimEngine(counts, rules)
+        engine.rebuild()
+        engines.append((engine, [tile for _, tile in table]))
+    out = np.zeros((4, 4), dtype=bool)
+
+    # Winning corpus as count rows, won on the last tile of each hand; repeated passes hit the score cache
+    win_counts = np.stack([np.bincount(hand, minlength=len(TileType)) for hand in winning])
+    win_tiles = np.array([hand[-1] for hand in winning])
+
+    def score_hands(system):
+        def run_once():
+            score_batch(win_counts, win_tiles, system)
+            return len(win_counts)
+        return run_once
+
+    def resolve_discards():
+        for engine, tiles in engines:
+            for discarder, tile in enumerate(tiles):
+                engine.eligible(tile, discarder, out=out)
+        return 4 * len(engines)
+
+    return [
+        throughput("rules.is_winning_hand.random", check_hands(random_14), repeat, "hands/s"),
+        throughput("rules.is_winning_hand.winning", check_hands(winning), repeat, "hands/s"),
+        throughput("rules.is_valid_chi", check_claims(rules.is_valid_chi), repeat, "hands/s"),
+        throughput("rules.is_valid_pon", check_claims(rules.is_valid_pon), repeat, "hands/s"),
+        throughput("claims.eligible", resolve_discards, repeat, "discards/s"),
+    ] + [throughput(f"scoring.score_batch.{system}", score_hands(system), repeat, "hands/s") for system in SYSTEMS]
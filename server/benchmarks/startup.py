@@ -0,0 +1,17 @@
+"""
+Cold-start import time of `mahjong.core`, a rollout worker (`mahjong.ai.rollout`)
+and a uvicorn worker (`mahjong.app.main`), each measured in fresh interpreters
+with `python -X importtime`.
+"""
+from typing import List
+
+from benchmarks.bench_importtime import import_times
+from benchmarks.harness import Result, latency
+
+TARGETS = ['mahjong.core', 'mahjong.ai.rollout', 'mahjong.app.main']
+
+
+def run(quick: bool = False) -> List[Result]:
+    repeat = 3 if quick else 10
+    return [latency(f"import {module}", [import_times(module)[module][1] / 1000 for _ in range(repeat)])
+            for module in TARGETS]
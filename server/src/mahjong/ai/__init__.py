@@ -0,0 +1,36 @@
+"""
+Self-play and search. Attributes are imported on first access, so a rollout
+worker importing `mahjong.ai.rollout` does not also load the Monte Carlo
+evaluator and its scoring tables.
+"""
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .buffers import TrajectoryBuffer
+    from .rollout import RolloutPool, random_policy
+    from .montecarlo import MonteCarloEvaluator, determinize
+
+# Attribute -> submodule defining it
+_LAZY = {
+    'TrajectoryBuffer': 'buffers',
+    'RolloutPool': 'rollout',
+    'random_policy': 'rollout',
+    'MonteCarloEvaluator': 'montecarlo',
+    'determinize': 'montecarlo',
+}
+
+__all__ = ['TrajectoryBuffer', 'RolloutPool', 'random_policy', 'MonteCarloEvaluator', 'determinize']
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,110 @@
+"""
+Shared-memory trajectory ring buffers.
+
+Each rollout worker owns one `TrajectoryBuffer`: a single
+`multiprocessing.shared_memory` block holding a small header and one
+fixed-size NumPy array per field. The worker is the only writer of the head
+counter and the learner is the only writer of the tail counter, so no lock is
+needed; a full buffer simply makes the worker wait.
+"""
+import time
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from mahjong.core.types import TileType
+from mahjong.core.env import NUM_WAITING, SPECIAL_ACTIONS
+
+NUM_ACTIONS = len(TileType) + len(SPECIAL_ACTIONS)
+
+# name -> (per-step shape, dtype)
+FIELDS: Dict[str, Tuple[Tuple[int, ...], str]] = {
+    'hand': ((len(TileType),), 'int8'),
+    'discards': ((len(TileType),), 'int8'),
+    'dora_indicators': ((5,), 'int8'),
+    'current_player': ((), 'int8'),
+    'waiting_actions': ((NUM_WAITING,), 'int8'),
+    'action_mask': ((NUM_ACTIONS,), 'bool'),
+    'action': ((), 'int16'),
+    'reward': ((), 'float32'),
+    'terminated': ((), 'bool'),
+    'truncated': ((), 'bool'),
+    'env_id': ((), 'int32'),
+}
+
+_HEADER_BYTES = 64  # head and tail counters, padded to a cache line
+_ALIGN = 64
+
+
+def _layout(capacity: int) -> Tuple[Dict[str, int], int]:
+    """Byte offset of every field and the total block size"""
+    offsets = {}
+    offset = _HEADER_BYTES
+    for name, (shape, dtype) in FIELDS.items():
+        offsets[name] = offset
+        size = capacity * int(np.prod(shape, dtype=np.int64)) * np.dtype(dtype).itemsize
+        offset += -(-size // _ALIGN) * _ALIGN
+    return offsets, offset
+
+
+class TrajectoryBuffer:
+    """Single-producer single-consumer ring buffer of environment steps in shared memory"""
+
+    def __init__(self, capacity: int, name: Optional[str] = None):
+        self.capacity = capacity
+        offsets, size = _layout(capacity)
+        self._owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self._owner, size=size if self._owner else 0)
+        self._counters = np.ndarray((2,), dtype=np.int64, buffer=self.shm.buf, offset=0)
+        if self._owner:
+            self._counters[:] = 0
+        self.arrays = {
+            name: np.ndarray((capacity,) + shape, dtype=dtype, buffer=self.shm.buf, offset=offsets[name])
+            for name, (shape, dtype) in FIELDS.items()
+        }
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def __len__(self) -> int:
+        return int(self._counters[0] - self._counters[1])
+
+    def put(self, step: Dict[str, object], should_stop=None) -> bool:
+        """Append one step, waiting while the buffer is full. Returns False if stopped while waiting."""
+        head = int(self._counters[0])
+        while head - int(self._counters[1]) >= self.capacity:
+            if should_stop is not None and should_stop():
+                return False
+            time.sleep(0.0005)
+        slot = head % self.capacity
+        for name, value in step.items():
+            self.arrays[name][slot] = value
+        # Publish only after the payload is written
+        self._counters[0] = head + 1
+        return True
+
+    def take(self, out: Dict[str, np.ndarray], start: int, count: int) -> int:
+        """Copy up to `count` steps into `out[...][start:]`; returns how many were copied"""
+        head, tail = int(self._counters[0]), int(self._counters[1])
+        count = min(count, head - tail)
+        if count <= 0:
+            return 0
+        slots = np.arange(tail, tail + count) % self.capacity
+        for name, array in self.arrays.items():
+            np.take(array, slots, axis=0, out=out[name][start:start + count])
+        self._counters[1] = tail + count
+        return count
+
+    def close(self):
+        self.arrays = {}
+        self._counters = None
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+def empty_batch(batch_size: int) -> Dict[str, np.ndarray]:
+    """Preallocated arrays matching `FIELDS` for `batch_size` steps"""
+    return {name: np.zeros((batch_size,) + shape, dtype=dtype) for name, (shape, dtype) in FIELDS.items()}
@@ -0,0 +1,238 @@
+"""
+Monte Carlo evaluation of a decision by determinization.
+
+A determinization deals the tiles a seat cannot see (the other hands and the
+unrevealed wall) at random, consistently with everything it can see: its own
+hand, every discard and meld, and the revealed dora indicators. Every
+candidate action is played out from the same determinizations, so candidates
+are compared on equal deals. The playouts run in one `BatchedMahjongEnv`, one
+table per (candidate, determinization), under a fast policy that wins
+whenever it can, passes on other claims and otherwise discards a random held
+tile. When the seat is deciding on an open discard, the redealt seats are
+offered that discard again on their new hands.
+
+A playout is worth what the seat wins, minus what it pays: a ron is paid by
+the discarder and a tsumo is split between the other seats. Draws are worth 0.
+
+A finished playout is reset by the batched env; from then on it only passes,
+which leaves a table without an open discard untouched, so finished tables
+cost no draws, claims or win checks while the others play on.
+
+`MonteCarloEvaluator` splits the determinizations over a process pool; each
+worker keeps its most recently used batched envs between calls, so only the
+position's `GameState` bytes are pickled.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from mahjong.core.types import MahjongType
+from mahjong.core.env import MahjongEnv
+from mahjong.core.batch_env import BatchedMahjongEnv, NUM_TILES, CHI, PASS, RON, TSUMO, claim_flags
+from mahjong.core.ruleset import get_ruleset
+from mahjong.core.state import GameState
+from mahjong.core.wall import DEAD_WALL
+
+
+@lru_cache(maxsize=4)
+def _playout_env(mahjong_type: MahjongType, num_players: int, num_tables: int,
+                 score_wins: bool) -> BatchedMahjongEnv:
+    """The batched playout env of this process for a variant and batch size"""
+    return BatchedMahjongEnv(num_tables, num_players, mahjong_type, score_wins=score_wins)
+
+
+def hidden_tiles(state: GameState, seat: int) -> np.ndarray:
+    """The tiles `seat` cannot see, sorted"""
+    arrays = state.arrays()
+    counts = get_ruleset(state.mahjong_type).tile_counts.astype(np.int64)
+    counts -= arrays['hand_counts'][seat]
+    counts -= arrays['discard_counts']
+    counts -= arrays['meld_counts'].sum(axis=0)
+    wall = arrays['wall']
+    wall_end = len(wall) - DEAD_WALL
+    counts -= np.bincount(wall[wall_end:wall_end + state.dora_revealed], minlength=len(counts))
+    return np.repeat(np.arange(len(counts), dtype=np.int8), counts)
+
+
+def hidden_slots(state: GameState, seat: int) -> Tuple[List[int], List[int], np.ndarray]:
+    """The other seats, their concealed hand sizes, and the wall positions `seat` cannot see"""
+    others = [player for player in range(state.layout.num_players) if player != seat]
+    hand_counts = state.arrays()['hand_counts']
+    sizes = [int(hand_counts[player].sum()) for player in others]
+    wall_size = state.layout.wall_size
+    wall_end = wall_size - DEAD_WALL
+    slots = np.concatenate([np.arange(state.wall_pos, wall_end),
+                            np.arange(wall_end + state.dora_revealed, wall_size)])
+    return others, sizes, slots
+
+
+def sample_deals(state: GameState, seat: int, count: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    (count, hidden tiles) random orderings of the hidden tiles: the first tiles go to the
+    other seats' hands in seat order, the rest fill the hidden wall slots in order
+    """
+    tiles = hidden_tiles(state, seat)
+    _, sizes, slots = hidden_slots(state, seat)
+    if len(tiles) != sum(sizes) + len(slots):
+        raise ValueError(f"{len(tiles)} hidden tiles for {sum(sizes) + len(slots)} hidden places")
+    return rng.permuted(np.tile(tiles, (count, 1)), axis=1)
+
+
+def determinize(env: MahjongEnv, seat: int, rng: np.random.Generator):
+    """Redeal, in place, what `seat` cannot see in `env`"""
+    state = env.get_state()
+    deal = sample_deals(state, seat, 1, rng)[0]
+    others, sizes, slots = hidden_slots(state, seat)
+    start = 0
+    for player, size in zip(others, sizes):
+        env.hand_counts[player] = np.bincount(deal[start:start + size], minlength=env.hand_counts.shape[1])
+        start += size
+    env.wall[slots] = deal[start:]
+    env.dora_array[:] = env.dora_indicators
+    env.claims.rebuild()
+    if env.discarder is not None:
+        options = env.claims.eligible(env.last_discard, env.discarder)
+        env.claim_options[others] = options[others]
+        env.waiting_actions[:4] = env.claim_options.any(axis=0)
+
+
+def _load_deals(env: BatchedMahjongEnv, tables: np.ndarray, state: GameState, seat: int, deals: np.ndarray):
+    others, sizes, slots = hidden_slots(state, seat)
+    rows = np.arange(len(tables))[:, None]
+    start = 0
+    for player, size in zip(others, sizes):
+        hands = np.zeros((len(tables), env.hands.shape[2]), dtype=np.int8)
+        np.add.at(hands, (rows, deals[:, start:start + size]), 1)
+        env.hands[tables, player] = hands
+        start += size
+    env.walls[tables[:, None], slots] = deals[:, start:]
+    discarder = state.discarder
+    if discarder is not None:
+        flags = claim_flags(env.hands[tables].reshape(-1, NUM_TILES), np.full(len(tables) * env.num_players,
+                            state.last_discard), env.ruleset).reshape(len(tables), env.num_players, -1)
+        chi_player = (discarder + 1) % env.num_players
+        flags[:, np.arange(env.num_players) != chi_player, CHI] = False
+        flags[:, discarder] = False
+        env.claim_options[tables[:, None], others] = flags[:, others]
+        env.waiting_actions[tables, :TSUMO] = env.claim_options[tables].any(axis=1)
+
+
+def playout_actions(mask: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Win when possible, pass on other claims, otherwise discard a random held tile"""
+    discards = (mask[:, :NUM_TILES] * rng.random((len(mask), NUM_TILES))).argmax(axis=1)
+    return np.where(mask[:, NUM_TILES + TSUMO], NUM_TILES + TSUMO,
+                    np.where(mask[:, NUM_TILES + RON], NUM_TILES + RON,
+                             np.where(mask[:, NUM_TILES + PASS], NUM_TILES + PASS, discards)))
+
+
+def _settle(seat: int, num_players: int, actors: np.ndarray, discarders: np.ndarray, actions: np.ndarray,
+            rewards: np.ndarray) -> np.ndarray:
+    """Value to `seat` of the winning steps `actors` took, a ron on the discard of `discarders`"""
+    ron = actions == NUM_TILES + RON
+    values = np.where(actors == seat, rewards, 0.0)
+    values -= np.where(ron & (discarders == seat), rewards, 0.0)
+    values -= np.where(~ron & (actors != seat), rewards / (num_players - 1), 0.0)
+    return values
+
+
+def playout_values(state: GameState, candidates: Sequence[int], deals: np.ndarray, rng: np.random.Generator,
+                   score_wins: bool = True) -> np.ndarray:
+    """
+    (candidates, deals) playout values to the acting seat of `state`, playing
+    every candidate from every deal of `sample_deals`
+    """
+    num_deals = len(deals)
+    num_tables = len(candidates) * num_deals
+    env = _playout_env(state.mahjong_type, state.layout.num_players, num_tables, score_wins)
+    seat = state.current_player
+    tables = np.arange(num_tables)
+    # The walls of finished tables are reshuffled; seed them so playouts are reproducible
+    env.seed(int(rng.integers(2 ** 62)))
+    env.load(tables, state)
+    _load_deals(env, tables, state, seat, np.tile(deals, (len(candidates), 1)))
+
+    values = np.zeros(num_tables)
+    done = np.zeros(num_tables, dtype=bool)
+    actions = np.repeat(np.asarray(candidates, dtype=np.int64), num_deals)
+    # Every step discards, passes, claims or ends the game, bar a failed special action
+    for _ in range((env.num_players + 1) * state.layout.wall_size):
+        actors = env.current_player.copy()
+        discarders = env.discarder.copy()
+        _, rewards, terminated, truncated, info = env.step(actions)
+        won = terminated & ~done
+        if won.any():
+            values[won] = _settle(seat, env.num_players, actors[won], discarders[won], actions[won], rewards[won])
+        done |= terminated | truncated
+        if done.all():
+            break
+        actions = np.where(done, NUM_TILES + PASS, playout_actions(info['action_mask'], rng))
+    return values.reshape(len(candidates), num_deals)
+
+
+def _evaluate_chunk(state: GameState, candidates: Sequence[int], count: int, seed: Sequence[int],
+                    score_wins: bool) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    deals = sample_deals(state, state.current_player, count, rng)
+    return playout_values(state, candidates, deals, rng, score_wins).sum(axis=1)
+
+
+class MonteCarloEvaluator:
+    """
+    Estimate the value of each legal action of the acting player.
+
+    With `workers=0` playouts run in the calling process; otherwise they are
+    split over a pool of `workers` processes (started on first use).
+
+    Usage:
+        with MonteCarloEvaluator(workers=8) as evaluator:
+            values = evaluator.evaluate(env, determinizations=512)
+            action = max(values, key=values.get)
+    """
+
+    def __init__(self, workers: Optional[int] = None, seed: int = 0):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.seed = seed
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._calls = 0
+
+    def start(self) -> 'MonteCarloEvaluator':
+        if self.workers and self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers)
+        return self
+
+    def evaluate(self, env: MahjongEnv, determinizations: int = 256,
+                 candidates: Optional[Sequence[int]] = None) -> Dict[int, float]:
+        """Mean playout value of each candidate action (every legal action by default)"""
+        if candidates is None:
+            candidates = np.flatnonzero(env.action_mask).tolist()
+        candidates = [int(action) for action in candidates]
+        state = env.get_state()
+        score_wins = env.scoring is not None
+        self._calls += 1
+
+        chunks = max(1, min(self.workers, determinizations))
+        counts = [determinizations // chunks + (i < determinizations % chunks) for i in range(chunks)]
+        seeds = [(self.seed, self._calls, i) for i in range(chunks)]
+        args = (state, candidates)
+        if self.workers:
+            self.start()
+            futures = [self._pool.submit(_evaluate_chunk, *args, count, seed, score_wins)
+                       for count, seed in zip(counts, seeds)]
+            totals = sum(future.result() for future in futures)
+        else:
+            totals = sum(_evaluate_chunk(*args, count, seed, score_wins) for count, seed in zip(counts, seeds))
+        return {action: float(total) / determinizations for action, total in zip(candidates, totals)}
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self) -> 'MonteCarloEvaluator':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,77 @@
+"""
+Batch policies over `FeatureEncoder` tensors.
+
+A policy maps a (batch, channels, 34) feature array to (batch, actions)
+logits in one call; `masked_argmax` then picks the best legal action of each
+row. `LinearPolicy` is the NumPy fallback (one matrix product). `OnnxPolicy`
+runs an exported model with ONNX Runtime, which is only imported when such a
+model is loaded.
+"""
+from typing import Callable, Optional
+
+import numpy as np
+
+from mahjong.core.env import SPECIAL_ACTIONS
+from mahjong.core.features import FeatureEncoder
+from mahjong.core.tiles import NUM_TILE_TYPES
+
+NUM_ACTIONS = NUM_TILE_TYPES + len(SPECIAL_ACTIONS)
+
+BatchPolicy = Callable[[np.ndarray], np.ndarray]
+
+
+def masked_argmax(logits: np.ndarray, masks: np.ndarray) -> np.ndarray:
+    """Highest-scoring legal action per row"""
+    return np.where(masks, logits, -np.inf).argmax(axis=1)
+
+
+class LinearPolicy:
+    """Logits as a linear function of the flattened features"""
+
+    def __init__(self, weights: np.ndarray, bias: Optional[np.ndarray] = None):
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = np.zeros(self.weights.shape[1], dtype=np.float32) if bias is None else \
+            np.asarray(bias, dtype=np.float32)
+
+    @classmethod
+    def random(cls, num_features: int, seed: int = 0, scale: float = 0.01) -> 'LinearPolicy':
+        rng = np.random.default_rng(seed)
+        return cls(rng.normal(0, scale, size=(num_features, NUM_ACTIONS)))
+
+    @classmethod
+    def load(cls, path: str) -> 'LinearPolicy':
+        with np.load(path) as data:
+            return cls(data['weights'], data['bias'])
+
+    def save(self, path: str):
+        np.savez(path, weights=self.weights, bias=self.bias)
+
+    def __call__(self, features: np.ndarray) -> np.ndarray:
+        return features.reshape(len(features), -1).astype(np.float32) @ self.weights + self.bias
+
+
+class OnnxPolicy:
+    """An ONNX model with one (batch, channels, 34) float32 input and (batch, actions) logits as first output"""
+
+    def __init__(self, path: str, threads: int = 1):
+        try:
+            import onnxruntime
+        except ImportError as exc:
+            raise ImportError("OnnxPolicy needs onnxruntime (pip install onnxruntime)") from exc
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        self.input = self.session.get_inputs()[0].name
+
+    def __call__(self, features: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input: features.astype(np.float32, copy=False)})[0]
+
+
+def load_policy(path: Optional[str] = None, encoder: Optional[FeatureEncoder] = None) -> BatchPolicy:
+    """An `.onnx` model, `LinearPolicy` weights saved as `.npz`, or (without a path) a random linear policy"""
+    if path and path.endswith('.onnx'):
+        return OnnxPolicy(path)
+    if path:
+        return LinearPolicy.load(path)
+    encoder = encoder or FeatureEncoder()
+    return LinearPolicy.random(encoder.num_channels * encoder.shape[1])
@@ -0,0 +1,143 @@
+"""
+Multiprocess self-play rollouts.
+
+`RolloutPool` starts one process per worker. Each worker steps its own
+`MahjongEnv` instances and appends every step to its shared-memory
+`TrajectoryBuffer`; the learner pulls fixed-size batches with `collect`
+without any pickling of observations.
+"""
+import multiprocessing as mp
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from mahjong.core.types import MahjongType
+from mahjong.core.env import MahjongEnv
+from mahjong.ai.buffers import TrajectoryBuffer, empty_batch
+
+Policy = Callable[[Dict, np.ndarray, np.random.Generator], int]
+
+
+def random_policy(obs: Dict, mask: np.ndarray, rng: np.random.Generator) -> int:
+    """Uniformly random legal action"""
+    return int(rng.choice(np.flatnonzero(mask)))
+
+
+def _worker_main(worker_id: int, buffer_name: str, capacity: int, num_envs: int, seed: int,
+                 mahjong_type: MahjongType, policy: Policy, stop_event):
+    buffer = TrajectoryBuffer(capacity, name=buffer_name)
+    rng = np.random.default_rng([seed, worker_id])
+    first_env = worker_id * num_envs
+    envs = [MahjongEnv(mahjong_type=mahjong_type) for _ in range(num_envs)]
+    resets = [env.reset(seed=seed + first_env + i) for i, env in enumerate(envs)]
+    observations = [obs for obs, _ in resets]
+    masks = [info['action_mask'] for _, info in resets]
+
+    try:
+        while not stop_event.is_set():
+            for i, env in enumerate(envs):
+                obs, mask = observations[i], masks[i]
+                action = policy(obs, mask, rng)
+                next_obs, reward, terminated, truncated, info = env.step(action)
+                step = {
+                    'hand': obs['hand'],
+                    'discards': obs['discards'],
+                    'dora_indicators': obs['dora_indicators'],
+                    'current_player': obs['current_player'],
+                    'waiting_actions': obs['waiting_actions'],
+                    'action_mask': mask,
+                    'action': action,
+                    'reward': reward,
+                    'terminated': terminated,
+                    'truncated': truncated,
+                    'env_id': first_env + i,
+                }
+                if not buffer.put(step, should_stop=stop_event.is_set):
+                    return
+                if terminated or truncated:
+                    next_obs, info = env.reset()
+                observations[i], masks[i] = next_obs, info['action_mask']
+    finally:
+        buffer.close()
+
+
+class RolloutPool:
+    """
+    Self-play workers writing into shared-memory ring buffers.
+
+    Usage:
+        with RolloutPool(num_workers=4) as pool:
+            for _ in range(updates):
+                batch = pool.collect(4096)
+    """
+
+    def __init__(self, num_workers: int, envs_per_worker: int = 8, capacity: int = 16384, seed: int = 0,
+                 mahjong_type: MahjongType = MahjongType.INTERNATIONAL, policy: Policy = random_policy):
+        self.num_workers = num_workers
+        self.envs_per_worker = envs_per_worker
+        self.capacity = capacity
+        self.seed = seed
+        self.mahjong_type = mahjong_type
+        self.policy = policy
+        self.buffers: List[TrajectoryBuffer] = []
+        self.processes: List[mp.Process] = []
+        self._stop = mp.Event()
+        self._next = 0
+
+    def start(self) -> 'RolloutPool':
+        self._stop.clear()
+        for worker_id in range(self.num_workers):
+            buffer = TrajectoryBuffer(self.capacity)
+            process = mp.Process(
+                target=_worker_main,
+                args=(worker_id, buffer.name, self.capacity, self.envs_per_worker, self.seed,
+                      self.mahjong_type, self.policy, self._stop),
+                daemon=True
+            )
+            process.start()
+            self.buffers.append(buffer)
+            self.processes.append(process)
+        return self
+
+    def collect(self, batch_size: int, out: Optional[Dict[str, np.ndarray]] = None,
+                timeout: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """Block until `batch_size` steps are gathered, taking from workers round-robin"""
+        if out is None:
+            out = empty_batch(batch_size)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        filled = 0
+        while filled < batch_size:
+            progressed = False
+            for _ in range(self.num_workers):
+                buffer = self.buffers[self._next]
+                self._next = (self._next + 1) % self.num_workers
+                share = -(-(batch_size - filled) // self.num_workers)
+                taken = buffer.take(out, filled, min(share, batch_size - filled))
+                filled += taken
+                progressed = progressed or taken > 0
+                if filled == batch_size:
+                    break
+            if not progressed:
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeoutError(f"collected {filled} of {batch_size} steps")
+                if not any(process.is_alive() for process in self.processes):
+                    raise RuntimeError("all rollout workers exited")
+                time.sleep(0.0005)
+        return out
+
+    def close(self):
+        self._stop.set()
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for buffer in self.buffers:
+            buffer.close()
+        self.buffers, self.processes = [], []
+
+    def __enter__(self) -> 'RolloutPool':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
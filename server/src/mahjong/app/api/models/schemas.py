@@ -1,6 +1,6 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 class UserBase(BaseModel):
     username: str
@@ -23,9 +23,30 @@ class UserResponse(UserBase):
     class Config:
         from_attributes = True
 
+class UserBatch(BaseModel):
+    ids: List[int] = Field(default_factory=list, max_length=500)
+    usernames: List[str] = Field(default_factory=list, max_length=500)
+
+class UserPage(BaseModel):
+    users: List[UserResponse]
+    next: Optional[str] = None
+
 class Token(BaseModel):
     access_token: str
     token_type: str
 
 class TokenData(BaseModel):
-    username: Optional[str] = None 
\ No newline at end of file
+    username: Optional[str] = None 
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    username: str
+    win_count: int
+    lose_count: int
+    total_score: float
+
+class LeaderboardPage(BaseModel):
+    limit: int
+    entries: List[LeaderboardEntry]
+    # 下一页的游标，最后一页为空
+    next: Optional[str] = None
\ No newline at end of file
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Float
+from sqlalchemy import Column, Integer, String, DateTime, Float, Index
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -15,4 +15,10 @@ class User(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     win_count = Column(Integer, default=0)
     lose_count = Column(Integer, default=0)
-    total_score = Column(Float, default=0.0) 
\ No newline at end of file
+    total_score = Column(Float, default=0.0)
+
+# 排行榜顺序：总分、胜场降序，同分按注册先后；排名与分页都沿此索引扫描，不做全表排序
+leaderboard_index = Index("ix_users_leaderboard", User.total_score.desc(), User.win_count.desc(), User.id)
+
+# 按注册时间做键集分页
+created_index = Index("ix_users_created", User.created_at, User.id)
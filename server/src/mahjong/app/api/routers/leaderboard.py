@@ -0,0 +1,41 @@
+import base64
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from mahjong.app.api.models.schemas import LeaderboardEntry, LeaderboardPage
+from mahjong.app.api.models.user import User
+from mahjong.app.auth.security import get_current_user
+from mahjong.app.cache import get_cache
+from mahjong.app.config.database import get_db
+from mahjong.app.leaderboard import Key, entry, rank_of, top_entries
+
+router = APIRouter()
+
+def _encode_cursor(key: Key) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode()
+
+def _decode_cursor(cursor: str) -> Key:
+    try:
+        score, wins, user_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(score), int(wins), int(user_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+@router.get("", response_model=LeaderboardPage)
+async def read_leaderboard(limit: int = Query(20, ge=1, le=100), after: Optional[str] = None,
+                           db: AsyncSession = Depends(get_db), cache=Depends(get_cache)):
+    # 首页直接读缓存；之后按上一页返回的 next 游标沿排行榜索引继续（键集分页）
+    key = None if after is None else _decode_cursor(after)
+    entries, next_key = await top_entries(db, cache, limit, key)
+    return {"limit": limit, "entries": entries, "next": None if next_key is None else _encode_cursor(next_key)}
+
+@router.get("/me", response_model=LeaderboardEntry)
+async def read_my_rank(current_user: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(User).where(User.username == current_user.username).limit(1))
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return entry(user, await rank_of(db, user))
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from mahjong.core import instrument
+from mahjong.app.auth.hashing import PasswordHasher, get_password_hasher
+from mahjong.app.game import ResultBuffer, get_result_buffer
+from mahjong.app.inference import InferenceServer, get_inference_server
+
+router = APIRouter()
+# Prometheus 抓取地址，挂在根路径 /metrics
+exporter = APIRouter()
+
+@router.get("/hashing")
+async def hashing_metrics(hasher: PasswordHasher = Depends(get_password_hasher)):
+    # 密码哈希线程池的排队深度与耗时
+    return hasher.metrics()
+
+@router.get("/results")
+async def result_metrics(results: ResultBuffer = Depends(get_result_buffer)):
+    # 对局结果缓冲区的积压与批量写入次数
+    return results.metrics()
+
+@router.get("/inference")
+async def inference_metrics(server: InferenceServer = Depends(get_inference_server)):
+    # AI 推理的批大小、排队与模型耗时
+    return server.metrics()
+
+@router.get("/instrumentation")
+async def instrumentation_metrics():
+    # 热点函数与接口的耗时直方图、慢调用采样（需 MAHJONG_INSTRUMENT=1）
+    return {'enabled': instrument.enabled(), **instrument.registry.snapshot()}
+
+@exporter.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(instrument.registry.prometheus(), media_type="text/plain; version=0.0.4")
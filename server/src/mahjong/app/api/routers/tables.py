@@ -0,0 +1,128 @@
+import asyncio
+import logging
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
+from pydantic import BaseModel
+
+from mahjong.core.types import MahjongType
+from mahjong.app.auth.security import authenticate_token, get_current_user
+from mahjong.app.cache import get_cache
+from mahjong.app.game import SeatTaken, TableManager, TableBusy, TooManyTables, get_table_manager
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+class TableCreate(BaseModel):
+    mahjong_type: MahjongType = MahjongType.INTERNATIONAL
+    seed: Optional[int] = None
+    # Seats played by the server's policy
+    bots: List[int] = []
+
+
+class TableResponse(BaseModel):
+    id: str
+    mahjong_type: MahjongType
+    num_players: int
+    game: int
+    step: int
+    bots: List[int]
+    creator: Optional[str] = None
+
+
+def _table_response(table) -> TableResponse:
+    return TableResponse(id=table.id, mahjong_type=table.mahjong_type, num_players=table.num_players,
+                         game=table.game, step=table.step_count, bots=sorted(table.bots), creator=table.creator)
+
+
+@router.post("", response_model=TableResponse, status_code=status.HTTP_201_CREATED)
+async def create_table(options: TableCreate, manager: TableManager = Depends(get_table_manager),
+                       current_user: str = Depends(get_current_user)):
+    try:
+        table = manager.create(options.mahjong_type, seed=options.seed, bots=options.bots, creator=current_user.username)
+    except TooManyTables as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return _table_response(table)
+
+
+@router.get("", response_model=List[TableResponse])
+async def list_tables(manager: TableManager = Depends(get_table_manager),
+                      current_user: str = Depends(get_current_user)):
+    return [_table_response(table) for table in manager.list()]
+
+
+@router.delete("/{table_id}")
+async def close_table(table_id: str, manager: TableManager = Depends(get_table_manager),
+                      current_user: str = Depends(get_current_user)):
+    table = manager.get(table_id)
+    if table is None:
+        raise HTTPException(status_code=404, detail="Table not found")
+    if table.creator != current_user.username:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only the table's creator may close it")
+    await manager.close(table_id)
+    return {"message": "Table closed"}
+
+
+@router.websocket("/{table_id}/ws")
+async def play(websocket: WebSocket, table_id: str, seat: int, token: Optional[str] = None,
+               manager: TableManager = Depends(get_table_manager), cache=Depends(get_cache)):
+    """
+    Join a table as `seat`. The server sends a `state` message and then one `diff` per step;
+    the client sends `{"action": <int>}` when it is its turn. With an access `token` the user
+    takes the seat and its results count towards that user's statistics; a seat taken by a
+    user only accepts connections with that user's token.
+    """
+    table = manager.get(table_id)
+    if table is None or not 0 <= seat < table.num_players:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    username = None
+    if token is not None:
+        username = await authenticate_token(token, cache)
+        if username is None:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        try:
+            table.sit(seat, username)
+        except SeatTaken:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+    elif not table.may_act(seat, None):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+    subscription = table.subscribe(seat)
+
+    async def send_updates():
+        while True:
+            await websocket.send_json(await subscription.get())
+
+    sender = asyncio.create_task(send_updates())
+    try:
+        while True:
+            try:
+                # Malformed frames (not JSON, or no integer action) are answered, not fatal
+                message = await websocket.receive_json()
+                action = int(message["action"])
+            except (KeyError, TypeError, ValueError):
+                subscription.push({"type": "error", "detail": "expected {\"action\": <int>}"})
+                continue
+            # The seat may have been taken by a signed-in user since this client joined
+            if not table.may_act(seat, username):
+                subscription.push({"type": "error", "detail": f"seat {seat} belongs to another player"})
+                continue
+            try:
+                table.submit(seat, action)
+            except TableBusy as exc:
+                subscription.push({"type": "error", "detail": str(exc)})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        subscription.close()
+        error = (await asyncio.gather(sender, return_exceptions=True))[0]
+        if error is not None and not isinstance(error, (asyncio.CancelledError, WebSocketDisconnect)):
+            logger.warning("Sending to seat %d of table %s failed", seat, table_id, exc_info=error)
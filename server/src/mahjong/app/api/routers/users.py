@@ -1,25 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from datetime import timedelta
+import base64
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import or_, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import datetime, timedelta
 
-from mahjong.app.api.models.schemas import UserCreate, UserResponse, UserLogin, Token
+from mahjong.app.api.models.schemas import UserCreate, UserResponse, UserLogin, Token, UserBatch, UserPage
 from mahjong.app.api.models.user import User
 from mahjong.app.auth.security import (
-    verify_password,
-    get_password_hash,
     create_access_token,
     ACCESS_TOKEN_EXPIRE_MINUTES,
     get_current_user
 )
+from mahjong.app.auth.hashing import PasswordHasher, HasherBusy, get_password_hasher
 from mahjong.app.config.database import get_db
+from mahjong.app.cache import get_cache, get_profile, set_profile
 
 router = APIRouter()
 
+def _busy(exc: HasherBusy) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is busy, please retry",
+        headers={"Retry-After": str(int(exc.retry_after))},
+    )
+
 @router.post("/register", response_model=UserResponse)
-def register_user(user: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user: UserCreate, db: AsyncSession = Depends(get_db),
+                        hasher: PasswordHasher = Depends(get_password_hasher)):
     # 检查用户名是否已存在
-    db_user = db.query(User).filter(User.username == user.username).first()
+    db_user = await db.scalar(select(User).where(User.username == user.username).limit(1))
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -27,30 +40,51 @@ def register_user(user: UserCreate, db: Session = Depends(get_db)):
         )
     
     # 检查邮箱是否已存在
-    db_user = db.query(User).filter(User.email == user.email).first()
+    db_user = await db.scalar(select(User).where(User.email == user.email).limit(1))
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    # 创建新用户
-    hashed_password = get_password_hash(user.password)
+    # 创建新用户（bcrypt 计算量大，交给有界的哈希线程池，排队已满时返回 503）
+    # 哈希期间先归还数据库连接
+    await db.close()
+    try:
+        hashed_password = await hasher.hash(user.password)
+    except HasherBusy as exc:
+        raise _busy(exc)
     db_user = User(
         username=user.username,
         email=user.email,
         hashed_password=hashed_password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # 并发注册同名用户时，由唯一约束兜底
+        await db.rollback()
+        taken = await db.scalar(select(User.id).where(User.username == user.username).limit(1))
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Username already registered" if taken else "Email already registered"
+        )
+    await db.refresh(db_user)
     return db_user
 
 @router.post("/login", response_model=Token)
-def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(user_credentials: UserLogin, db: AsyncSession = Depends(get_db),
+                hasher: PasswordHasher = Depends(get_password_hasher)):
     # 验证用户
-    user = db.query(User).filter(User.username == user_credentials.username).first()
-    if not user or not verify_password(user_credentials.password, user.hashed_password):
+    user = await db.scalar(select(User).where(User.username == user_credentials.username).limit(1))
+    # 校验密码期间不占用数据库连接
+    await db.close()
+    try:
+        valid = user is not None and await hasher.verify(user_credentials.password, user.hashed_password)
+    except HasherBusy as exc:
+        raise _busy(exc)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -65,15 +99,97 @@ def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=UserResponse)
-def read_users_me(current_user: str = Depends(get_current_user), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == current_user.username).first()
+async def read_users_me(current_user: str = Depends(get_current_user), db: AsyncSession = Depends(get_db),
+                        cache=Depends(get_cache)):
+    # 先读缓存，未命中再查库并回填
+    profile = await get_profile(cache, current_user.username)
+    if profile is not None:
+        return profile
+    user = await db.scalar(select(User).where(User.username == current_user.username).limit(1))
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    profile = UserResponse.model_validate(user).model_dump(mode="json")
+    await set_profile(cache, user.username, profile)
+    return profile
 
 @router.get("/users/{user_id}", response_model=UserResponse)
-def read_user(user_id: int, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.id == user_id).first()
+async def read_user(user_id: int, db: AsyncSession = Depends(get_db)):
+    db_user = await db.get(User, user_id)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
-    return db_user 
\ No newline at end of file
+    return db_user
+
+# 公开字段，列表与批量查询只取这些列，不加载完整的 ORM 对象
+PUBLIC_COLUMNS = (User.id, User.username, User.email, User.created_at, User.win_count, User.lose_count,
+                  User.total_score)
+# 导出时每次查询的行数
+EXPORT_CHUNK = 1000
+
+def _public(row) -> dict:
+    # 数据直接来自数据库，跳过逐行的 Pydantic 校验（EmailStr 校验每行约 150µs）
+    user = dict(row._mapping)
+    user["created_at"] = row.created_at.isoformat()
+    return user
+
+@router.post("/users/batch", response_model=List[UserResponse])
+async def read_users_batch(batch: UserBatch, db: AsyncSession = Depends(get_db)):
+    # 一次 IN 查询取回所有请求的用户，按 id 排序，不存在的忽略
+    if not batch.ids and not batch.usernames:
+        return []
+    rows = await db.execute(
+        select(*PUBLIC_COLUMNS)
+        .where(or_(User.id.in_(batch.ids), User.username.in_(batch.usernames)))
+        .order_by(User.id)
+    )
+    return JSONResponse([_public(row) for row in rows])
+
+def _sort_key(order: str):
+    return (User.id,) if order == "id" else (User.created_at, User.id)
+
+def _encode_cursor(row, order: str) -> str:
+    key = [row.id] if order == "id" else [row.created_at.isoformat(), row.id]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+def _decode_cursor(cursor: str, order: str) -> list:
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if order == "id":
+            (user_id,) = key
+            return [int(user_id)]
+        created_at, user_id = key
+        return [datetime.fromisoformat(created_at), int(user_id)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+def _page_query(order: str, after: Optional[list], limit: int):
+    # 键集分页：从上一页最后一行之后沿索引继续扫描，代价与页码无关
+    key = _sort_key(order)
+    query = select(*PUBLIC_COLUMNS).order_by(*key).limit(limit)
+    if after is not None:
+        query = query.where(tuple_(*key) > tuple_(*after) if len(key) > 1 else key[0] > after[0])
+    return query
+
+async def _export(db: AsyncSession, order: str, after: Optional[list]):
+    while True:
+        rows = (await db.execute(_page_query(order, after, EXPORT_CHUNK))).all()
+        if not rows:
+            return
+        yield "".join(json.dumps(_public(row)) + "\n" for row in rows)
+        last = rows[-1]
+        after = [last.id] if order == "id" else [last.created_at, last.id]
+
+@router.get("/users", response_model=UserPage)
+async def list_users(limit: int = Query(100, ge=1, le=1000), after: Optional[str] = None,
+                     order: str = Query("id", pattern="^(id|created_at)$"),
+                     format: str = Query("json", pattern="^(json|ndjson)$"),
+                     db: AsyncSession = Depends(get_db)):
+    """
+    List users in `order`, `limit` per page; pass the previous page's `next` as `after`.
+    With `format=ndjson` every user from `after` on is streamed, one JSON object per line.
+    """
+    key = None if after is None else _decode_cursor(after, order)
+    if format == "ndjson":
+        return StreamingResponse(_export(db, order, key), media_type="application/x-ndjson")
+    rows = (await db.execute(_page_query(order, key, limit))).all()
+    next_cursor = _encode_cursor(rows[-1], order) if len(rows) == limit else None
+    return JSONResponse({"users": [_public(row) for row in rows], "next": next_cursor})
@@ -0,0 +1,121 @@
+"""
+Bounded worker pool for bcrypt.
+
+Hashing and verification run on a fixed number of worker threads (bcrypt
+releases the GIL), never on the event loop. At most `max_pending` operations
+may be queued or running; beyond that `HasherBusy` is raised at once with a
+retry estimate, which the API turns into 503 + Retry-After instead of letting
+a login burst build an unbounded backlog. An operation counts as pending
+until its worker finishes it, even when the awaiting request was cancelled.
+"""
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from mahjong.app.auth.security import get_password_hash, verify_password
+
+# 工作线程数与排队上限
+HASH_WORKERS = int(os.environ.get("MAHJONG_HASH_WORKERS", str(os.cpu_count() or 1)))
+HASH_QUEUE = int(os.environ.get("MAHJONG_HASH_QUEUE", str(8 * HASH_WORKERS)))
+
+
+class HasherBusy(Exception):
+    """Too many hashing operations are pending"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Password hashing is busy, retry after {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded thread pool and records queue depth and latency"""
+
+    def __init__(self, max_workers: int = HASH_WORKERS, max_pending: int = HASH_QUEUE, latency_window: int = 1024):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.max_depth = 0
+        self.completed = 0
+        self.rejected = 0
+        self._latencies = deque(maxlen=latency_window)  # seconds spent hashing
+        self._waits = deque(maxlen=latency_window)  # seconds spent queued
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(get_password_hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._submit(verify_password, password, hashed_password)
+
+    async def _submit(self, fn: Callable, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HasherBusy(self.retry_after())
+            self.pending += 1
+            self.max_depth = max(self.max_depth, self.pending)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="bcrypt")
+        queued = time.perf_counter()
+        future = self._executor.submit(self._timed, fn, queued, args)
+        # Released when the work itself ends, not when the caller stops waiting for it
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future):
+        with self._lock:
+            self.pending -= 1
+
+    def _timed(self, fn: Callable, queued: float, args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self._waits.append(start - queued)
+                self._latencies.append(end - start)
+                self.completed += 1
+
+    def retry_after(self) -> float:
+        """Seconds until the current queue should have drained"""
+        mean = float(np.mean(self._latencies)) if self._latencies else 0.25
+        return max(1.0, math.ceil(self.pending * mean / self.max_workers))
+
+    def metrics(self) -> Dict[str, float]:
+        with self._lock:
+            latencies = np.asarray(self._latencies) * 1000
+            waits = np.asarray(self._waits) * 1000
+            metrics = {
+                'workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'queue_depth': self.pending,
+                'max_queue_depth': self.max_depth,
+                'completed': self.completed,
+                'rejected': self.rejected,
+            }
+        for name, samples in (('hash_ms', latencies), ('wait_ms', waits)):
+            if len(samples):
+                metrics[f'{name}_p50'] = float(np.percentile(samples, 50))
+                metrics[f'{name}_p99'] = float(np.percentile(samples, 99))
+        return metrics
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
+
+
+def get_password_hasher() -> PasswordHasher:
+    return password_hasher
@@ -1,3 +1,4 @@
+import os
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
@@ -5,13 +6,17 @@ from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from mahjong.app.api.models.schemas import TokenData
+from mahjong.app.cache import get_cache, get_verified_token, remember_token
 
 # 配置密钥和算法
 SECRET_KEY = "your-secret-key-please-change-in-production"  # 在生产环境中应该使用环境变量
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt 计算成本（2^rounds 次迭代），已有哈希按其自身成本校验
+BCRYPT_ROUNDS = int(os.environ.get("MAHJONG_BCRYPT_ROUNDS", "12"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -30,18 +35,27 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+async def authenticate_token(token: str, cache) -> Optional[str]:
+    """Username carried by a valid token, or None"""
+    # 已验证过且未过期的令牌直接命中缓存，无需再次解码验签
+    username = await get_verified_token(cache, token)
+    if username is not None:
+        return username
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username)
     except JWTError:
-        raise credentials_exception
-    return token_data 
\ No newline at end of file
+        return None
+    username = payload.get("sub")
+    if username is not None and payload.get("exp") is not None:
+        await remember_token(cache, token, username, payload["exp"])
+    return username
+
+async def get_current_user(token: str = Depends(oauth2_scheme), cache=Depends(get_cache)) -> TokenData:
+    username = await authenticate_token(token, cache)
+    if username is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return TokenData(username=username)
@@ -0,0 +1,173 @@
+"""
+Pluggable key/value cache for hot authenticated reads.
+
+Two caches sit on top of one backend:
+- verified JWTs, keyed by the SHA-256 of the token and expiring with its `exp`
+- read-through user profiles for `/me`, with a TTL, dropped whenever a commit
+  changes a user's `win_count`, `lose_count` or `total_score`
+
+The backend is an in-process `LRUCache` by default. Set MAHJONG_CACHE_URL to a
+redis:// URL to share the cache between workers; any client exposing the
+async `get`/`set(px=...)`/`delete` subset of redis-py works, so tests can pass
+a small fake.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Set
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from mahjong.app.api.models.user import User
+
+# 缓存配置
+CACHE_URL = os.environ.get("MAHJONG_CACHE_URL", "")
+CACHE_SIZE = int(os.environ.get("MAHJONG_CACHE_SIZE", "100000"))
+PROFILE_TTL = float(os.environ.get("MAHJONG_PROFILE_TTL", "60"))
+
+# 这些字段变化时需要让用户资料缓存失效
+PROFILE_STAT_FIELDS = ("win_count", "lose_count", "total_score")
+
+
+class LRUCache:
+    """In-process LRU with per-entry expiry"""
+
+    def __init__(self, maxsize: int = CACHE_SIZE, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.clock = clock
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires = item
+        if expires is not None and expires <= self.clock():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl: Optional[float] = None):
+        self._data[key] = (value, None if ttl is None else self.clock() + ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    async def delete(self, key: str):
+        self._data.pop(key, None)
+
+    def delete_nowait(self, key: str):
+        self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RedisCache:
+    """Backend over an async Redis client (redis.asyncio.Redis or a compatible fake)"""
+
+    def __init__(self, client, prefix: str = "mahjong:"):
+        self.client = client
+        self.prefix = prefix
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self.client.get(self.prefix + key)
+        if isinstance(value, bytes):
+            value = value.decode()
+        return value
+
+    async def set(self, key: str, value: str, ttl: Optional[float] = None):
+        # Redis expiries are whole milliseconds and must be positive
+        await self.client.set(self.prefix + key, value, px=None if ttl is None else max(1, int(ttl * 1000)))
+
+    async def delete(self, key: str):
+        await self.client.delete(self.prefix + key)
+
+    def delete_nowait(self, key: str):
+        """Schedule a delete from synchronous code running inside the event loop"""
+        try:
+            task = asyncio.get_running_loop().create_task(self.delete(key))
+        except RuntimeError:
+            return
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+def create_cache(url: str = CACHE_URL):
+    if not url:
+        return LRUCache()
+    import redis.asyncio
+    return RedisCache(redis.asyncio.from_url(url))
+
+
+cache = create_cache()
+
+
+def get_cache():
+    return cache
+
+
+# 令牌缓存
+
+def token_key(token: str) -> str:
+    return "jwt:" + hashlib.sha256(token.encode()).hexdigest()
+
+
+async def get_verified_token(backend, token: str) -> Optional[str]:
+    """Username of a token verified earlier and not yet expired"""
+    return await backend.get(token_key(token))
+
+
+async def remember_token(backend, token: str, username: str, expires_at: float):
+    ttl = expires_at - time.time()
+    if ttl > 0:
+        await backend.set(token_key(token), username, ttl)
+
+
+# 用户资料缓存
+
+def profile_key(username: str) -> str:
+    return "profile:" + username
+
+
+async def get_profile(backend, username: str) -> Optional[dict]:
+    value = await backend.get(profile_key(username))
+    return None if value is None else json.loads(value)
+
+
+async def set_profile(backend, username: str, profile: dict, ttl: float = PROFILE_TTL):
+    await backend.set(profile_key(username), json.dumps(profile, default=str), ttl)
+
+
+async def invalidate_profile(backend, username: str):
+    await backend.delete(profile_key(username))
+
+
+def _stats_changed(user: Any) -> bool:
+    state = inspect(user)
+    return any(state.attrs[field].history.has_changes() for field in PROFILE_STAT_FIELDS)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_stat_writes(session, flush_context, instances):
+    changed = session.info.setdefault("stale_profiles", set())
+    for obj in session.dirty:
+        if isinstance(obj, User) and _stats_changed(obj):
+            changed.add(obj.username)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_stat_writes(session):
+    for username in session.info.pop("stale_profiles", ()):
+        get_cache().delete_nowait(profile_key(username))
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_stat_writes(session):
+    session.info.pop("stale_profiles", None)
@@ -0,0 +1,6 @@
+from .table import Table, TableBusy, SeatTaken, Subscription, apply_diff
+from .results import GameResult, ResultBuffer, result_buffer, get_result_buffer
+from .manager import TableManager, TooManyTables, table_manager, get_table_manager
+
+__all__ = ['Table', 'TableBusy', 'SeatTaken', 'Subscription', 'apply_diff', 'TableManager', 'TooManyTables',
+           'table_manager', 'get_table_manager', 'GameResult', 'ResultBuffer', 'result_buffer', 'get_result_buffer']
@@ -0,0 +1,74 @@
+"""
+Hosts many `Table`s in one event loop.
+"""
+import asyncio
+import itertools
+import logging
+import os
+from typing import Dict, List, Optional
+
+from mahjong.core.types import MahjongType
+from mahjong.app.game.table import Table
+from mahjong.app.game.results import result_buffer
+from mahjong.app.inference import inference_server
+
+logger = logging.getLogger(__name__)
+
+# 每回合的默认时限（秒），超时自动打牌
+TURN_TIMEOUT = float(os.environ.get("MAHJONG_TURN_TIMEOUT", "15"))
+MAX_TABLES = int(os.environ.get("MAHJONG_MAX_TABLES", "10000"))
+
+
+class TooManyTables(Exception):
+    """The manager is already hosting `max_tables` tables"""
+
+
+class TableManager:
+    """Creates, looks up and stops tables; each table runs as its own task"""
+
+    def __init__(self, max_tables: int = MAX_TABLES, turn_timeout: float = TURN_TIMEOUT, **table_options):
+        self.max_tables = max_tables
+        self.turn_timeout = turn_timeout
+        self.table_options = table_options
+        self.tables: Dict[str, Table] = {}
+        self._ids = itertools.count(1)
+
+    def create(self, mahjong_type: MahjongType = MahjongType.INTERNATIONAL, seed: Optional[int] = None,
+               **options) -> Table:
+        """Create and start a table; must be called from the running event loop"""
+        if len(self.tables) >= self.max_tables:
+            raise TooManyTables(f"At most {self.max_tables} tables can be hosted")
+        table_id = str(next(self._ids))
+        table = Table(table_id, mahjong_type, seed=seed,
+                      **{'turn_timeout': self.turn_timeout, **self.table_options, **options})
+        self.tables[table_id] = table
+        table.start()
+        table._task.add_done_callback(lambda task: self._finished(table_id, task))
+        return table
+
+    def _finished(self, table_id: str, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Table %s crashed", table_id, exc_info=task.exception())
+            self.tables.pop(table_id, None)
+
+    def get(self, table_id: str) -> Optional[Table]:
+        return self.tables.get(table_id)
+
+    def list(self) -> List[Table]:
+        return list(self.tables.values())
+
+    async def close(self, table_id: str):
+        table = self.tables.pop(table_id, None)
+        if table is not None:
+            await table.stop()
+
+    async def shutdown(self):
+        tables, self.tables = list(self.tables.values()), {}
+        await asyncio.gather(*(table.stop() for table in tables))
+
+
+table_manager = TableManager(results=result_buffer, inference=inference_server)
+
+
+def get_table_manager() -> TableManager:
+    return table_manager
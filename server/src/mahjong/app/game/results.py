@@ -0,0 +1,178 @@
+"""
+Batched ingestion of finished games into the users' statistics.
+
+Tables `submit` a `GameResult` without waiting for the database. Results
+are buffered in memory and written by one background task, either every
+`flush_interval` seconds or as soon as `max_batch` results are waiting. A
+flush folds the batch into one delta per player and applies all of them as
+a single executemany UPDATE in one transaction, so a busy server costs
+SQLite one commit per batch instead of one per game. After the commit the
+affected profiles and the cached leaderboard are dropped. A failed write is
+retried with the next flush; after `max_retries` failures in a row the
+waiting results are logged and dropped.
+"""
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from sqlalchemy import bindparam, update
+
+from mahjong.app.api.models.user import User
+from mahjong.app.cache import get_cache, invalidate_profile
+from mahjong.app.config.database import AsyncSessionLocal
+from mahjong.app.leaderboard import invalidate_leaderboard
+
+logger = logging.getLogger(__name__)
+
+# 批量写入的时间间隔（毫秒）与批大小
+RESULT_FLUSH_MS = float(os.environ.get("MAHJONG_RESULT_FLUSH_MS", "500"))
+RESULT_BATCH = int(os.environ.get("MAHJONG_RESULT_BATCH", "256"))
+# 连续写入失败多少次后丢弃积压的结果
+RESULT_RETRIES = int(os.environ.get("MAHJONG_RESULT_RETRIES", "3"))
+
+users = User.__table__
+UPDATE_STATS = (
+    update(users)
+    .where(users.c.username == bindparam("name"))
+    .values(win_count=users.c.win_count + bindparam("wins"),
+            lose_count=users.c.lose_count + bindparam("losses"),
+            total_score=users.c.total_score + bindparam("score"))
+)
+
+
+@dataclass
+class GameResult:
+    """Score change per username for one finished game
+
+    Every listed player other than `winner` is charged a loss, unless the game
+    was a draw. `winner` is None when the winning seat had no signed-in player.
+    """
+    scores: Dict[str, float]
+    winner: Optional[str] = None
+    draw: bool = False
+
+
+@dataclass
+class _Delta:
+    wins: int = 0
+    losses: int = 0
+    score: float = 0.0
+
+
+class ResultBuffer:
+    """Buffers game results and writes them in batches"""
+
+    def __init__(self, session_factory=AsyncSessionLocal, flush_interval: float = RESULT_FLUSH_MS / 1000,
+                 max_batch: int = RESULT_BATCH, max_retries: int = RESULT_RETRIES):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self.pending: List[GameResult] = []
+        self.flushed = 0
+        self.batches = 0
+        self.failures = 0
+        self.dropped = 0
+        self._retries = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    def submit(self, result: GameResult):
+        """Queue a result; must be called from the running event loop"""
+        self.pending.append(result)
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="result-buffer")
+        if len(self.pending) >= self.max_batch:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write every pending result now; returns how many were written"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            batch, self.pending = self.pending, []
+            if not batch:
+                return 0
+            deltas = _fold(batch)
+            try:
+                async with self.session_factory() as db:
+                    await db.execute(UPDATE_STATS, [
+                        {'name': name, 'wins': d.wins, 'losses': d.losses, 'score': d.score}
+                        for name, d in deltas.items()
+                    ])
+                    await db.commit()
+            except asyncio.CancelledError:
+                self.pending[:0] = batch
+                raise
+            except Exception:
+                logger.exception("Failed to write %d game results", len(batch))
+                self.failures += 1
+                self._retries += 1
+                if self._retries > self.max_retries:
+                    # 重试次数用尽，丢弃这批结果，避免积压无限增长
+                    logger.error("Dropping %d game results after %d failed writes: %s",
+                                 len(batch), self._retries, batch)
+                    self.dropped += len(batch)
+                    self._retries = 0
+                else:
+                    # 写入失败时把结果放回队首，下一轮重试
+                    self.pending[:0] = batch
+                return 0
+            self._retries = 0
+            self.flushed += len(batch)
+            self.batches += 1
+        backend = get_cache()
+        for name in deltas:
+            await invalidate_profile(backend, name)
+        await invalidate_leaderboard(backend)
+        return len(batch)
+
+    async def stop(self):
+        """Stop the background task and write what is left"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def metrics(self) -> Dict[str, int]:
+        return {'pending': len(self.pending), 'flushed': self.flushed, 'batches': self.batches,
+                'failures': self.failures, 'dropped': self.dropped}
+
+
+def _fold(results: List[GameResult]) -> Dict[str, _Delta]:
+    deltas: Dict[str, _Delta] = {}
+    for result in results:
+        for name, score in result.scores.items():
+            delta = deltas.setdefault(name, _Delta())
+            delta.score += score
+            if result.draw:
+                continue
+            if name == result.winner:
+                delta.wins += 1
+            else:
+                delta.losses += 1
+    return deltas
+
+
+result_buffer = ResultBuffer()
+
+
+def get_result_buffer() -> ResultBuffer:
+    return result_buffer
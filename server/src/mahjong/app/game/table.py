@@ -0,0 +1,335 @@
+"""
+One game table: a `MahjongEnv` driven by its own asyncio task.
+
+Clients push actions into the table's bounded queue and receive messages
+through per-seat subscriptions. A seat first gets a full `state` message and
+then one compact `diff` per step, holding only the entries of its view that
+changed. The acting seat has `turn_timeout` seconds; when it expires the
+table passes on an open claim for it, or discards (the tile it just drew
+when possible). A signed-in player may `sit` in one free seat per table;
+only that player may then act for the seat. Their seats are scored at the
+end of each game and the result goes to the table's `ResultBuffer`; wins
+are worth the points of the hand under the variant's scoring system (see
+`mahjong.core.scoring`). Seats listed in `bots` are played by the policy of
+an `InferenceServer`, which batches their requests with those of every other
+table. `checkpoint()` returns the game in progress as `GameState` bytes (see
+`mahjong.core.state`), which `resume()` loads back, on this table or on a
+table in another process.
+"""
+import asyncio
+from typing import Dict, List, Optional, Sequence, Set
+
+import numpy as np
+
+from mahjong.core.types import ActionType, MahjongType, TileType
+from mahjong.core.env import MahjongEnv, SPECIAL_ACTIONS
+from mahjong.core.state import GameState
+from mahjong.app.game.results import GameResult, ResultBuffer
+from mahjong.app.inference import InferenceServer
+
+PASS = len(TileType) + SPECIAL_ACTIONS.index(ActionType.PASS)
+
+
+class TableBusy(Exception):
+    """The table's action queue is full"""
+
+
+class SeatTaken(Exception):
+    """The seat belongs to someone else, or the user already has a seat"""
+
+
+class Subscription:
+    """Outgoing messages for one connected seat"""
+
+    def __init__(self, table: 'Table', seat: int, maxsize: int):
+        self.table = table
+        self.seat = seat
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    def push(self, message: Dict):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # A slow client cannot apply the diffs it missed: drop them and resync with a full state
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(self.table.state(self.seat))
+
+    async def get(self) -> Dict:
+        return await self.queue.get()
+
+    def close(self):
+        self.table.unsubscribe(self)
+
+
+class Table:
+    """A Mahjong table hosted by a `TableManager`"""
+
+    def __init__(self, table_id: str, mahjong_type: MahjongType = MahjongType.INTERNATIONAL, num_players: int = 4,
+                 turn_timeout: float = 15.0, queue_size: int = 16, subscriber_queue_size: int = 64,
+                 restart_delay: float = 0.0, seed: Optional[int] = None, results: Optional[ResultBuffer] = None,
+                 bots: Sequence[int] = (), inference: Optional[InferenceServer] = None,
+                 creator: Optional[str] = None):
+        if any(not 0 <= seat < num_players for seat in bots):
+            raise ValueError(f"Bot seats must be between 0 and {num_players - 1}")
+        if bots and inference is None:
+            raise ValueError("Bot seats need an inference server")
+        self.id = table_id
+        self.mahjong_type = mahjong_type
+        self.num_players = num_players
+        self.turn_timeout = turn_timeout
+        self.restart_delay = restart_delay
+        self.seed = seed
+        self.env = MahjongEnv(num_players=num_players, mahjong_type=mahjong_type, score_wins=True)
+        self.actions: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.subscribers: Dict[int, Set[Subscription]] = {seat: set() for seat in range(num_players)}
+        self.subscriber_queue_size = subscriber_queue_size
+        self.players: Dict[int, str] = {}
+        self.results = results
+        self.bots = frozenset(bots)
+        self.inference = inference
+        # The user who opened the table; only they may close it through the API
+        self.creator = creator
+        self.game = 0
+        self.step_count = 0
+        self.timeouts = 0
+        self._shared: Dict = {}
+        self._views: List[Dict] = []
+        self._last_draw: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # Lifecycle
+
+    def start(self):
+        self._new_game(self.seed)
+        self._task = asyncio.create_task(self._run(), name=f"table-{self.id}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    # Client side
+
+    def subscribe(self, seat: int) -> Subscription:
+        """Listen as `seat`; the first message is the full state"""
+        if not 0 <= seat < self.num_players:
+            raise ValueError(f"Seat must be between 0 and {self.num_players - 1}")
+        subscription = Subscription(self, seat, self.subscriber_queue_size)
+        subscription.push(self.state(seat))
+        self.subscribers[seat].add(subscription)
+        return subscription
+
+    def sit(self, seat: int, username: str):
+        """
+        Credit `seat`'s results to `username` from now on. Raises `SeatTaken` when the seat
+        is a bot's or another user's, or when `username` already sits elsewhere at this table.
+        """
+        if not 0 <= seat < self.num_players:
+            raise ValueError(f"Seat must be between 0 and {self.num_players - 1}")
+        if seat in self.bots:
+            raise SeatTaken(f"Seat {seat} is played by a bot")
+        occupant = self.players.get(seat)
+        if occupant == username:
+            return
+        if occupant is not None:
+            raise SeatTaken(f"Seat {seat} is taken")
+        if username in self.players.values():
+            raise SeatTaken(f"{username} already has a seat at table {self.id}")
+        self.players[seat] = username
+
+    def may_act(self, seat: int, username: Optional[str]) -> bool:
+        """Whether a client signed in as `username` (None when anonymous) may act for `seat`"""
+        occupant = self.players.get(seat)
+        return occupant is None or occupant == username
+
+    def unsubscribe(self, subscription: Subscription):
+        self.subscribers[subscription.seat].discard(subscription)
+
+    def submit(self, seat: int, action: int):
+        """Queue an action; raises `TableBusy` when the queue is full"""
+        try:
+            self.actions.put_nowait((seat, int(action)))
+        except asyncio.QueueFull:
+            raise TableBusy(f"Table {self.id} is busy")
+
+    # Table task
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            seat = self.env.current_player
+            deadline = loop.time() + self.turn_timeout
+            action = await self._bot_action(seat) if seat in self.bots else None
+            while action is None:
+                remaining = deadline - loop.time()
+                try:
+                    sender, candidate = await asyncio.wait_for(self.actions.get(), max(remaining, 0))
+                except asyncio.TimeoutError:
+                    action = self._auto_action()
+                    self.timeouts += 1
+                    break
+                if sender != seat:
+                    self._error(sender, "not your turn")
+                elif not 0 <= candidate < self.env.action_space.n or not self.env.action_mask[candidate]:
+                    self._error(sender, f"illegal action {candidate}")
+                else:
+                    action = candidate
+
+            done = self._apply(seat, action)
+            if done:
+                if self.restart_delay:
+                    await asyncio.sleep(self.restart_delay)
+                self._new_game()
+            # Let clients and other tables run between steps
+            await asyncio.sleep(0)
+
+    async def _bot_action(self, seat: int) -> int:
+        """The policy's action, or the timeout action when inference fails or takes longer than a turn"""
+        try:
+            return await asyncio.wait_for(self.inference.act(self.env, seat), self.turn_timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            return self._auto_action()
+        except Exception:
+            return self._auto_action()
+
+    def _auto_action(self) -> int:
+        """Pass on an open claim, discard the tile just drawn, or take the first legal action"""
+        if self.env.action_mask[PASS]:
+            return PASS
+        if self._last_draw is not None and self.env.action_mask[self._last_draw]:
+            return self._last_draw
+        return int(self.env.action_mask.argmax())
+
+    def _apply(self, seat: int, action: int) -> bool:
+        tiles_left = self.env.tiles_left
+        _, reward, terminated, truncated, _ = self.env.step(action)
+        self.step_count += 1
+        self._last_draw = self._drawn_tile(tiles_left)
+        done = terminated or truncated
+        common = {'n': self.step_count, 'p': seat, 'a': action, 'r': reward}
+        if done:
+            common.update(done=True, winner=seat if terminated else None)
+            self._record_result(seat if terminated else None, reward)
+        shared = self._shared_view()
+        common.update(_diff(self._shared, shared))
+        self._shared = shared
+        for player in range(self.num_players):
+            view = self._seat_view(player)
+            message = {'type': 'diff', **common, **_diff(self._views[player], view)}
+            if player == self.env.current_player and not done:
+                message['legal'] = np.flatnonzero(self.env.action_mask).tolist()
+            self._views[player] = view
+            self._broadcast(player, message)
+        return done
+
+    def _record_result(self, winner: Optional[int], reward: float):
+        """The winner takes the points of its hand and the other seats share the loss"""
+        if self.results is None or not self.players:
+            return
+        scores = {}
+        for seat, username in self.players.items():
+            if winner is None:
+                scores[username] = 0.0
+            elif seat == winner:
+                scores[username] = float(reward)
+            else:
+                scores[username] = -float(reward) / (self.num_players - 1)
+        self.results.submit(GameResult(scores, self.players.get(winner), draw=winner is None))
+
+    def _drawn_tile(self, tiles_left: int) -> Optional[int]:
+        if self.env.tiles_left < tiles_left:
+            return int(self.env.wall[self.env.wall_pos - 1])
+        return None
+
+    def _new_game(self, seed: Optional[int] = None):
+        self.env.reset(seed=seed)
+        self.game += 1
+        self.step_count = 0
+        self._send_states()
+
+    # Checkpoints
+
+    def checkpoint(self) -> bytes:
+        """The game in progress as `GameState` bytes, to write to disk or ship to another process"""
+        return bytes(self.env.get_state())
+
+    def resume(self, data: bytes):
+        """Continue the game saved by `checkpoint()`; every seat gets a full state message"""
+        self.env.set_state(GameState.from_bytes(data))
+        self._send_states()
+
+    def _send_states(self):
+        self._last_draw = int(self.env.wall[self.env.wall_pos - 1])
+        self._shared = self._shared_view()
+        self._views = [self._seat_view(player) for player in range(self.num_players)]
+        for player in range(self.num_players):
+            self._broadcast(player, self.state(player))
+
+    # Messages
+
+    def _shared_view(self) -> Dict:
+        """What every seat sees; diffed once per step"""
+        env = self.env
+        return {'discards': env.discard_counts.tolist(), 'turn': env.current_player, 'left': env.tiles_left}
+
+    def _seat_view(self, seat: int) -> Dict:
+        """What only `seat` sees"""
+        env = self.env
+        return {
+            'hand': env.hand_counts[seat].tolist(),
+            'waiting': env.waiting_actions.tolist() if seat == env.current_player else [0] * 5,
+        }
+
+    def state(self, seat: int) -> Dict:
+        """Full state message for `seat`"""
+        message = {'type': 'state', 'table': self.id, 'game': self.game, 'n': self.step_count, 'seat': seat,
+                   'dora': self.env.dora_array.tolist(), **self._shared_view(), **self._seat_view(seat)}
+        if seat == self.env.current_player:
+            message['legal'] = np.flatnonzero(self.env.action_mask).tolist()
+        return message
+
+    def _broadcast(self, seat: int, message: Dict):
+        for subscription in list(self.subscribers[seat]):
+            subscription.push(message)
+
+    def _error(self, seat: int, detail: str):
+        self._broadcast(seat, {'type': 'error', 'detail': detail})
+
+
+def _diff(before: Dict, after: Dict) -> Dict:
+    """Changed entries only: lists become [[index, value], ...], scalars their new value"""
+    changes = {}
+    for key, value in after.items():
+        old = before[key]
+        if isinstance(value, list):
+            changed = [[i, v] for i, (o, v) in enumerate(zip(old, value)) if o != v]
+            if changed:
+                changes[key] = changed
+        elif value != old:
+            changes[key] = value
+    return changes
+
+
+def apply_diff(view: Dict, message: Dict) -> Dict:
+    """Client-side helper: update a `state` view in place with a `diff` message"""
+    view['legal'] = message.get('legal', [])
+    for key, value in message.items():
+        if key not in view or key in ('n', 'type', 'legal'):
+            continue
+        if isinstance(view[key], list):
+            for index, item in value:
+                view[key][index] = item
+        else:
+            view[key] = value
+    view['n'] = message['n']
+    return view
@@ -0,0 +1,185 @@
+"""
+Micro-batched policy inference for AI seats.
+
+Tables `await act(env, seat)` (or `infer(features, mask)`) and get a legal
+action back through a future. Requests wait until `max_batch` of them are
+queued or the oldest has waited `max_wait_us`, then the whole batch is copied
+into preallocated buffers and the policy runs once on a dedicated thread, so
+thousands of bot seats cost one model call per batch instead of one per seat
+and the event loop never blocks on the model.
+
+The policy comes from `MAHJONG_POLICY_MODEL` (an `.onnx` file or `.npz`
+linear weights, see `mahjong.ai.policy`); without one a random linear policy
+is used. It is loaded once, on the inference thread, by `load()` (called at
+startup, or by the first batch); a model that fails to load fails every
+batch without being loaded again.
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, Optional, Tuple
+
+import numpy as np
+
+from mahjong.core.features import FeatureEncoder
+from mahjong.ai.policy import NUM_ACTIONS, BatchPolicy, load_policy, masked_argmax
+
+logger = logging.getLogger(__name__)
+
+# 推理批大小上限、最长等待时间（微秒）与模型文件
+INFER_BATCH = int(os.environ.get("MAHJONG_INFER_BATCH", "64"))
+INFER_WAIT_US = float(os.environ.get("MAHJONG_INFER_WAIT_US", "2000"))
+POLICY_MODEL = os.environ.get("MAHJONG_POLICY_MODEL", "")
+
+
+class InferenceServer:
+    """Collects inference requests into micro-batches and records batch size and latency"""
+
+    def __init__(self, policy: Optional[BatchPolicy] = None, max_batch: int = INFER_BATCH,
+                 max_wait_us: float = INFER_WAIT_US, encoder: Optional[FeatureEncoder] = None,
+                 latency_window: int = 1024):
+        self.encoder = encoder or FeatureEncoder()
+        self.policy = policy
+        self.max_batch = max_batch
+        self.max_wait = max_wait_us / 1e6
+        self.requests = 0
+        self.batches = 0
+        self.failures = 0
+        self._load_error: Optional[Exception] = None
+        self._features = self.encoder.buffer(max_batch)
+        self._masks = np.zeros((max_batch, NUM_ACTIONS), dtype=bool)
+        self._pending: Deque[Tuple[np.ndarray, np.ndarray, asyncio.Future, float]] = deque()
+        self._sizes = deque(maxlen=latency_window)
+        self._latencies = deque(maxlen=latency_window)  # seconds per policy call
+        self._waits = deque(maxlen=latency_window)  # seconds from request to result
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._full: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def act(self, env, seat: Optional[int] = None) -> int:
+        """Action of `seat` (the current player by default) in a `MahjongEnv`"""
+        return await self.infer(self.encoder.encode(env, seat), env.action_mask.copy())
+
+    async def infer(self, features: np.ndarray, mask: np.ndarray) -> int:
+        """Best legal action for one (channels, 34) feature tensor; must be called from the running event loop"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((features, mask, future, time.perf_counter()))
+        self.requests += 1
+        if self._task is None or self._task.done():
+            self._wakeup, self._full = asyncio.Event(), asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="inference")
+        self._wakeup.set()
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+        return await future
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._pending:
+                delay = self.max_wait - (time.perf_counter() - self._pending[0][3])
+                if len(self._pending) < self.max_batch and delay > 0:
+                    try:
+                        await asyncio.wait_for(self._full.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                self._full.clear()
+                batch = [self._pending.popleft() for _ in range(min(self.max_batch, len(self._pending)))]
+                await self._run_batch(batch)
+
+    def _thread(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(1, thread_name_prefix="inference")
+        return self._executor
+
+    async def load(self) -> BatchPolicy:
+        """Load the policy off the event loop; a failed load is remembered and raised again"""
+        if self.policy is None and self._load_error is None:
+            try:
+                self.policy = await asyncio.get_running_loop().run_in_executor(
+                    self._thread(), load_policy, POLICY_MODEL, self.encoder)
+            except Exception as exc:
+                logger.exception("Could not load the policy model %r", POLICY_MODEL)
+                self._load_error = exc
+        if self._load_error is not None:
+            raise self._load_error.with_traceback(None)
+        return self.policy
+
+    async def _run_batch(self, batch):
+        size = len(batch)
+        for i, (features, mask, _, _) in enumerate(batch):
+            self._features[i] = features
+            self._masks[i] = mask
+        start = time.perf_counter()
+        try:
+            # A model that fails to load fails this batch like a failed forward pass
+            await self.load()
+            actions = await asyncio.get_running_loop().run_in_executor(self._thread(), self._forward, size)
+        except asyncio.CancelledError:
+            for _, _, future, _ in batch:
+                future.cancel()
+            raise
+        except Exception as exc:
+            logger.exception("Inference failed for a batch of %d", size)
+            self.failures += 1
+            for _, _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        end = time.perf_counter()
+        self.batches += 1
+        self._sizes.append(size)
+        self._latencies.append(end - start)
+        for (_, _, future, queued), action in zip(batch, actions.tolist()):
+            self._waits.append(end - queued)
+            if not future.done():
+                future.set_result(action)
+
+    def _forward(self, size: int) -> np.ndarray:
+        logits = self.policy(self._features[:size])
+        return masked_argmax(logits, self._masks[:size])
+
+    def metrics(self) -> Dict[str, float]:
+        metrics = {
+            'max_batch': self.max_batch,
+            'max_wait_us': self.max_wait * 1e6,
+            'pending': len(self._pending),
+            'requests': self.requests,
+            'batches': self.batches,
+            'failures': self.failures,
+        }
+        if self._sizes:
+            metrics['batch_size_mean'] = float(np.mean(self._sizes))
+        for name, samples in (('batch_ms', self._latencies), ('wait_ms', self._waits)):
+            if samples:
+                samples = np.asarray(samples) * 1000
+                metrics[f'{name}_p50'] = float(np.percentile(samples, 50))
+                metrics[f'{name}_p99'] = float(np.percentile(samples, 99))
+        return metrics
+
+    async def stop(self):
+        """Stop batching; requests still queued are cancelled"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._pending:
+            self._pending.popleft()[2].cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+inference_server = InferenceServer()
+
+
+def get_inference_server() -> InferenceServer:
+    return inference_server
@@ -0,0 +1,85 @@
+"""
+Request metrics for the API, on top of `mahjong.core.instrument`.
+
+`MetricsMiddleware` is a plain ASGI middleware recording the latency of
+every HTTP request per route template, method and status, and how many SQL
+statements the request executed (counted by an engine event listener through
+a context variable). `install` turns all of it on, together with the core
+hot-path timers, when `MAHJONG_INSTRUMENT=1`; otherwise the app runs without
+any of these hooks. Metrics are served in Prometheus format at `/metrics`
+and as JSON at `/api/metrics/instrumentation`.
+"""
+import atexit
+import os
+import time
+from contextvars import ContextVar
+from typing import List, Optional
+
+from fastapi import FastAPI
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from mahjong.core import instrument
+
+# 是否开启性能埋点；慢调用阈值（毫秒，0 表示不记录）、cProfile 采样间隔与退出时的 JSON 导出路径
+INSTRUMENT = os.environ.get("MAHJONG_INSTRUMENT", "0") == "1"
+INSTRUMENT_SLOW_MS = float(os.environ.get("MAHJONG_INSTRUMENT_SLOW_MS", "0"))
+INSTRUMENT_PROFILE_EVERY = int(os.environ.get("MAHJONG_INSTRUMENT_PROFILE_EVERY", "0"))
+INSTRUMENT_DUMP = os.environ.get("MAHJONG_INSTRUMENT_DUMP", "")
+
+REQUEST_SECONDS = 'mahjong_http_request_seconds'
+DB_QUERIES = 'mahjong_http_db_queries_total'
+
+# Statements executed by the current request
+_queries: ContextVar[Optional[List[int]]] = ContextVar('mahjong_db_queries', default=None)
+
+
+class MetricsMiddleware:
+    """Per-route latency and SQL statement counts of HTTP requests"""
+
+    def __init__(self, app, registry: instrument.Registry = instrument.registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        queries = [0]
+        token = _queries.set(queries)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _queries.reset(token)
+            # The route template, so /api/tables/7 and /api/tables/8 share a series
+            route = getattr(scope.get('route'), 'path', 'unmatched')
+            method = scope['method']
+            self.registry.histogram(REQUEST_SECONDS, method=method, route=route, status=str(status)).observe(elapsed)
+            self.registry.inc(DB_QUERIES, queries[0], method=method, route=route)
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    queries = _queries.get()
+    if queries is not None:
+        queries[0] += 1
+
+
+def install(app: FastAPI, slow_ms: float = INSTRUMENT_SLOW_MS, profile_every: int = INSTRUMENT_PROFILE_EVERY,
+            dump: str = INSTRUMENT_DUMP):
+    """Instrument this process: hot-path timers, request middleware and SQL statement counting"""
+    instrument.enable(slow_ms=slow_ms or None, profile_every=profile_every)
+    app.add_middleware(MetricsMiddleware)
+    if not event.contains(Engine, 'before_cursor_execute', _count_query):
+        event.listen(Engine, 'before_cursor_execute', _count_query)
+    if dump:
+        atexit.register(instrument.dump_json, dump)
@@ -0,0 +1,104 @@
+"""
+Leaderboard reads over `ix_users_leaderboard`.
+
+Players are ordered by total score, then wins, then id. Pages are keyset
+pages: each one ends with the key of its last row, (total score, wins, id),
+and the next page walks the index on from that key, so a deep page costs
+the same as the first. The first `TOP_K` rows are cached as one entry and
+serve the first page. A player's rank is the number of rows ahead of them,
+counted as three range scans on the same index; the first rank of a keyset
+page is counted the same way. Neither path sorts or scans the whole table.
+`ResultBuffer` drops the cached rows after every batch of results.
+"""
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from mahjong.app.api.models.user import User
+
+# 缓存的榜首条目数与有效期（秒）
+TOP_K = int(os.environ.get("MAHJONG_LEADERBOARD_TOP_K", "100"))
+LEADERBOARD_TTL = float(os.environ.get("MAHJONG_LEADERBOARD_TTL", "30"))
+
+LEADERBOARD_KEY = "leaderboard:top"
+ORDER = (User.total_score.desc(), User.win_count.desc(), User.id)
+COLUMNS = (User.id, User.username, User.win_count, User.lose_count, User.total_score)
+
+# (total_score, win_count, id) of a row: its position in `ORDER`
+Key = Tuple[float, int, int]
+
+
+def _entries(rows, first_rank: int) -> List[Dict]:
+    return [
+        {'rank': first_rank + i, 'username': username, 'win_count': wins, 'lose_count': losses, 'total_score': score}
+        for i, (_, username, wins, losses, score) in enumerate(rows)
+    ]
+
+
+def _key(row) -> Key:
+    user_id, _, wins, _, score = row
+    return score, wins, user_id
+
+
+def _after(key: Key):
+    """Rows after `key` in `ORDER`; the bound on the score starts the index scan at `key`"""
+    score, wins, user_id = key
+    return and_(User.total_score <= score,
+                or_(User.total_score < score, User.win_count < wins,
+                    and_(User.win_count == wins, User.id > user_id)))
+
+
+async def _rows_ahead(db: AsyncSession, key: Key, inclusive: bool = False) -> int:
+    """Rows before `key` in `ORDER` (and the row at `key` itself when `inclusive`)"""
+    score, wins, user_id = key
+    ahead = (
+        User.total_score > score,
+        and_(User.total_score == score, User.win_count > wins),
+        and_(User.total_score == score, User.win_count == wins, User.id <= user_id if inclusive else User.id < user_id),
+    )
+    counts = [select(func.count()).select_from(User).where(condition).scalar_subquery() for condition in ahead]
+    return await db.scalar(select(counts[0] + counts[1] + counts[2]))
+
+
+async def _page(db: AsyncSession, after: Optional[Key], limit: int) -> Tuple[List[Dict], Optional[Key]]:
+    query = select(*COLUMNS).order_by(*ORDER).limit(limit)
+    first_rank = 1
+    if after is not None:
+        query = query.where(_after(after))
+        first_rank = await _rows_ahead(db, after, inclusive=True) + 1
+    rows = (await db.execute(query)).all()
+    return _entries(rows, first_rank), _key(rows[-1]) if len(rows) == limit else None
+
+
+async def top_entries(db: AsyncSession, backend, limit: int = 20,
+                      after: Optional[Key] = None) -> Tuple[List[Dict], Optional[Key]]:
+    """
+    The `limit` rows after `after` (from the top by default) and the key to continue from,
+    None on the last page. The first page is served from the cached top K when it fits.
+    """
+    if after is not None or limit > TOP_K:
+        return await _page(db, after, limit)
+    cached = await backend.get(LEADERBOARD_KEY)
+    if cached is None:
+        top = [list(row) for row in (await db.execute(select(*COLUMNS).order_by(*ORDER).limit(TOP_K))).all()]
+        await backend.set(LEADERBOARD_KEY, json.dumps(top), LEADERBOARD_TTL)
+    else:
+        top = json.loads(cached)
+    rows = top[:limit]
+    return _entries(rows, 1), _key(rows[-1]) if len(rows) == limit else None
+
+
+async def rank_of(db: AsyncSession, user: User) -> int:
+    """1-based leaderboard position of `user`"""
+    return await _rows_ahead(db, (user.total_score, user.win_count, user.id)) + 1
+
+
+def entry(user: User, rank: int) -> Dict:
+    return _entries([(user.id, user.username, user.win_count, user.lose_count, user.total_score)], rank)[0]
+
+
+async def invalidate_leaderboard(backend):
+    await backend.delete(LEADERBOARD_KEY)
@@ -1,17 +1,36 @@
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from mahjong.app.api.routers import users
+from mahjong.app.api.routers import users, tables, metrics, leaderboard
+from mahjong.app.auth.hashing import password_hasher
+from mahjong.app.game import table_manager, result_buffer
+from mahjong.app.inference import inference_server
+from mahjong.app.instrumentation import INSTRUMENT, install as install_instrumentation
 from mahjong.app.api.models.user import Base
-from mahjong.app.config.database import engine
+from mahjong.app.config.database import async_engine, init_db
 
-# 创建数据库表
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 启动时建表（MAHJONG_CREATE_SCHEMA=0 时跳过），导入本模块不会访问数据库
+    await init_db(Base.metadata)
+    # 在推理线程中预先加载机器人模型；加载失败只记录日志，机器人座位回退到超时动作
+    with suppress(Exception):
+        await inference_server.load()
+    yield
+    # 关闭时停止所有牌桌并释放数据库连接
+    await table_manager.shutdown()
+    await result_buffer.stop()
+    await inference_server.stop()
+    await async_engine.dispose()
+    password_hasher.shutdown()
 
 app = FastAPI(
     title="Majiang Game API",
     description="API for Majiang game",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # 配置CORS
@@ -25,3 +44,11 @@ app.add_middleware(
 
 # 注册路由
 app.include_router(users.router, prefix="/api/users", tags=["users"])
+app.include_router(tables.router, prefix="/api/tables", tags=["tables"])
+app.include_router(leaderboard.router, prefix="/api/leaderboard", tags=["leaderboard"])
+app.include_router(metrics.router, prefix="/api/metrics", tags=["metrics"])
+app.include_router(metrics.exporter)
+
+# 性能埋点默认关闭，关闭时不安装任何钩子
+if INSTRUMENT:
+    install_instrumentation(app)
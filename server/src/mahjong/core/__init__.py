@@ -1,5 +1,41 @@
+"""
+Core game logic.
+
+Only the tile and action types are imported eagerly. The rules and the
+environments are resolved on first attribute access (PEP 562), so
+`import mahjong.core` or `from mahjong.core.types import TileType` does not
+pull in gymnasium and the rule tables.
+"""
+import importlib
+from typing import TYPE_CHECKING
+
 from .types import TileType, ActionType, MahjongType
-from .rules import MahjongRules
-from .env import MahjongEnv
 
-__all__ = ['TileType', 'ActionType', 'MahjongType', 'MahjongRules', 'MahjongEnv'] 
\ No newline at end of file
+if TYPE_CHECKING:
+    from .rules import MahjongRules
+    from .env import MahjongEnv
+    from .batch_env import BatchedMahjongEnv
+    from .state import GameState
+
+# Attribute -> submodule defining it
+_LAZY = {
+    'MahjongRules': 'rules',
+    'MahjongEnv': 'env',
+    'BatchedMahjongEnv': 'batch_env',
+    'GameState': 'state',
+}
+
+__all__ = ['TileType', 'ActionType', 'MahjongType', 'MahjongRules', 'MahjongEnv', 'BatchedMahjongEnv', 'GameState']
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
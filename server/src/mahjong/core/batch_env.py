@@ -0,0 +1,306 @@
+import gymnasium as gym
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from mahjong.core.types import ActionType, MahjongType
+from mahjong.core.env import NUM_WAITING, SPECIAL_ACTIONS
+from mahjong.core.wall import DEAD_WALL, wall_tiles, shuffle_wall
+from mahjong.core.tiles import CHI_NEEDS, CHI_VALID, NUM_TILE_TYPES
+from mahjong.core.ruleset import CompiledRuleset, get_ruleset
+from mahjong.core.scoring import score_batch
+from mahjong.core.state import GameState
+
+NUM_TILES = NUM_TILE_TYPES
+HAND_SIZE = 13
+CHI, PON, KAN, RON, TSUMO, PASS = range(len(SPECIAL_ACTIONS))
+# Claim priority rank of each `claim_flags` column: ron, then kan/pon, then chi
+CLAIM_RANK = np.array([2, 1, 1, 0])
+
+
+def claim_flags(hands: np.ndarray, tiles: np.ndarray, ruleset: Optional[CompiledRuleset] = None) -> np.ndarray:
+    """
+    Evaluate CHI, PON, KAN and RON against a discarded tile for a batch of hands.
+    `hands` is (M, NUM_TILES) counts and `tiles` is (M,); returns a (M, 4) bool array.
+    Matches `MahjongRules.is_valid_chi/pon/kan` and `ruleset.is_winning(hand + [tile])`,
+    with the claims the ruleset forbids cleared (default: INTERNATIONAL).
+    """
+    if ruleset is None:
+        ruleset = get_ruleset(MahjongType.INTERNATIONAL)
+    rows = np.arange(len(tiles))
+    flags = np.zeros((len(tiles), 4), dtype=bool)
+    held = hands[rows, tiles]
+    flags[:, PON] = held >= 2
+    flags[:, KAN] = held == 3
+
+    # Gather the two other tiles of each of the (up to three) sequences through the tile
+    needs = CHI_NEEDS[tiles]
+    held_needs = hands[rows[:, None, None], needs] > 0
+    flags[:, CHI] = (CHI_VALID[tiles] & held_needs[:, :, 0] & held_needs[:, :, 1]).any(axis=1)
+
+    with_tile = hands.astype(np.int16)
+    with_tile[rows, tiles] += 1
+    flags[:, RON] = (with_tile.sum(axis=1) == 14) & ruleset.is_winning_batch(with_tile)
+    flags &= ruleset.claim_mask
+    return flags
+
+
+class BatchedMahjongEnv(gym.vector.VectorEnv):
+    """
+    N independent Mahjong tables stepped together with NumPy.
+    Each table follows `MahjongEnv` exactly: table `i` reset with `seed + i` plays the same
+    game as `MahjongEnv().reset(seed=seed + i)`. Finished tables are reset in the same step
+    and their last observation is returned in `info['final_obs']`. Legal actions are
+    returned as `info['action_mask']` with shape (N, actions). `score_wins` rewards wins with
+    their scored points, as in `MahjongEnv`. Discards are open to claims the same way:
+    `discarder` is the seat whose discard is open (-1 when none) and `claim_options`
+    holds who may still claim it.
+    """
+    metadata = {'autoreset_mode': gym.vector.AutoresetMode.SAME_STEP}
+
+    def __init__(self, num_envs: int, num_players: int = 4, mahjong_type: MahjongType = MahjongType.INTERNATIONAL,
+                 reject_masked: bool = False, score_wins: bool = False):
+        self.num_envs = num_envs
+        self.num_players = num_players
+        self.mahjong_type = mahjong_type
+        self.reject_masked = reject_masked
+        self.ruleset = get_ruleset(mahjong_type)
+        self.scoring = self.ruleset.scoring if score_wins else None
+
+        self.single_action_space = gym.spaces.Discrete(NUM_TILES + len(SPECIAL_ACTIONS))
+        self.single_observation_space = gym.spaces.Dict({
+            'hand': gym.spaces.Box(low=0, high=4, shape=(NUM_TILES,), dtype=np.int8),
+            'discards': gym.spaces.Box(low=0, high=4, shape=(NUM_TILES,), dtype=np.int8),
+            'dora_indicators': gym.spaces.Box(low=0, high=NUM_TILES, shape=(DEAD_WALL,), dtype=np.int8),
+            'current_player': gym.spaces.Discrete(num_players),
+            'last_action': gym.spaces.Discrete(self.single_action_space.n),
+            'waiting_actions': gym.spaces.MultiBinary(NUM_WAITING)
+        })
+        self.action_space = gym.vector.utils.batch_space(self.single_action_space, num_envs)
+        self.observation_space = gym.vector.utils.batch_space(self.single_observation_space, num_envs)
+
+        self.tiles = wall_tiles(mahjong_type)
+        self.wall_end = len(self.tiles) - DEAD_WALL
+        self.walls = np.zeros((num_envs, len(self.tiles)), dtype=np.int8)
+        self.wall_pos = np.zeros(num_envs, dtype=np.int64)
+        self.hands = np.zeros((num_envs, num_players, NUM_TILES), dtype=np.int8)
+        self.discards = np.zeros((num_envs, NUM_TILES), dtype=np.int8)
+        # Per-seat discards and melds, laid out as in `MahjongEnv` (claims do not move tiles yet, so melds stay empty)
+        self.seat_discards = np.zeros((num_envs, num_players, NUM_TILES), dtype=np.int8)
+        self.discard_history = np.zeros((num_envs, num_players, len(self.tiles)), dtype=np.int8)
+        self.discard_lengths = np.zeros((num_envs, num_players), dtype=np.int64)
+        self.melds = np.zeros((num_envs, num_players, NUM_TILES), dtype=np.int8)
+        self.dora_revealed = np.ones(num_envs, dtype=np.int64)
+        self.current_player = np.zeros(num_envs, dtype=np.int64)
+        self.last_action = np.zeros(num_envs, dtype=np.int64)
+        self.last_discard = np.full(num_envs, -1, dtype=np.int64)
+        self.discarder = np.full(num_envs, -1, dtype=np.int64)
+        self.claim_options = np.zeros((num_envs, num_players, 4), dtype=bool)
+        self.waiting_actions = np.zeros((num_envs, NUM_WAITING), dtype=np.int8)
+        self.action_mask = np.zeros((num_envs, self.single_action_space.n), dtype=bool)
+        self._rngs: List[np.random.Generator] = [np.random.default_rng() for _ in range(num_envs)]
+        self._all = np.arange(num_envs)
+
+    def seed(self, seed: Union[int, Sequence[int]]):
+        """Seed the wall shuffles of later resets, including the automatic ones, without resetting"""
+        seeds = [seed + i for i in range(self.num_envs)] if isinstance(seed, int) else list(seed)
+        self._rngs = [np.random.default_rng(s) for s in seeds]
+
+    def reset(self, seed: Optional[Union[int, Sequence[int]]] = None, options: Optional[Dict] = None) -> Tuple[Dict, Dict]:
+        if seed is not None:
+            self.seed(seed)
+        self._reset_tables(self._all)
+        self._update_action_mask()
+        return self._get_observation(), {'action_mask': self.action_mask.copy()}
+
+    def step(self, actions: np.ndarray) -> Tuple[Dict, np.ndarray, np.ndarray, np.ndarray, Dict]:
+        actions = np.asarray(actions, dtype=np.int64)
+        if self.reject_masked and not self.action_mask[self._all, actions].all():
+            raise ValueError(f"Masked actions on tables {np.flatnonzero(~self.action_mask[self._all, actions]).tolist()}")
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        terminated = np.zeros(self.num_envs, dtype=bool)
+        info = {}
+
+        special = actions >= NUM_TILES
+        if special.any():
+            self._step_special(np.flatnonzero(special), actions[special] - NUM_TILES, rewards, terminated)
+        discard = np.flatnonzero(~special)
+        if len(discard):
+            self._step_discard(discard, actions[discard], rewards)
+
+        truncated = (self.wall_pos == self.wall_end) & (self.discarder < 0)
+        done = terminated | truncated
+        obs = self._get_observation()
+        if done.any():
+            info['final_obs'] = obs
+            info['_final_obs'] = done
+            self._reset_tables(np.flatnonzero(done))
+            obs = self._get_observation()
+        self._update_action_mask()
+        info['action_mask'] = self.action_mask.copy()
+        return obs, rewards, terminated, truncated, info
+
+    def load(self, tables: np.ndarray, state: GameState):
+        """
+        Put the given tables in a `GameState` taken from a `MahjongEnv` of the same
+        variant, e.g. to play many continuations of one position at once
+        """
+        arrays = state.arrays()
+        self.walls[tables] = arrays['wall']
+        self.wall_pos[tables] = state.wall_pos
+        self.hands[tables] = arrays['hand_counts']
+        self.melds[tables] = arrays['meld_counts']
+        self.discards[tables] = arrays['discard_counts']
+        self.seat_discards[tables] = arrays['seat_discards']
+        self.discard_history[tables] = arrays['discard_history']
+        self.discard_lengths[tables] = state.discard_lengths
+        self.dora_revealed[tables] = state.dora_revealed
+        self.current_player[tables] = state.current_player
+        self.last_action[tables] = state.last_action or 0
+        self.last_discard[tables] = -1 if state.last_discard is None else state.last_discard
+        self.discarder[tables] = -1 if state.discarder is None else state.discarder
+        self.claim_options[tables] = arrays['claim_options']
+        self.waiting_actions[tables] = arrays['waiting_actions']
+        self.action_mask[tables] = arrays['action_mask']
+
+    def _reset_tables(self, tables: np.ndarray):
+        """Shuffle, deal and let the dealer draw on the given tables"""
+        for n in tables:
+            self.walls[n] = shuffle_wall(self._rngs[n], self.mahjong_type)
+
+        dealt = self.walls[tables, :HAND_SIZE * self.num_players].reshape(len(tables), self.num_players, HAND_SIZE)
+        hands = np.zeros((len(tables), self.num_players, NUM_TILES), dtype=np.int8)
+        np.add.at(hands, (np.arange(len(tables))[:, None, None], np.arange(self.num_players)[:, None], dealt), 1)
+        self.hands[tables] = hands
+        self.wall_pos[tables] = HAND_SIZE * self.num_players
+        self.discards[tables] = 0
+        self.seat_discards[tables] = 0
+        self.discard_lengths[tables] = 0
+        self.melds[tables] = 0
+        self.dora_revealed[tables] = 1
+        self.current_player[tables] = 0
+        self.last_action[tables] = 0
+        self.last_discard[tables] = -1
+        self.discarder[tables] = -1
+        self.claim_options[tables] = False
+        self.waiting_actions[tables] = 0
+        self._draw_tile(tables)
+
+    def _step_discard(self, tables: np.ndarray, tiles: np.ndarray, rewards: np.ndarray):
+        players = self.current_player[tables]
+        # An open discard only takes claims or PASS
+        held = (self.hands[tables, players, tiles] > 0) & (self.discarder[tables] < 0)
+        rewards[tables[~held]] = -1
+        tables, tiles, players = tables[held], tiles[held], players[held]
+        if not len(tables):
+            return
+
+        self.hands[tables, players, tiles] -= 1
+        self.discards[tables, tiles] += 1
+        self.seat_discards[tables, players, tiles] += 1
+        self.discard_history[tables, players, self.discard_lengths[tables, players]] = tiles
+        self.discard_lengths[tables, players] += 1
+        self.last_discard[tables] = tiles
+        self.last_action[tables] = ActionType.DISCARD
+
+        # Other players may claim the discard on their 13-tile hands
+        flags = claim_flags(
+            self.hands[tables].reshape(-1, NUM_TILES),
+            np.repeat(tiles, self.num_players),
+            self.ruleset
+        ).reshape(len(tables), self.num_players, 4)
+        flags[np.arange(len(tables)), players] = False
+        # Only the next seat may chi
+        chi_player = np.arange(self.num_players) == ((players + 1) % self.num_players)[:, None]
+        flags[..., CHI] &= chi_player
+        self.claim_options[tables] = flags
+        self.waiting_actions[tables] = 0
+        self.waiting_actions[tables, :TSUMO] = flags.any(axis=1)
+        self.discarder[tables] = players
+        self._next_claimant(tables)
+
+    def _next_claimant(self, tables: np.ndarray):
+        """Give each open discard to its first claimant left (as `MahjongEnv`), or close it"""
+        options = self.claim_options[tables]
+        offsets = (np.arange(self.num_players) - self.discarder[tables, None]) % self.num_players
+        ranks = np.where(options, CLAIM_RANK, len(CLAIM_RANK)).min(axis=2)
+        order = ranks * self.num_players + offsets
+        claimant = order.argmin(axis=1)
+        open_ = ranks.min(axis=1) < len(CLAIM_RANK)
+        self.current_player[tables[open_]] = claimant[open_]
+        self._end_claims(tables[~open_])
+
+    def _end_claims(self, tables: np.ndarray):
+        """Close the discards; the player after each discarder draws"""
+        self.claim_options[tables] = False
+        self.waiting_actions[tables, :TSUMO] = 0
+        self.current_player[tables] = (self.discarder[tables] + 1) % self.num_players
+        self.discarder[tables] = -1
+        self._draw_tile(tables)
+
+    def _step_special(self, tables: np.ndarray, kinds: np.ndarray, rewards: np.ndarray, terminated: np.ndarray):
+        passes = (kinds == PASS) & (self.discarder[tables] >= 0)
+        if passes.any():
+            passing = tables[passes]
+            self.claim_options[passing, self.current_player[passing]] = False
+            self.waiting_actions[passing, :TSUMO] = self.claim_options[passing].any(axis=1)
+            self._next_claimant(passing)
+        allowed = kinds < PASS
+        allowed[allowed] = self.waiting_actions[tables[allowed], kinds[allowed]] > 0
+        tables, kinds = tables[allowed], kinds[allowed]
+        if not len(tables):
+            return
+
+        players = self.current_player[tables]
+        hands = self.hands[tables, players]
+        valid = np.zeros(len(tables), dtype=bool)
+        claim = kinds < TSUMO
+        valid[claim] = self.claim_options[tables[claim], players[claim], kinds[claim]]
+        valid[~claim] = (hands[~claim].sum(axis=1) == 14) & self.ruleset.is_winning_batch(hands[~claim])
+
+        rewards[tables] = np.where(valid, self.ruleset.reward_array[kinds], self.ruleset.penalty_array[kinds])
+        wins = valid & (kinds >= RON)
+        terminated[tables] = wins
+        if self.scoring and wins.any():
+            rewards[tables[wins]] = self._win_points(tables[wins], hands[wins], kinds[wins] == TSUMO)
+
+        # A claimed discard cannot be claimed again; the player after the discarder draws
+        self._end_claims(tables[valid & (kinds < RON)])
+
+    def _win_points(self, tables: np.ndarray, hands: np.ndarray, tsumo: np.ndarray) -> np.ndarray:
+        """Points of the winning hands of the current players: ron on the last discard or tsumo on the last draw"""
+        win_tiles = np.where(tsumo, self.walls[tables, self.wall_pos[tables] - 1], self.last_discard[tables])
+        counts = hands.copy()
+        counts[np.flatnonzero(~tsumo), win_tiles[~tsumo]] += 1
+        players = self.current_player[tables]
+        return score_batch(counts, win_tiles, self.scoring, tsumo=tsumo, seat_winds=players % 4,
+                           dealer=players == 0, dora=self.walls[tables, self.wall_end])
+
+    def _draw_tile(self, tables: np.ndarray):
+        """Draw a tile from the wall for the current player of each table"""
+        tables = tables[self.wall_pos[tables] < self.wall_end]
+        players = self.current_player[tables]
+        self.hands[tables, players, self.walls[tables, self.wall_pos[tables]]] += 1
+        self.wall_pos[tables] += 1
+
+        # Check for Tsumo
+        hands = self.hands[tables, players]
+        self.waiting_actions[tables, TSUMO] = (hands.sum(axis=1) == 14) & self.ruleset.is_winning_batch(hands)
+
+    def _update_action_mask(self):
+        """Held tiles and TSUMO for each acting player, or its claims and PASS on an open discard"""
+        hands = self.hands[self._all, self.current_player]
+        open_ = self.discarder >= 0
+        self.action_mask[:, :NUM_TILES] = (hands > 0) & ~open_[:, None]
+        self.action_mask[:, NUM_TILES:NUM_TILES + TSUMO] = self.claim_options[self._all, self.current_player] \
+            & open_[:, None]
+        self.action_mask[:, NUM_TILES + TSUMO] = (self.waiting_actions[:, TSUMO] > 0) & ~open_
+        self.action_mask[:, NUM_TILES + PASS] = open_
+
+    def _get_observation(self) -> Dict:
+        return {
+            'hand': self.hands[self._all, self.current_player],
+            'discards': self.discards.copy(),
+            'dora_indicators': self.walls[:, -DEAD_WALL:].copy(),
+            'current_player': self.current_player.copy(),
+            'last_action': self.last_action.copy(),
+            'waiting_actions': self.waiting_actions.copy()
+        }
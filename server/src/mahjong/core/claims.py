@@ -0,0 +1,170 @@
+"""
+Claim resolution on discards.
+
+`ClaimEngine` keeps, for every player, one bitset per claim kind: bit `t` of
+`pon_bits[p]` is set when player `p` could pon a discarded tile `t`, and the
+same for kan, chi and ron. A hand change only touches the bits around the
+changed tile (ron is recomputed lazily from the cached wait sets), so
+resolving a discard is a handful of bit tests instead of per-player hand
+scans.
+
+Claims are resolved with the usual priority: ron, then kan/pon, then chi,
+which only the player after the discarder may make. With a compiled ruleset
+(`mahjong.core.ruleset`), claims the variant forbids are masked out, ron
+waits include its special hands and respect its missing-suit limit; without
+one every claim is allowed and only standard hands win.
+"""
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from mahjong.core.types import ActionType
+from mahjong.core.rules import MahjongRules
+from mahjong.core.ruleset import CompiledRuleset, suit_mask
+from mahjong.core.tiles import CHI_TARGETS, NUM_PLAYABLE_TILES as NUM_TILES, NUM_SUIT_TILES
+
+# Column order of `eligible`, matching the first four `waiting_actions` flags
+CHI, PON, KAN, RON = range(4)
+CLAIM_ACTIONS = [ActionType.CHI, ActionType.PON, ActionType.KAN, ActionType.RON]
+
+# Highest priority first; kan and pon share a rank since one tile cannot allow both to two players
+PRIORITY = [(RON, 0), (KAN, 1), (PON, 1), (CHI, 2)]
+
+
+def first_claimant(options: np.ndarray, discarder: int) -> Optional[int]:
+    """The player whose claim in an `eligible` array goes first, in `PRIORITY` order then seat order"""
+    num_players = len(options)
+    for kinds in ([RON], [KAN, PON], [CHI]):
+        for offset in range(1, num_players):
+            player = (discarder + offset) % num_players
+            if options[player, kinds].any():
+                return player
+    return None
+
+
+class ClaimEngine:
+    """
+    Per-player claim bitsets over a shared (players, tiles) hand count array.
+
+    Call `rebuild()` after rewriting the counts and `update(player, tile)` after
+    changing one count; both are cheap enough to run on every draw and discard.
+    """
+
+    def __init__(self, hand_counts: np.ndarray, rules: Optional[MahjongRules] = None,
+                 ruleset: Optional[CompiledRuleset] = None):
+        self.hand_counts = hand_counts
+        self.num_players = len(hand_counts)
+        self.rules = rules or MahjongRules()
+        if ruleset is None:
+            self.claim_mask = np.ones(4, dtype=bool)
+            self.seven_pairs = self.thirteen_orphans = False
+            self.win_tile_bits = ((1 << NUM_TILES) - 1,) * 8
+        else:
+            self.claim_mask = ruleset.claim_mask
+            self.seven_pairs, self.thirteen_orphans = ruleset.seven_pairs, ruleset.thirteen_orphans
+            self.win_tile_bits = ruleset.win_tile_bits
+        self.pon_bits = [0] * self.num_players
+        self.kan_bits = [0] * self.num_players
+        self.chi_bits = [0] * self.num_players
+        self._ron_bits: List[Optional[int]] = [None] * self.num_players
+
+    def rebuild(self):
+        """Recompute every bitset from the counts"""
+        for player in range(self.num_players):
+            counts = self.hand_counts[player]
+            self.pon_bits[player] = self.kan_bits[player] = self.chi_bits[player] = 0
+            for tile in np.flatnonzero(counts[:NUM_TILES]):
+                self._refresh(player, int(tile))
+            self._ron_bits[player] = None
+
+    def snapshot(self) -> Tuple[Tuple[int, ...], ...]:
+        """The bitsets as immutable tuples (pon, kan, chi, cached ron), for `restore`"""
+        return tuple(self.pon_bits), tuple(self.kan_bits), tuple(self.chi_bits), tuple(self._ron_bits)
+
+    def restore(self, bits: Tuple[Tuple[int, ...], ...]):
+        """Reinstate bitsets taken by `snapshot` over counts restored to the same state"""
+        pon, kan, chi, ron = bits
+        self.pon_bits[:], self.kan_bits[:], self.chi_bits[:], self._ron_bits[:] = pon, kan, chi, ron
+
+    def update(self, player: int, tile: int):
+        """Refresh the bits a change of `hand_counts[player, tile]` can affect"""
+        self._ron_bits[player] = None
+        if tile < NUM_TILES:
+            self._refresh(player, tile)
+
+    def _refresh(self, player: int, tile: int):
+        counts = self.hand_counts[player]
+        bit = 1 << tile
+        count = counts[tile]
+        self.pon_bits[player] = self.pon_bits[player] | bit if count >= 2 else self.pon_bits[player] & ~bit
+        self.kan_bits[player] = self.kan_bits[player] | bit if count == 3 else self.kan_bits[player] & ~bit
+        if tile >= NUM_SUIT_TILES:
+            return
+
+        # A suit tile takes part in the chi of its neighbours two ranks either side
+        chi = self.chi_bits[player]
+        for target in CHI_TARGETS[tile]:
+            if self.rules.is_valid_chi_counts(counts, target):
+                chi |= 1 << target
+            else:
+                chi &= ~(1 << target)
+        self.chi_bits[player] = chi
+
+    def ron_bits(self, player: int) -> int:
+        """Tiles that complete the player's 13-tile hand"""
+        bits = self._ron_bits[player]
+        if bits is None:
+            bits = 0
+            counts = self.hand_counts[player]
+            if counts.sum() == 13:
+                for tile in self.rules.waits(counts, self.seven_pairs, self.thirteen_orphans):
+                    bits |= 1 << tile
+                bits &= self.win_tile_bits[suit_mask(counts)]
+            self._ron_bits[player] = bits
+        return bits
+
+    def can_chi(self, player: int, tile: int) -> bool:
+        return bool(self.chi_bits[player] >> tile & 1)
+
+    def can_pon(self, player: int, tile: int) -> bool:
+        return bool(self.pon_bits[player] >> tile & 1)
+
+    def can_kan(self, player: int, tile: int) -> bool:
+        return bool(self.kan_bits[player] >> tile & 1)
+
+    def can_ron(self, player: int, tile: int) -> bool:
+        return bool(self.ron_bits(player) >> tile & 1)
+
+    def eligible(self, tile: int, discarder: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        (players, 4) bool array of who may CHI, PON, KAN or RON on `tile`.
+        The discarder may not claim, and only the next seat may chi.
+        """
+        if out is None:
+            out = np.zeros((self.num_players, 4), dtype=bool)
+        else:
+            out.fill(False)
+        for player in range(self.num_players):
+            if player == discarder:
+                continue
+            out[player, PON] = self.pon_bits[player] >> tile & 1
+            out[player, KAN] = self.kan_bits[player] >> tile & 1
+            out[player, RON] = self.ron_bits(player) >> tile & 1
+        out[(discarder + 1) % self.num_players, CHI] = self.chi_bits[(discarder + 1) % self.num_players] >> tile & 1
+        out &= self.claim_mask
+        return out
+
+    def resolve(self, tile: int, discarder: int) -> List[Tuple[int, ActionType]]:
+        """
+        Every possible claim on `tile` as (player, action), highest priority first.
+        Within a priority, players are ordered by seat from the discarder, so the first entry wins.
+        """
+        eligible = self.eligible(tile, discarder)
+        claims = []
+        for kind, rank in PRIORITY:
+            for offset in range(1, self.num_players):
+                player = (discarder + offset) % self.num_players
+                if eligible[player, kind]:
+                    claims.append((rank, offset, player, CLAIM_ACTIONS[kind]))
+        claims.sort(key=lambda claim: claim[:2])
+        return [(player, action) for _, _, player, action in claims]
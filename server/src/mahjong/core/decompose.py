@@ -0,0 +1,129 @@
+"""
+Count-vector hand decomposition.
+
+A hand is complete when its tiles split into sets (sequences or triplets)
+plus exactly one pair. Suits never interact, so each suit is checked on its
+own: the 9 counts of a suit are packed into a base-5 key and looked up in a
+precomputed table of suit shapes. Honors cannot form sequences and use a
+smaller table keyed the same way over their 7 counts.
+
+Every table entry is 0 when the shape cannot be split, 1 when it splits into
+sets only and 2 when it splits into sets plus one pair. A hand is complete
+when all four groups are non-zero and exactly one of them holds the pair,
+i.e. the four entries sum to 5.
+
+Keys assume at most four copies of any tile, which every wall guarantees.
+"""
+from typing import Iterable, Sequence
+
+SUIT_SIZE = 9
+HONOR_SIZE = 7
+HONOR_OFFSET = 27
+FLOWER_OFFSET = 34
+MAX_SETS = 4
+
+SETS_ONLY = 1
+SETS_AND_PAIR = 2
+
+_POW5 = [5 ** i for i in range(SUIT_SIZE)]
+
+
+def pack(counts: Sequence[int]) -> int:
+    """Pack a suit (or honor) count vector into its base-5 table key"""
+    key = 0
+    for i, count in enumerate(counts):
+        key += count * _POW5[i]
+    return key
+
+
+def _build_table(size: int, allow_sequences: bool) -> bytearray:
+    """
+    Enumerate every shape of up to MAX_SETS sets and an optional pair.
+    Sets are added depth-first in non-decreasing order with their keys summed
+    as they go, so each multiset is visited once and branches holding a fifth
+    copy of a tile are cut at once; both tables are built at import time.
+    """
+    melds = [(i,) * 3 for i in range(size)]
+    if allow_sequences:
+        melds += [(i, i + 1, i + 2) for i in range(size - 2)]
+    meld_keys = [sum(_POW5[i] for i in meld) for meld in melds]
+    pair_keys = [2 * _POW5[i] for i in range(size)]
+    table = bytearray(5 ** size)
+    counts = [0] * size
+
+    def visit(first: int, num_sets: int, key: int):
+        table[key] = SETS_ONLY
+        for i in range(size):
+            if counts[i] <= 2:
+                table[key + pair_keys[i]] = SETS_AND_PAIR
+        if num_sets == MAX_SETS:
+            return
+        for m in range(first, len(melds)):
+            meld = melds[m]
+            for i in meld:
+                counts[i] += 1
+            if all(counts[i] <= 4 for i in meld):
+                visit(m, num_sets + 1, key + meld_keys[m])
+            for i in meld:
+                counts[i] -= 1
+
+    visit(0, 0, 0)
+    return table
+
+
+SUIT_TABLE = _build_table(SUIT_SIZE, allow_sequences=True)
+HONOR_TABLE = _build_table(HONOR_SIZE, allow_sequences=False)
+
+# Per-tile group (0-2 suits, 3 honors) and key weight, indexed by tile value
+TILE_GROUP = [t // SUIT_SIZE for t in range(HONOR_OFFSET)] + [3] * HONOR_SIZE
+TILE_WEIGHT = [_POW5[t % SUIT_SIZE] for t in range(HONOR_OFFSET)] + _POW5[:HONOR_SIZE]
+
+
+def is_complete_tiles(tiles: Iterable[int]) -> bool:
+    """Check if a list of tiles splits into sets plus exactly one pair"""
+    keys = [0, 0, 0, 0]
+    for tile in tiles:
+        if tile >= FLOWER_OFFSET:
+            return False
+        keys[TILE_GROUP[tile]] += TILE_WEIGHT[tile]
+    a = SUIT_TABLE[keys[0]]
+    b = SUIT_TABLE[keys[1]]
+    c = SUIT_TABLE[keys[2]]
+    d = HONOR_TABLE[keys[3]]
+    return bool(a and b and c and d and a + b + c + d == 5)
+
+
+def is_complete_counts(counts: Sequence[int]) -> bool:
+    """Check if a tile count vector (list or NumPy array) splits into sets plus exactly one pair"""
+    counts = counts.tolist() if hasattr(counts, "tolist") else list(counts)
+    if any(counts[FLOWER_OFFSET:]):
+        return False
+    a = SUIT_TABLE[pack(counts[0:9])]
+    b = SUIT_TABLE[pack(counts[9:18])]
+    c = SUIT_TABLE[pack(counts[18:27])]
+    d = HONOR_TABLE[pack(counts[HONOR_OFFSET:FLOWER_OFFSET])]
+    return bool(a and b and c and d and a + b + c + d == 5)
+
+
+def is_complete_batch(counts):
+    """
+    Vectorized completeness check.
+    `counts` is an integer array of shape (N, >=34); returns a bool array of shape (N,).
+    """
+    import numpy as np
+
+    counts = np.asarray(counts)
+    weights = np.array(_POW5, dtype=np.int64)
+    suit_keys = counts[:, :HONOR_OFFSET].reshape(-1, 3, SUIT_SIZE).astype(np.int64) @ weights
+    honor_keys = counts[:, HONOR_OFFSET:FLOWER_OFFSET].astype(np.int64) @ weights[:HONOR_SIZE]
+
+    suit_table = np.frombuffer(SUIT_TABLE, dtype=np.uint8)
+    honor_table = np.frombuffer(HONOR_TABLE, dtype=np.uint8)
+    values = np.empty((counts.shape[0], 4), dtype=np.uint8)
+    values[:, :3] = suit_table[suit_keys]
+    values[:, 3] = honor_table[honor_keys]
+
+    complete = values.all(axis=1) & (values.sum(axis=1) == 5)
+    if counts.shape[1] > FLOWER_OFFSET:
+        complete &= ~counts[:, FLOWER_OFFSET:].any(axis=1)
+    return complete
@@ -3,128 +3,410 @@ import numpy as np
 from typing import List, Tuple, Dict, Any, Optional
 from mahjong.core.types import TileType, ActionType, MahjongType
 from mahjong.core.rules import MahjongRules
+from mahjong.core.claims import ClaimEngine, first_claimant
+from mahjong.core.ruleset import get_ruleset
+from mahjong.core.scoring import score_hand
+from mahjong.core.state import (H_CURRENT_PLAYER, H_DISCARDER, H_DORA_REVEALED, H_LAST_ACTION, H_LAST_DISCARD,
+                                 H_WALL_POS, HEADER_FIXED, GameState, state_layout)
+from mahjong.core.tiles import NUM_TILE_TYPES
+from mahjong.core.wall import DEAD_WALL, shuffle_wall, decode_wall, encode_wall
+
+# Special actions follow the tile actions, in `waiting_actions` order; PASS declines a claim
+SPECIAL_ACTIONS = [ActionType.CHI, ActionType.PON, ActionType.KAN, ActionType.RON, ActionType.TSUMO, ActionType.PASS]
+NUM_WAITING = 5  # CHI, PON, KAN, RON, TSUMO
+
+def _header_entry(index: int, optional: bool = False) -> property:
+    """Property over one header entry of the state buffer; with `optional`, -1 reads and writes as None"""
+    def get(self):
+        value = self._scalars[index]
+        return None if optional and value < 0 else value
+
+    def set(self, value):
+        self._scalars[index] = -1 if value is None else value
+
+    return property(get, set)
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    """Return a read-only view sharing memory with `array`"""
+    view = array.view()
+    view.flags.writeable = False
+    return view
 
 class MahjongEnv(gym.Env):
     """
     Mahjong environment following gym interface.
     This environment implements Chinese Mahjong rules by default.
+
+    Hands, melds and discards are kept as int8 tile count arrays that every action
+    updates in place. With `zero_copy=True` observations are read-only views of
+    that state instead of copies, so they change as the game advances. Each
+    seat's discards are also kept per seat (`seat_discards`) and in order
+    (`discard_history`), for feature encoders (see `mahjong.core.features`).
+
+    `reset` and `step` return the legal actions of the acting player as
+    `info['action_mask']` (also available from `action_masks()`). With
+    `reject_masked=True`, stepping a masked action raises `ValueError` and
+    leaves the game untouched.
+
+    The wall is a permutation of the variant's int8 tile array drawn from
+    `self.np_random`, so `reset(seed=s)` always deals the same game. Pass
+    `options={'wall': data}` to replay a wall saved with `wall_bytes()`.
+
+    After each discard `claim_options` holds who may CHI, PON, KAN or RON on it,
+    judged on their 13-tile hands (see `mahjong.core.claims`), and
+    `waiting_actions` is its union over players. While anyone may claim, the
+    discard is open (`discarder` is set): each claimant in priority order (ron,
+    then kan/pon, then chi, nearest seat first) becomes the current player and
+    may only claim or PASS. The next seat draws once the discard is claimed
+    or everyone passed; a claim does not move tiles yet, so play goes on from
+    there. RON ends the game.
+
+    With a `recorder` (a `mahjong.core.record.GameWriter`), every reset starts
+    a game record and every step appends one action to it.
+
+    The variant's rules (tile set, allowed claims, winning hands, rewards) are
+    compiled once into `self.ruleset` (see `mahjong.core.ruleset`), and the
+    step loop only reads its tables.
+
+    With `score_wins=True`, a successful RON or TSUMO is rewarded with the
+    points of the hand under the variant's scoring system (MCR fan or Riichi
+    points, see `mahjong.core.scoring`) instead of the flat ruleset reward.
+    Seat 0 is the dealer and east; the first dead-wall tile is the dora indicator.
+
+    All state, scalars included, lives in one contiguous buffer
+    (`mahjong.core.state`): the arrays are views into it and the scalars
+    (`wall_pos`, `current_player`, `discarder`...) are properties over its
+    header. `get_state()` copies it into an immutable, hashable `GameState`
+    whose bytes are its serialized form, and `set_state()` copies one back.
     """
     metadata = {'render_modes': ['human', 'rgb_array'], 'render_fps': 4}
 
-    def __init__(self, num_players: int = 4, mahjong_type: MahjongType = MahjongType.INTERNATIONAL):
+    def __init__(self, num_players: int = 4, mahjong_type: MahjongType = MahjongType.INTERNATIONAL,
+                 zero_copy: bool = False, reject_masked: bool = False, recorder=None, score_wins: bool = False):
         super().__init__()
         
         self.num_players = num_players
         self.mahjong_type = mahjong_type
+        self.ruleset = get_ruleset(mahjong_type)
+        self.zero_copy = zero_copy
+        self.reject_masked = reject_masked
+        self.recorder = recorder
         
         # Define action space
-        # Actions include: DISCARD (for each tile type), CHI, PON, KAN, RON, TSUMO
+        # Actions include: DISCARD (for each tile type), CHI, PON, KAN, RON, TSUMO, PASS
         self.action_space = gym.spaces.Discrete(
-            len(TileType) + len([ActionType.CHI, ActionType.PON, ActionType.KAN, ActionType.RON, ActionType.TSUMO])
+            NUM_TILE_TYPES + len(SPECIAL_ACTIONS)
         )
         
         # Define observation space
         self.observation_space = gym.spaces.Dict({
-            'hand': gym.spaces.Box(low=0, high=4, shape=(len(TileType),), dtype=np.int8),
-            'discards': gym.spaces.Box(low=0, high=4, shape=(len(TileType),), dtype=np.int8),
-            'dora_indicators': gym.spaces.Box(low=0, high=len(TileType), shape=(5,), dtype=np.int8),
+            'hand': gym.spaces.Box(low=0, high=4, shape=(NUM_TILE_TYPES,), dtype=np.int8),
+            'discards': gym.spaces.Box(low=0, high=4, shape=(NUM_TILE_TYPES,), dtype=np.int8),
+            'dora_indicators': gym.spaces.Box(low=0, high=NUM_TILE_TYPES, shape=(5,), dtype=np.int8),
             'current_player': gym.spaces.Discrete(num_players),
             'last_action': gym.spaces.Discrete(self.action_space.n),
-            'waiting_actions': gym.spaces.MultiBinary(5)  # CHI, PON, KAN, RON, TSUMO
+            'waiting_actions': gym.spaces.MultiBinary(NUM_WAITING)  # CHI, PON, KAN, RON, TSUMO
         })
         
+        # Persistent game state, updated in place; every array is a view into one `GameState` buffer
+        self.state_layout = state_layout(num_players, len(self.ruleset.tiles))
+        self._state = self.state_layout.new_buffer(mahjong_type)
+        arrays = self.state_layout.views(self._state)
+        self._header = arrays['header']
+        self._scalars = memoryview(self._header)  # Python ints, faster than indexing the array
+        self._claim_bits = arrays['claim_bits']
+        self.wall = arrays['wall']
+        self.hand_counts = arrays['hand_counts']
+        self.meld_counts = arrays['meld_counts']
+        self.discard_counts = arrays['discard_counts']
+        # Per-seat discards: counts, and tiles in discard order (`discard_lengths[p]` entries of row p are used)
+        self.seat_discards = arrays['seat_discards']
+        self.discard_history = arrays['discard_history']
+        self.discard_lengths = self._header[HEADER_FIXED:HEADER_FIXED + num_players]
+        self.hand_sizes = self._header[HEADER_FIXED + num_players:]
+        self._lengths = self._scalars[HEADER_FIXED:HEADER_FIXED + num_players]
+        self._sizes = self._scalars[HEADER_FIXED + num_players:]
+        self.wall_end = len(self.wall) - DEAD_WALL
+        self.dora_indicators = self.wall[self.wall_end:]  # Last 5 tiles as dora indicators
+        self.dora_array = arrays['dora_array']
+        self.waiting_actions = arrays['waiting_actions']  # CHI, PON, KAN, RON, TSUMO
+        self.action_mask = arrays['action_mask']
+        self.claim_options = arrays['claim_options']  # CHI, PON, KAN, RON per player
+        
+        # Read-only views handed out in zero-copy mode
+        self._hand_views = [_read_only(row) for row in self.hand_counts]
+        self._discard_view = _read_only(self.discard_counts)
+        self._dora_view = _read_only(self.dora_array)
+        self._waiting_view = _read_only(self.waiting_actions)
+        self._mask_view = _read_only(self.action_mask)
+        
         self.rules = MahjongRules()
+        self.scoring = self.ruleset.scoring if score_wins else None
+        self.claims = ClaimEngine(self.hand_counts, self.rules, self.ruleset)
         self.reset()
 
+    wall_pos = _header_entry(H_WALL_POS)
+    current_player = _header_entry(H_CURRENT_PLAYER)
+    last_discard = _header_entry(H_LAST_DISCARD, optional=True)
+    dora_revealed = _header_entry(H_DORA_REVEALED)
+    discarder = _header_entry(H_DISCARDER, optional=True)  # Seat whose discard is open to claims
+
+    @property
+    def last_action(self) -> Optional[ActionType]:
+        value = self._scalars[H_LAST_ACTION]
+        return None if value < 0 else ActionType(value)
+
+    @last_action.setter
+    def last_action(self, value: Optional[ActionType]):
+        self._scalars[H_LAST_ACTION] = -1 if value is None else value
+
+    @property
+    def hands(self) -> List[List[TileType]]:
+        """Concealed hands as sorted tile lists (built on demand from the count arrays)"""
+        return [
+            [TileType(tile) for tile in np.repeat(np.arange(NUM_TILE_TYPES), counts)]
+            for counts in self.hand_counts
+        ]
+
     def reset(self, seed: Optional[int] = None, options: Optional[Dict] = None) -> Tuple[Dict, Dict]:
         super().reset(seed=seed)
         
         # Initialize wall
-        self.wall = self._create_wall()
-        np.random.shuffle(self.wall)
+        if options and options.get('wall') is not None:
+            self.wall[:] = decode_wall(options['wall'], self.mahjong_type)
+        else:
+            self.wall[:] = shuffle_wall(self.np_random, self.mahjong_type)
+        self.wall_pos = 0
         
         # Initialize game state
-        self.hands = [[] for _ in range(self.num_players)]
-        self.discards = []
-        self.dora_indicators = self.wall[-5:]  # Last 5 tiles as dora indicators
-        self.wall = self.wall[:-5]
+        self.hand_counts.fill(0)
+        self.meld_counts.fill(0)
+        self.discard_counts.fill(0)
+        self.seat_discards.fill(0)
+        self.discard_history.fill(0)
+        self.discard_lengths.fill(0)
+        self.dora_revealed = 1
+        self.hand_sizes.fill(0)
+        self.dora_array[:] = self.dora_indicators
         
         # Deal initial tiles
         self._deal_initial_hands()
+        self.claims.rebuild()
         
         # Game state
         self.current_player = 0
         self.last_action = None
         self.last_discard = None
-        self.waiting_actions = np.zeros(5, dtype=np.int8)  # CHI, PON, KAN, RON, TSUMO
+        self.discarder = None
+        self.waiting_actions.fill(0)
+        self.claim_options.fill(False)
+        
+        # Dealer draws the 14th tile
+        self._draw_tile()
         
-        return self._get_observation(), {}
+        self._update_action_mask()
+        if self.recorder is not None:
+            self.recorder.begin_game(self.wall, seed)
+        return self._get_observation(), self._get_info()
 
     def step(self, action: int) -> Tuple[Dict, float, bool, bool, Dict]:
+        if self.reject_masked and not self.action_mask[action]:
+            raise ValueError(f"Action {action} is not legal for player {self.current_player}")
+        
         reward = 0
         terminated = False
         truncated = False
-        info = {}
+        # Whether the action took effect, for the recorder
+        accepted = False
+        actor = self.current_player
+        hand = self.hand_counts[actor]
+        rewards, penalties = self.ruleset.rewards, self.ruleset.penalties
         
         # Handle special actions first
-        if action >= len(TileType):
-            action_type = list(ActionType)[action - len(TileType)]
-            if action_type == ActionType.CHI and self.waiting_actions[0]:
-                if self.rules.is_valid_chi(self.hands[self.current_player], self.last_discard):
+        if action >= NUM_TILE_TYPES:
+            action_type = SPECIAL_ACTIONS[action - NUM_TILE_TYPES]
+            options = self.claim_options[actor]
+            if action_type == ActionType.PASS:
+                if self.discarder is not None:
+                    self._pass_claim(actor)
+                    accepted = True
+            elif action_type == ActionType.CHI and self.waiting_actions[0]:
+                if options[0]:
                     self._perform_chi()
-                    reward = 1
+                    self._end_claims()
+                    accepted = True
+                    reward = rewards[0]
                 else:
-                    reward = -1
+                    reward = penalties[0]
             elif action_type == ActionType.PON and self.waiting_actions[1]:
-                if self.rules.is_valid_pon(self.hands[self.current_player], self.last_discard):
+                if options[1]:
                     self._perform_pon()
-                    reward = 1
+                    self._end_claims()
+                    accepted = True
+                    reward = rewards[1]
                 else:
-                    reward = -1
+                    reward = penalties[1]
             elif action_type == ActionType.KAN and self.waiting_actions[2]:
-                if self.rules.is_valid_kan(self.hands[self.current_player], self.last_discard):
+                if options[2]:
                     self._perform_kan()
-                    reward = 2
+                    self._end_claims()
+                    accepted = True
+                    reward = rewards[2]
                 else:
-                    reward = -1
+                    reward = penalties[2]
             elif action_type == ActionType.RON and self.waiting_actions[3]:
-                if self.rules.is_winning_hand(self.hands[self.current_player] + [self.last_discard]):
-                    reward = 10
-                    terminated = True
+                if options[3] and self._can_win(actor, self.last_discard):
+                    reward = self._win_points(actor, self.last_discard) if self.scoring else rewards[3]
+                    terminated = accepted = True
                 else:
-                    reward = -5
+                    reward = penalties[3]
             elif action_type == ActionType.TSUMO and self.waiting_actions[4]:
-                if self.rules.is_winning_hand(self.hands[self.current_player]):
-                    reward = 15
-                    terminated = True
+                if self._can_win(self.current_player):
+                    reward = self._win_points(actor) if self.scoring else rewards[4]
+                    terminated = accepted = True
                 else:
-                    reward = -5
+                    reward = penalties[4]
         else:
-            # Regular discard action
-            tile = TileType(action)
-            if tile in self.hands[self.current_player]:
-                self._perform_discard(tile)
+            # Regular discard action; an open discard only takes claims or PASS
+            if self.discarder is None and hand[action] > 0:
+                self._perform_discard(int(action))
                 reward = 0
+                accepted = True
                 
-                # Check if other players can make actions
-                self._update_waiting_actions()
+                # Other players may claim it on their 13-tile hands; otherwise the next player draws
+                self._open_claims()
             else:
                 reward = -1
         
         # Check if wall is empty
-        if len(self.wall) == 0:
+        if self.wall_pos == self.wall_end and self.discarder is None:
             truncated = True
         
-        return self._get_observation(), reward, terminated, truncated, info
+        if self.recorder is not None:
+            self.recorder.add_step(actor, action, reward, terminated, truncated, accepted)
+        self._update_action_mask()
+        return self._get_observation(), reward, terminated, truncated, self._get_info()
+
+    @property
+    def tiles_left(self) -> int:
+        """Tiles that can still be drawn (the dead wall excluded)"""
+        return self.wall_end - self.wall_pos
+
+    def wall_bytes(self) -> bytes:
+        """Compact encoding of this game's wall, one byte per tile (see `mahjong.core.wall`)"""
+        return encode_wall(self.wall)
+
+    def action_masks(self) -> np.ndarray:
+        """Legal actions of the acting player (the `info['action_mask']` of the last reset/step)"""
+        return self.action_mask.copy()
+
+    def get_state(self) -> GameState:
+        """
+        The game state as one immutable buffer (see `mahjong.core.state`): the
+        claim bitsets are written after the position, then the whole buffer is copied once.
+        """
+        pon, kan, chi, ron = self.claims.snapshot()
+        self._claim_bits[:] = (pon, kan, chi, [-1 if bits is None else bits for bits in ron])
+        return GameState(self._state.tobytes(), self.state_layout)
+
+    def set_state(self, state: GameState):
+        """
+        Return to a state taken by `get_state`, on this env or on another one of the
+        same variant and table size, with a single copy into the state buffer.
+        Zero-copy observation views stay valid; nothing is recorded.
+        """
+        if bytes(self._header[:H_WALL_POS]) != state.data[:2 * H_WALL_POS]:
+            raise ValueError(f"{state!r} does not fit a {self.num_players}-player {self.mahjong_type.name} table")
+        self._state[:] = np.frombuffer(state.data, dtype=np.uint8)
+        pon, kan, chi, ron = self._claim_bits.tolist()
+        self.claims.restore((pon, kan, chi, [None if bits < 0 else bits for bits in ron]))
 
-    def _perform_discard(self, tile: TileType):
+    def clone(self) -> 'MahjongEnv':
+        """An independent env in the same state (without the recorder)"""
+        env = MahjongEnv(self.num_players, self.mahjong_type, zero_copy=self.zero_copy,
+                         reject_masked=self.reject_masked, score_wins=self.scoring is not None)
+        env.set_state(self.get_state())
+        return env
+
+    def _can_win(self, player: int, extra_tile: Optional[int] = None) -> bool:
+        """Check if a player's concealed hand (plus an optional claimed tile) is a 14-tile winning hand"""
+        hand = self.hand_counts[player]
+        if extra_tile is None:
+            return self._sizes[player] == 14 and self.ruleset.is_winning(hand)
+        if self._sizes[player] != 13:
+            return False
+        hand[extra_tile] += 1
+        winning = self.ruleset.is_winning(hand)
+        hand[extra_tile] -= 1
+        return winning
+
+    def _win_points(self, player: int, discard: Optional[int] = None) -> int:
+        """Points of a player's winning hand, by ron on `discard` or by tsumo on the last drawn tile"""
+        hand = self.hand_counts[player]
+        tsumo = discard is None
+        win_tile = int(self.wall[self.wall_pos - 1]) if tsumo else discard
+        if not tsumo:
+            hand[discard] += 1
+        score = score_hand(hand, win_tile, self.scoring, tsumo=tsumo, seat_wind=player % 4, dealer=player == 0,
+                           dora=self.dora_indicators[:self.dora_revealed])
+        if not tsumo:
+            hand[discard] -= 1
+        return score.points
+
+    def _perform_discard(self, tile: int):
         """Perform a discard action"""
-        self.hands[self.current_player].remove(tile)
-        self.discards.append(tile)
+        player = self.current_player
+        self.hand_counts[player, tile] -= 1
+        self._sizes[player] -= 1
+        self.claims.update(player, tile)
+        self.discard_counts[tile] += 1
+        self.seat_discards[player, tile] += 1
+        self.discard_history[player, self._lengths[player]] = tile
+        self._lengths[player] += 1
         self.last_discard = tile
-        self.current_player = (self.current_player + 1) % self.num_players
         self.last_action = ActionType.DISCARD
 
+    def _draw_tile(self):
+        """Draw a tile from the wall for the current player"""
+        wall_pos, player = self.wall_pos, self.current_player
+        if wall_pos == self.wall_end:
+            return
+        tile = int(self.wall[wall_pos])
+        self.hand_counts[player, tile] += 1
+        self._sizes[player] += 1
+        self.claims.update(player, tile)
+        self.wall_pos = wall_pos + 1
+        
+        # Check for Tsumo
+        self.waiting_actions[4] = self._can_win(player)
+
+    def _open_claims(self):
+        """Offer the current player's discard to the claimants, or let the next player draw"""
+        self._update_waiting_actions()
+        self.discarder = self.current_player
+        self._next_claimant()
+
+    def _next_claimant(self):
+        """Hand the turn to the first claimant left, or close the discard when there is none"""
+        claimant = first_claimant(self.claim_options, self.discarder)
+        if claimant is None:
+            self._end_claims()
+        else:
+            self.current_player = claimant
+
+    def _pass_claim(self, player: int):
+        self.claim_options[player] = False
+        self.waiting_actions[:4] = self.claim_options.any(axis=0)
+        self._next_claimant()
+
+    def _end_claims(self):
+        """Close the discard; the player after the discarder draws"""
+        self.waiting_actions[:4] = 0
+        self.claim_options.fill(False)
+        self.current_player = (self.discarder + 1) % self.num_players
+        self.discarder = None
+        self._draw_tile()
+
     def _perform_chi(self):
         """Perform a Chi action"""
         # Implementation details for Chi
@@ -141,48 +423,55 @@ class MahjongEnv(gym.Env):
         pass
 
     def _update_waiting_actions(self):
-        """Update which special actions are available to players"""
-        self.waiting_actions = np.zeros(5, dtype=np.int8)
-        
-        for i in range(self.num_players):
-            if i == self.current_player:
-                continue
-                
-            if self.rules.is_valid_chi(self.hands[i], self.last_discard):
-                self.waiting_actions[0] = 1
-            if self.rules.is_valid_pon(self.hands[i], self.last_discard):
-                self.waiting_actions[1] = 1
-            if self.rules.is_valid_kan(self.hands[i], self.last_discard):
-                self.waiting_actions[2] = 1
-            if self.rules.is_winning_hand(self.hands[i] + [self.last_discard]):
-                self.waiting_actions[3] = 1
-        
-        # Check for Tsumo
-        if self.rules.is_winning_hand(self.hands[self.current_player]):
-            self.waiting_actions[4] = 1
+        """Update who may claim the current player's discard, on the 13-tile hands"""
+        self.waiting_actions.fill(0)
+        self.claims.eligible(self.last_discard, self.current_player, out=self.claim_options)
+        self.waiting_actions[:4] = self.claim_options.any(axis=0)
+
+    def _update_action_mask(self):
+        """
+        Recompute the legal actions of the current player.
+        Discards come straight from the hand counts; on an open discard the claimant may only
+        make the claims in its `claim_options` row or PASS.
+        """
+        player = self.current_player
+        special = self.action_mask[NUM_TILE_TYPES:]
+        if self.discarder is not None:
+            # An open discard: the claims this player may make, or PASS
+            self.action_mask[:NUM_TILE_TYPES] = False
+            special[:4] = self.claim_options[player]
+            special[4] = False
+            special[5] = True
+            return
+        np.greater(self.hand_counts[player], 0, out=self.action_mask[:NUM_TILE_TYPES])
+        special[:4] = False
+        special[4] = self.waiting_actions[4]
+        special[5] = False
+
+    def _get_info(self) -> Dict:
+        return {'action_mask': self._mask_view if self.zero_copy else self.action_mask.copy()}
 
     def _get_observation(self) -> Dict:
         """Convert current game state to observation space format"""
-        hand_array = np.zeros(len(TileType), dtype=np.int8)
-        for tile in self.hands[self.current_player]:
-            hand_array[tile] += 1
-            
-        discard_array = np.zeros(len(TileType), dtype=np.int8)
-        for tile in self.discards:
-            discard_array[tile] += 1
-            
-        dora_array = np.array(
-            [tile.value for tile in self.dora_indicators] + [0] * (5 - len(self.dora_indicators)),
-            dtype=np.int8
-        )
+        player, last_action = self.current_player, self.last_action
+        if self.zero_copy:
+            hand = self._hand_views[player]
+            discards = self._discard_view
+            dora = self._dora_view
+            waiting = self._waiting_view
+        else:
+            hand = self.hand_counts[player].copy()
+            discards = self.discard_counts.copy()
+            dora = self.dora_array.copy()
+            waiting = self.waiting_actions.copy()
         
         return {
-            'hand': hand_array,
-            'discards': discard_array,
-            'dora_indicators': dora_array,
-            'current_player': self.current_player,
-            'last_action': self.last_action if self.last_action is not None else 0,
-            'waiting_actions': self.waiting_actions
+            'hand': hand,
+            'discards': discards,
+            'dora_indicators': dora,
+            'current_player': player,
+            'last_action': last_action if last_action is not None else 0,
+            'waiting_actions': waiting
         }
 
     def render(self):
@@ -190,51 +479,10 @@ class MahjongEnv(gym.Env):
         # TODO: Implement rendering
         pass
 
-    def _create_wall(self) -> List[TileType]:
-        """Create and return a complete set of Mahjong tiles"""
-        wall = []
-        # Add numbered tiles (Characters, Dots, Bamboo)
-        for tile in range(TileType.MAN_1, TileType.SOU_9 + 1):
-            wall.extend([TileType(tile)] * 4)
-        
-        # Add honor tiles
-        for tile in range(TileType.WIND_EAST, TileType.DRAGON_WHITE + 1):
-            wall.extend([TileType(tile)] * 4)
-            
-        # Add flower tiles if playing Chinese Mahjong
-        if self.mahjong_type == MahjongType.INTERNATIONAL:
-            for tile in range(TileType.SPRING, TileType.CHRYSANTHEMUM + 1):
-                wall.append(TileType(tile))
-                
-        return wall
-
     def _deal_initial_hands(self):
         """Deal initial tiles to all players"""
         tiles_per_player = 13
-        for i in range(self.num_players):
-            self.hands[i] = self.wall[:tiles_per_player]
-            self.wall = self.wall[tiles_per_player:]
-
-    def _get_observation(self) -> Dict:
-        """Convert current game state to observation space format"""
-        hand_array = np.zeros(len(TileType), dtype=np.int8)
-        for tile in self.hands[self.current_player]:
-            hand_array[tile] += 1
-            
-        discard_array = np.zeros(len(TileType), dtype=np.int8)
-        for tile in self.discards:
-            discard_array[tile] += 1
-            
-        dora_array = np.array(
-            [tile.value for tile in self.dora_indicators] + [0] * (5 - len(self.dora_indicators)),
-            dtype=np.int8
-        )
-        
-        return {
-            'hand': hand_array,
-            'discards': discard_array,
-            'dora_indicators': dora_array,
-            'current_player': self.current_player,
-            'last_action': self.last_action if self.last_action is not None else 0,
-            'waiting_actions': self.waiting_actions
-        } 
\ No newline at end of file
+        dealt = self.wall[:tiles_per_player * self.num_players].reshape(self.num_players, tiles_per_player)
+        np.add.at(self.hand_counts, (np.arange(self.num_players)[:, None], dealt), 1)
+        self.hand_sizes.fill(tiles_per_player)
+        self.wall_pos = tiles_per_player * self.num_players
@@ -1,6 +1,6 @@
 from typing import Dict
 import numpy as np
-from mahjong.core.env import MahjongEnv
+from mahjong.core.env import MahjongEnv, SPECIAL_ACTIONS
 from mahjong.core.types import TileType, ActionType, MahjongType
 
 def print_observation(obs: Dict):
@@ -36,7 +36,7 @@ def main():
     env = MahjongEnv(num_players=4, mahjong_type=MahjongType.INTERNATIONAL)
     
     # Reset the environment
-    obs, _ = env.reset()
+    obs, info = env.reset()
     print("Initial State:")
     print_observation(obs)
     
@@ -46,19 +46,19 @@ def main():
         
         # For this example, just randomly choose an action
         # In a real implementation, you would use an AI agent here
-        if np.any(obs['waiting_actions']):
+        legal_actions = np.flatnonzero(info['action_mask'])
+        special_actions = legal_actions[legal_actions >= len(TileType)]
+        if len(special_actions):
             # If any special actions are available, randomly choose one
-            special_actions = np.where(obs['waiting_actions'])[0]
-            action = len(TileType) + np.random.choice(special_actions)
+            action = np.random.choice(special_actions)
         else:
             # Otherwise, discard a random tile from hand
-            possible_tiles = np.where(obs['hand'] > 0)[0]
-            action = np.random.choice(possible_tiles)
+            action = np.random.choice(legal_actions)
         
         # Take the action
         obs, reward, terminated, truncated, info = env.step(action)
         
-        print(f"Action taken: {TileType(action).name if action < len(TileType) else ActionType(action - len(TileType) + 101).name}")
+        print(f"Action taken: {TileType(action).name if action < len(TileType) else SPECIAL_ACTIONS[action - len(TileType)].name}")
         print(f"Reward: {reward}")
         print_observation(obs)
         
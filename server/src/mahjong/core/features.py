@@ -0,0 +1,111 @@
+"""
+Fixed-shape per-seat feature planes.
+
+`FeatureEncoder` turns what one seat can see of a table into a single
+(channels, 34) tensor, one column per playable tile (flowers are left out):
+
+- hand: four thermometer planes, plane k is set where the seat holds more than k copies
+- for every seat, starting with the observer and going round the table:
+  a meld count plane, a discard count plane and `history` one-hot planes of
+  that seat's most recent discards, newest first
+- dora: count of each revealed dora indicator
+- wall: tiles left to draw, broadcast over the plane
+
+`encode` reads a `MahjongEnv` and `encode_batch` a `BatchedMahjongEnv`; both
+write into a preallocated buffer when one is passed, so a training loop can
+encode every step without allocating. The environments' own observations are
+unchanged.
+"""
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from mahjong.core.tiles import NUM_PLAYABLE_TILES as NUM_TILES
+from mahjong.core.wall import DEAD_WALL
+
+HAND_PLANES = 4
+
+
+class FeatureEncoder:
+    """Encode a seat's view of a table as a (num_channels, 34) int8 or float16 tensor"""
+
+    def __init__(self, num_players: int = 4, history: int = 6, dtype=np.int8):
+        self.num_players = num_players
+        self.history = history
+        self.dtype = np.dtype(dtype)
+
+        channels = [f'hand>={level}' for level in range(1, HAND_PLANES + 1)]
+        for offset in range(num_players):
+            channels += [f'seat+{offset}.melds', f'seat+{offset}.discards']
+            channels += [f'seat+{offset}.discard-{age}' for age in range(history)]
+        channels += ['dora', 'wall']
+        self.channels: Tuple[str, ...] = tuple(channels)
+        self.num_channels = len(channels)
+        self.shape = (self.num_channels, NUM_TILES)
+
+        self._per_seat = 2 + history
+        self._dora = self.num_channels - 2
+        self._levels = np.arange(1, HAND_PLANES + 1)[:, None]
+
+    def _seat_plane(self, offset: int) -> int:
+        return HAND_PLANES + offset * self._per_seat
+
+    def buffer(self, num_envs: Optional[int] = None) -> np.ndarray:
+        """A zeroed output buffer for `encode` (or for `encode_batch` over `num_envs` tables)"""
+        shape = self.shape if num_envs is None else (num_envs,) + self.shape
+        return np.zeros(shape, dtype=self.dtype)
+
+    def encode(self, env, seat: Optional[int] = None, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Features of `seat` (the current player by default) in a `MahjongEnv`"""
+        if out is None:
+            out = self.buffer()
+        else:
+            out.fill(0)
+        seat = env.current_player if seat is None else seat
+
+        out[:HAND_PLANES] = env.hand_counts[seat, :NUM_TILES] >= self._levels
+        for offset in range(self.num_players):
+            player = (seat + offset) % self.num_players
+            plane = self._seat_plane(offset)
+            out[plane] = env.meld_counts[player, :NUM_TILES]
+            out[plane + 1] = env.seat_discards[player, :NUM_TILES]
+            length = env.discard_lengths[player]
+            recent = env.discard_history[player, max(0, length - self.history):length][::-1]
+            for age, tile in enumerate(recent.tolist()):
+                if tile < NUM_TILES:
+                    out[plane + 2 + age, tile] = 1
+
+        for tile in env.wall[env.wall_end:env.wall_end + env.dora_revealed].tolist():
+            if tile < NUM_TILES:
+                out[self._dora, tile] += 1
+        out[-1] = env.tiles_left
+        return out
+
+    def encode_batch(self, env, seats: Optional[Sequence[int]] = None, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Features of one seat per table (the current players by default) in a `BatchedMahjongEnv`, shape (N, C, 34)"""
+        if out is None:
+            out = self.buffer(env.num_envs)
+        else:
+            out.fill(0)
+        rows = np.arange(env.num_envs)
+        seats = env.current_player if seats is None else np.asarray(seats, dtype=np.int64)
+
+        out[:, :HAND_PLANES] = env.hands[rows, seats, None, :NUM_TILES] >= self._levels
+        for offset in range(self.num_players):
+            players = (seats + offset) % self.num_players
+            plane = self._seat_plane(offset)
+            out[:, plane] = env.melds[rows, players, :NUM_TILES]
+            out[:, plane + 1] = env.seat_discards[rows, players, :NUM_TILES]
+            lengths = env.discard_lengths[rows, players]
+            for age in range(self.history):
+                index = lengths - 1 - age
+                tiles = env.discard_history[rows, players, np.maximum(index, 0)]
+                valid = (index >= 0) & (tiles < NUM_TILES)
+                out[rows[valid], plane + 2 + age, tiles[valid]] = 1
+
+        indicators = env.walls[:, env.wall_end:env.wall_end + DEAD_WALL]
+        revealed = (np.arange(DEAD_WALL) < env.dora_revealed[:, None]) & (indicators < NUM_TILES)
+        tables, slots = np.nonzero(revealed)
+        np.add.at(out[:, self._dora], (tables, indicators[tables, slots]), 1)
+        out[:, -1] = (env.wall_end - env.wall_pos)[:, None]
+        return out
@@ -0,0 +1,249 @@
+"""
+Opt-in timing of hot paths.
+
+Nothing here costs anything until `enable()` is called: the functions named
+in `HOT_PATHS` stay untouched and are only replaced by timing wrappers while
+instrumentation is on (`disable()` puts the originals back). Each wrapper
+feeds a latency histogram labelled with the function name in `registry`,
+whose `prometheus()` text and `snapshot()` dict export everything recorded,
+including the HTTP metrics of `mahjong.app.instrumentation`.
+
+With `slow_ms`, calls slower than that keep the stack they were called from.
+With `profile_every=n` as well, every n-th outermost call of each function
+runs under cProfile, and its profile is kept when the call turns out slow.
+The last `SLOW_SAMPLES` slow calls are listed in `snapshot()['slow']`.
+
+Usage (offline):
+    instrument.enable(slow_ms=5, profile_every=100)
+    ...  # train, simulate
+    instrument.dump_json("metrics.json")
+"""
+import cProfile
+import functools
+import importlib
+import io
+import itertools
+import json
+import pstats
+import threading
+import time
+import traceback
+from bisect import bisect_left
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+# Upper bounds of the latency buckets, in seconds
+BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+           1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SLOW_SAMPLES = 64
+CALL_SECONDS = 'mahjong_call_seconds'
+SLOW_CALLS = 'mahjong_slow_calls_total'
+
+# "module:Class.attribute" or "module:function"
+HOT_PATHS = (
+    'mahjong.core.env:MahjongEnv.step',
+    'mahjong.core.env:MahjongEnv._update_waiting_actions',
+    'mahjong.core.env:MahjongEnv._update_action_mask',
+    'mahjong.core.env:MahjongEnv._win_points',
+    'mahjong.core.batch_env:BatchedMahjongEnv.step',
+    'mahjong.core.rules:MahjongRules.is_winning_hand',
+    'mahjong.core.rules:MahjongRules.waits',
+    'mahjong.core.ruleset:CompiledRuleset.is_winning',
+    'mahjong.core.ruleset:CompiledRuleset.is_winning_batch',
+    'mahjong.core.claims:ClaimEngine.eligible',
+    'mahjong.core.claims:ClaimEngine.ron_bits',
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-ready bucket counts plus sum and count, Prometheus style"""
+    __slots__ = ('counts', 'sum', 'count', '_lock')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self.counts[bisect_left(BUCKETS, seconds)] += 1
+            self.sum += seconds
+            self.count += 1
+
+    def clear(self):
+        with self._lock:
+            self.counts = [0] * (len(BUCKETS) + 1)
+            self.sum = 0.0
+            self.count = 0
+
+    def cumulative(self) -> List[int]:
+        return list(itertools.accumulate(self.counts))
+
+
+class Registry:
+    """Histograms and counters keyed by metric name and labels, plus the recent slow calls"""
+
+    def __init__(self):
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.slow: Deque[Dict] = deque(maxlen=SLOW_SAMPLES)
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, **labels: str) -> Histogram:
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(key, Histogram())
+        return histogram
+
+    def inc(self, name: str, value: float = 1, **labels: str):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def reset(self):
+        """Zero everything; histograms are cleared in place since timers hold on to them"""
+        with self._lock:
+            for histogram in self.histograms.values():
+                histogram.clear()
+            self.counters.clear()
+            self.slow.clear()
+
+    def prometheus(self) -> str:
+        """Text exposition format"""
+        lines = []
+        for name, entries in _by_name(self.histograms).items():
+            lines.append(f'# TYPE {name} histogram')
+            for labels, histogram in entries:
+                for bound, count in zip(BUCKETS + (float('inf'),), histogram.cumulative()):
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{name}_bucket{_format_labels(labels + (("le", le),))} {count}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {histogram.sum!r}')
+                lines.append(f'{name}_count{_format_labels(labels)} {histogram.count}')
+        for name, entries in _by_name(self.counters).items():
+            lines.append(f'# TYPE {name} counter')
+            for labels, value in entries:
+                lines.append(f'{name}{_format_labels(labels)} {value!r}')
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def snapshot(self) -> Dict:
+        """Everything recorded, as JSON-serializable data"""
+        return {
+            'histograms': [
+                {'name': name, 'labels': dict(labels), 'count': histogram.count, 'sum': histogram.sum,
+                 'buckets': dict(zip([*map(repr, BUCKETS), '+Inf'], histogram.cumulative()))}
+                for (name, labels), histogram in list(self.histograms.items())
+            ],
+            'counters': [{'name': name, 'labels': dict(labels), 'value': value}
+                         for (name, labels), value in list(self.counters.items())],
+            'slow': list(self.slow),
+        }
+
+
+def _by_name(metrics: Dict) -> Dict[str, List]:
+    grouped: Dict[str, List] = {}
+    for (name, labels), metric in sorted(list(metrics.items()), key=lambda item: item[0]):
+        grouped.setdefault(name, []).append((labels, metric))
+    return grouped
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + '}'
+
+
+registry = Registry()
+
+_originals: Dict[str, Tuple[object, str, object]] = {}
+_slow_seconds: Optional[float] = None
+_profile_every = 0
+_depth = threading.local()
+
+
+def enabled() -> bool:
+    return bool(_originals)
+
+
+def enable(paths: Sequence[str] = HOT_PATHS, slow_ms: Optional[float] = None, profile_every: int = 0):
+    """Wrap `paths` with timers; calling it again changes the slow-call settings and wraps new paths"""
+    global _slow_seconds, _profile_every
+    _slow_seconds = None if slow_ms is None else slow_ms / 1000
+    _profile_every = profile_every if slow_ms is not None else 0
+    for path in paths:
+        if path in _originals:
+            continue
+        owner, attribute = _resolve(path)
+        original = owner.__dict__[attribute]
+        if isinstance(original, staticmethod):
+            wrapped = staticmethod(timed(path.split(':')[1])(original.__func__))
+        else:
+            wrapped = timed(path.split(':')[1])(original)
+        _originals[path] = (owner, attribute, original)
+        setattr(owner, attribute, wrapped)
+
+
+def disable():
+    """Put every wrapped function back; recorded metrics are kept"""
+    while _originals:
+        _, (owner, attribute, original) = _originals.popitem()
+        setattr(owner, attribute, original)
+
+
+def _resolve(path: str):
+    module_name, _, qualname = path.partition(':')
+    owner = importlib.import_module(module_name)
+    *parents, attribute = qualname.split('.')
+    for parent in parents:
+        owner = getattr(owner, parent)
+    return owner, attribute
+
+
+def timed(name: str) -> Callable[[Callable], Callable]:
+    """Decorator recording every call of a function in the `mahjong_call_seconds` histogram"""
+    def decorate(fn: Callable) -> Callable:
+        histogram = registry.histogram(CALL_SECONDS, function=name)
+        calls = itertools.count(1)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            depth = getattr(_depth, 'value', 0)
+            profiler = None
+            if _profile_every and depth == 0 and next(calls) % _profile_every == 0:
+                profiler = cProfile.Profile()
+            _depth.value = depth + 1
+            start = time.perf_counter()
+            try:
+                if profiler is None:
+                    return fn(*args, **kwargs)
+                return profiler.runcall(fn, *args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                _depth.value = depth
+                histogram.observe(elapsed)
+                if _slow_seconds is not None and elapsed > _slow_seconds:
+                    _record_slow(name, elapsed, profiler)
+        return wrapper
+    return decorate
+
+
+def _record_slow(name: str, elapsed: float, profiler: Optional[cProfile.Profile]):
+    registry.inc(SLOW_CALLS, function=name)
+    sample = {'function': name, 'ms': elapsed * 1000, 'time': time.time(),
+              'stack': traceback.format_stack(limit=16)[:-2]}
+    if profiler is not None:
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(20)
+        sample['profile'] = stream.getvalue()
+    registry.slow.append(sample)
+
+
+def dump_json(path: str):
+    """Write `registry.snapshot()` to `path`, e.g. at the end of an offline run"""
+    with open(path, 'w') as f:
+        json.dump(registry.snapshot(), f, indent=1)
@@ -0,0 +1,367 @@
+"""
+Append-only binary game records.
+
+File layout (little endian):
+
+    file header   16 bytes   b'MJRC', version, mahjong_type, num_players
+    game          16 bytes   b'GM', wall length, seed (-1 if unknown), step count
+                  wall       one byte per tile (see `mahjong.core.wall`)
+                  steps      4 bytes each: player | flags, action | ACCEPTED, reward (i16)
+    ...
+    index block   16 bytes   b'IX', entry count, offset of the previous index block
+                  entries    u64 file offset of each game written since the previous block
+    ...
+    trailer       16 bytes   b'MJEN', offset of the last index block
+
+An index block follows every `games_per_index` games and the trailer is
+written on close, so the reader finds every game by walking the index chain
+backwards instead of parsing the file. Reopening a file for writing drops the
+trailer and appends; a file without a trailer (e.g. after a crash) is
+recovered by scanning game headers. A game is about 16 + 144 + 4 * steps
+bytes. The flags live in the spare high bits of the player and action bytes:
+TERMINATED and TRUNCATED end the game, and ACCEPTED marks the steps that took
+effect (a discard, a claim, a pass on an open discard or a win), which is what
+`restore` replays. Rewards are whole points; scored wins too large for an
+int16 are stored in hundreds and marked HUNDREDS. `GameRecord` decodes the
+packed fields.
+
+`GameReader` memory-maps the file: walls and steps are NumPy views into the
+map, and `restore` rebuilds the `MahjongEnv` state after any turn directly
+from the wall and the recorded actions, without stepping the environment.
+"""
+import os
+import struct
+from typing import Iterator, List, NamedTuple, Optional
+
+import numpy as np
+
+from mahjong.core.types import ActionType, MahjongType
+from mahjong.core.tiles import NUM_TILE_TYPES
+
+MAGIC = b'MJRC'
+VERSION = 3
+FILE_HEADER = struct.Struct('<4sHHB7x')
+GAME_HEADER = struct.Struct('<2sHqI')
+INDEX_HEADER = struct.Struct('<2s2xIq')
+TRAILER = struct.Struct('<4s4xq')
+GAME_TAG, INDEX_TAG, TRAILER_TAG = b'GM', b'IX', b'MJEN'
+
+STEP = struct.Struct('<BBh')
+STEP_DTYPE = np.dtype([('player', 'u1'), ('action', 'u1'), ('reward', '<i2')])
+# High bits of the player byte, then of the action byte
+TERMINATED, TRUNCATED, HUNDREDS, ACCEPTED = 0x10, 0x20, 0x40, 0x80
+PLAYER_BITS, ACTION_BITS = 0x0F, 0x7F
+REWARD_LIMIT = 2 ** 15
+
+NUM_TILES = NUM_TILE_TYPES
+HAND_SIZE = 13
+# Claims are actions NUM_TILES + 0..2 (CHI, PON, KAN); NUM_TILES + 5 passes on a claim
+PASS = NUM_TILES + 5
+
+
+class GameRecord(NamedTuple):
+    """One recorded game; `wall` and `steps` are read-only views into the file"""
+    seed: int
+    wall: np.ndarray
+    steps: np.ndarray
+
+    @property
+    def players(self) -> np.ndarray:
+        return self.steps['player'] & PLAYER_BITS
+
+    @property
+    def actions(self) -> np.ndarray:
+        return self.steps['action'] & ACTION_BITS
+
+    @property
+    def flags(self) -> np.ndarray:
+        """TERMINATED, TRUNCATED and ACCEPTED bits of each step"""
+        return (self.steps['player'] & (TERMINATED | TRUNCATED)) | (self.steps['action'] & ACCEPTED)
+
+    @property
+    def rewards(self) -> np.ndarray:
+        scale = np.where(self.steps['player'] & HUNDREDS, 100, 1)
+        return self.steps['reward'] * scale
+
+
+class GameWriter:
+    """
+    Streaming writer for game records.
+
+    Pass it as `MahjongEnv(recorder=writer)` and every reset starts a game and
+    every step appends one action record; a game is written out when it ends.
+    """
+
+    def __init__(self, path: str, mahjong_type: MahjongType = MahjongType.INTERNATIONAL, num_players: int = 4,
+                 games_per_index: int = 1024):
+        self.path = path
+        self.mahjong_type = mahjong_type
+        self.num_players = num_players
+        self.games_per_index = games_per_index
+        self._pending: List[int] = []
+        self._last_index = -1
+        self._game: Optional[bytearray] = None
+        self._seed = -1
+        self._wall = b''
+        self._steps = 0
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self._file = open(path, 'r+b')
+            self._reopen()
+        else:
+            self._file = open(path, 'wb')
+            self._file.write(FILE_HEADER.pack(MAGIC, VERSION, mahjong_type, num_players))
+
+    def _reopen(self):
+        """Continue an existing file: check its header, then drop the trailer or recover unindexed games"""
+        with GameReader(self.path) as reader:
+            if reader.mahjong_type != self.mahjong_type or reader.num_players != self.num_players:
+                raise ValueError(f"{self.path} holds {reader.mahjong_type.name} games for {reader.num_players} players")
+            self._last_index = reader._last_index
+            self._pending = [int(offset) for offset in reader._unindexed]
+            end = reader._end
+        self._file.seek(end)
+        self._file.truncate()
+
+    def begin_game(self, wall: np.ndarray, seed: Optional[int] = None):
+        """Start a new game; an unfinished previous game is written out as it stands"""
+        self.end_game()
+        self._game = bytearray()
+        self._seed = -1 if seed is None else seed
+        self._wall = np.asarray(wall, dtype=np.int8).tobytes()
+        self._steps = 0
+
+    def add_step(self, player: int, action: int, reward: float, terminated: bool = False, truncated: bool = False,
+                 accepted: bool = False):
+        """
+        Append one action record; `accepted` tells whether the action took effect.
+        The game is written out once it is terminated or truncated.
+        """
+        if self._game is None:
+            raise RuntimeError("add_step called before begin_game")
+        flags = (TERMINATED if terminated else 0) | (TRUNCATED if truncated else 0)
+        reward = int(reward)
+        if not -REWARD_LIMIT <= reward < REWARD_LIMIT:
+            if reward % 100 or not -REWARD_LIMIT <= reward // 100 < REWARD_LIMIT:
+                raise ValueError(f"Reward {reward} cannot be recorded")
+            reward //= 100
+            flags |= HUNDREDS
+        self._game += STEP.pack(player | flags, action | (ACCEPTED if accepted else 0), reward)
+        self._steps += 1
+        if terminated or truncated:
+            self.end_game()
+
+    def end_game(self):
+        """Write out the current game; a game without steps is dropped"""
+        if not self._steps:
+            self._game = None
+            return
+        self._pending.append(self._file.tell())
+        self._file.write(GAME_HEADER.pack(GAME_TAG, len(self._wall), self._seed, self._steps))
+        self._file.write(self._wall)
+        self._file.write(self._game)
+        self._game = None
+        self._steps = 0
+        if len(self._pending) >= self.games_per_index:
+            self._write_index()
+
+    def _write_index(self):
+        if not self._pending:
+            return
+        offset = self._file.tell()
+        self._file.write(INDEX_HEADER.pack(INDEX_TAG, len(self._pending), self._last_index))
+        self._file.write(np.asarray(self._pending, dtype='<u8').tobytes())
+        self._last_index = offset
+        self._pending = []
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.end_game()
+        self._write_index()
+        self._file.write(TRAILER.pack(TRAILER_TAG, self._last_index))
+        self._file.close()
+
+    def __enter__(self) -> 'GameWriter':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class GameReader:
+    """
+    Memory-mapped reader for files written by `GameWriter`.
+
+    Usage:
+        with GameReader(path) as reader:
+            for game in reader:
+                ...
+            reader.restore(env, game=12, turn=40)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._data = np.memmap(path, dtype=np.uint8, mode='r')
+        magic, version, mahjong_type, num_players = FILE_HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} game record file")
+        self.mahjong_type = MahjongType(mahjong_type)
+        self.num_players = num_players
+
+        self._last_index = -1
+        self._unindexed = np.zeros(0, dtype=np.int64)
+        self._end = len(self._data)
+        if self._end >= FILE_HEADER.size + TRAILER.size:
+            tag, last_index = TRAILER.unpack_from(self._data, self._end - TRAILER.size)
+        else:
+            tag = None
+        if tag == TRAILER_TAG:
+            self._end -= TRAILER.size
+            self._last_index = last_index
+            self.offsets = self._read_index_chain(last_index)
+        else:
+            self.offsets, self._unindexed = self._scan()
+
+    def _read_index_chain(self, offset: int) -> np.ndarray:
+        blocks = []
+        while offset >= 0:
+            tag, count, previous = INDEX_HEADER.unpack_from(self._data, offset)
+            if tag != INDEX_TAG:
+                raise ValueError(f"Corrupt index block at offset {offset}")
+            start = offset + INDEX_HEADER.size
+            blocks.append(self._data[start:start + 8 * count].view('<u8'))
+            offset = previous
+        return np.concatenate(blocks[::-1]).astype(np.int64) if blocks else np.zeros(0, dtype=np.int64)
+
+    def _scan(self):
+        """Walk the file block by block; used when the trailer is missing"""
+        offsets, unindexed = [], []
+        offset = FILE_HEADER.size
+        while offset + GAME_HEADER.size <= len(self._data):
+            tag = bytes(self._data[offset:offset + 2])
+            if tag == INDEX_TAG:
+                _, count, _ = INDEX_HEADER.unpack_from(self._data, offset)
+                end = offset + INDEX_HEADER.size + 8 * count
+                if end > len(self._data):
+                    break
+                self._last_index = offset
+                unindexed = []
+            elif tag == GAME_TAG:
+                _, wall_len, _, num_steps = GAME_HEADER.unpack_from(self._data, offset)
+                end = offset + GAME_HEADER.size + wall_len + STEP_DTYPE.itemsize * num_steps
+                if end > len(self._data):
+                    break
+                offsets.append(offset)
+                unindexed.append(offset)
+            else:
+                break
+            offset = end
+        # Anything after the last complete block is a partially written game
+        self._end = offset
+        return np.asarray(offsets, dtype=np.int64), np.asarray(unindexed, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, game: int) -> GameRecord:
+        offset = int(self.offsets[game])
+        tag, wall_len, seed, num_steps = GAME_HEADER.unpack_from(self._data, offset)
+        if tag != GAME_TAG:
+            raise ValueError(f"Corrupt game record at offset {offset}")
+        offset += GAME_HEADER.size
+        wall = self._data[offset:offset + wall_len].view(np.int8)
+        offset += wall_len
+        steps = self._data[offset:offset + STEP_DTYPE.itemsize * num_steps].view(STEP_DTYPE)
+        return GameRecord(seed, wall, steps)
+
+    def __iter__(self) -> Iterator[GameRecord]:
+        for game in range(len(self)):
+            yield self[game]
+
+    def restore(self, env, game: int, turn: Optional[int] = None):
+        """Put `env` in the state reached after the first `turn` steps of `game` (the whole game by default)"""
+        if env.mahjong_type != self.mahjong_type or env.num_players != self.num_players:
+            raise ValueError("Environment does not match the recorded ruleset")
+        restore(env, self[game], turn)
+
+    def close(self):
+        # The map itself is released once no record views are left
+        self._data = None
+
+    def __enter__(self) -> 'GameReader':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def restore(env, record: GameRecord, turn: Optional[int] = None):
+    """
+    Rebuild the `MahjongEnv` state after `turn` steps of `record` without stepping.
+    Only successful discards move tiles: each one is offered to the claimants and,
+    once its claim window closes, the next player draws the next wall tile, so the
+    hands up to the last discard follow from the wall and the discards. The claim
+    window of the last discard is then replayed from the steps that follow it.
+    """
+    if turn is not None:
+        record = record._replace(steps=record.steps[:turn])
+    num_players = env.num_players
+    actions, players = record.actions, record.players
+    accepted = (record.steps['action'] & ACCEPTED) > 0
+    discarded = (actions < NUM_TILES) & accepted
+    tiles = actions[discarded].astype(np.intp)
+    discarders = players[discarded].astype(np.intp)
+
+    env.wall[:] = record.wall
+    dealt = HAND_SIZE * num_players
+    # Draws before the last discard: the dealer's 14th tile, then one per closed claim window
+    draws = min(max(len(tiles), 1), env.wall_end - dealt)
+    drawers = np.concatenate([[0], (discarders[:-1] + 1) % num_players])[:draws]
+
+    env.hand_counts.fill(0)
+    np.add.at(env.hand_counts, (np.repeat(np.arange(num_players), HAND_SIZE), env.wall[:dealt]), 1)
+    np.add.at(env.hand_counts, (drawers, env.wall[dealt:dealt + draws]), 1)
+    np.subtract.at(env.hand_counts, (discarders, tiles), 1)
+    env.hand_sizes[:] = env.hand_counts.sum(axis=1)
+    env.meld_counts.fill(0)
+    env.discard_counts[:] = np.bincount(tiles, minlength=NUM_TILES)[:NUM_TILES]
+    env.seat_discards.fill(0)
+    np.add.at(env.seat_discards, (discarders, tiles), 1)
+    for player in range(num_players):
+        own = tiles[discarders == player]
+        env.discard_history[player, :len(own)] = own
+        env.discard_lengths[player] = len(own)
+    env.dora_revealed = 1
+    env.dora_array[:] = env.dora_indicators
+    env.wall_pos = dealt + draws
+    env.discarder = None
+
+    env.claims.rebuild()
+    env.waiting_actions.fill(0)
+    env.claim_options.fill(False)
+    if len(tiles):
+        env.current_player = int(discarders[-1])
+        env.last_discard = int(tiles[-1])
+        env.last_action = ActionType.DISCARD
+        # Reopen the claim window of the last discard and replay it
+        env._open_claims()
+        for step in range(np.flatnonzero(discarded)[-1] + 1, len(actions)):
+            if env.discarder is None:
+                break
+            if not accepted[step]:
+                continue
+            action = int(actions[step])
+            if action == PASS:
+                env._pass_claim(int(players[step]))
+            elif NUM_TILES <= action < NUM_TILES + 3:
+                env._end_claims()
+    else:
+        env.current_player = 0
+        env.last_discard = None
+        env.last_action = None
+        env.waiting_actions[4] = env._can_win(0)
+    env._update_action_mask()
@@ -1,42 +1,20 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence, FrozenSet
 from collections import Counter
 from mahjong.core.types import TileType, MahjongType
+from mahjong.core.tiles import CHI_PAIRS, NUM_TILE_TYPES
+from mahjong.core.ruleset import get_ruleset
+from mahjong.core.decompose import is_complete_counts
+from mahjong.core import shanten as _shanten
 
 class MahjongRules:
     @staticmethod
     def is_valid_chi(hand: List[TileType], target_tile: TileType) -> bool:
         """Check if a Chi (sequence) is possible with the given tile"""
-        if target_tile >= TileType.WIND_EAST:  # Can't make sequences with honor tiles
-            return False
-            
-        tile_value = target_tile.value
-        tile_type = tile_value // 9 * 9  # Get base value for the tile type (man, pin, sou)
-        
-        # Check if we can form a sequence
-        tile_number = tile_value % 9
-        possible_sequences = []
-        
-        # Tile can be at start, middle, or end of sequence
-        if tile_number <= 6:  # Can be start of sequence
-            possible_sequences.append([tile_value, tile_value + 1, tile_value + 2])
-        if 1 <= tile_number <= 7:  # Can be middle of sequence
-            possible_sequences.append([tile_value - 1, tile_value, tile_value + 1])
-        if tile_number >= 2:  # Can be end of sequence
-            possible_sequences.append([tile_value - 2, tile_value - 1, tile_value])
-            
+        # Honor and flower tiles have no sequences, so their CHI_PAIRS entry is empty
         hand_counter = Counter(hand)
-        
-        for seq in possible_sequences:
-            can_make_sequence = True
-            for tile_val in seq:
-                if tile_val == target_tile.value:
-                    continue
-                if hand_counter[TileType(tile_val)] < 1:
-                    can_make_sequence = False
-                    break
-            if can_make_sequence:
+        for first, second in CHI_PAIRS[target_tile]:
+            if hand_counter[first] and hand_counter[second]:
                 return True
-                
         return False
 
     @staticmethod
@@ -51,61 +29,45 @@ class MahjongRules:
             return sum(1 for tile in hand if tile == target_tile) == 3
         return sum(1 for tile in hand if tile == target_tile) == 3
 
+    @staticmethod
+    def is_valid_chi_counts(counts: Sequence[int], target_tile: int) -> bool:
+        """Check if a Chi is possible with the given tile, for a tile count vector"""
+        for first, second in CHI_PAIRS[target_tile]:
+            if counts[first] and counts[second]:
+                return True
+        return False
+
     @staticmethod
     def is_winning_hand(hand: List[TileType], mahjong_type: MahjongType = MahjongType.INTERNATIONAL) -> bool:
         """
-        Check if the hand is a winning hand.
-        Basic implementation - checks for 4 sets (triplets/sequences) and a pair
+        Check if the hand is a winning hand under the ruleset of `mahjong_type`:
+        4 sets (triplets/sequences) and a pair, checked with the precomputed suit tables
+        in `mahjong.core.decompose`, or one of the variant's special hands
         """
         if len(hand) != 14:
             return False
-            
-        hand_counter = Counter(hand)
-        
-        # Try each tile as the pair
-        for tile, count in hand_counter.items():
-            if count >= 2:
-                # Remove the pair and check if remaining tiles form valid sets
-                remaining_tiles = list(hand)
-                remaining_tiles.remove(tile)
-                remaining_tiles.remove(tile)
-                
-                if MahjongRules._can_form_sets(remaining_tiles):
-                    return True
-                    
-        return False
+        counts = [0] * NUM_TILE_TYPES
+        for tile in hand:
+            counts[tile] += 1
+        return get_ruleset(mahjong_type).is_winning(counts)
+
+    @staticmethod
+    def is_winning_counts(counts: Sequence[int]) -> bool:
+        """
+        Check if a concealed tile count vector is a winning shape.
+        Unlike `is_winning_hand`, any size of 3n+2 tiles is accepted so hands with melds can be checked.
+        """
+        return is_complete_counts(counts)
+
+    @staticmethod
+    def shanten(counts: Sequence[int], melds: int = 0, seven_pairs: bool = True, thirteen_orphans: bool = True) -> int:
+        """
+        Number of tiles the hand still needs to be ready: -1 complete, 0 tenpai.
+        Covers standard hands, seven pairs and thirteen orphans; results are LRU-cached per count vector.
+        """
+        return _shanten.shanten(counts, melds, seven_pairs, thirteen_orphans)
 
     @staticmethod
-    def _can_form_sets(tiles: List[TileType]) -> bool:
-        """Helper method to check if tiles can be arranged into valid sets"""
-        if not tiles:
-            return True
-            
-        # Try forming a triplet
-        counter = Counter(tiles)
-        for tile, count in counter.items():
-            if count >= 3:
-                remaining = list(tiles)
-                for _ in range(3):
-                    remaining.remove(tile)
-                if MahjongRules._can_form_sets(remaining):
-                    return True
-                    
-        # Try forming a sequence
-        for tile in tiles:
-            if tile >= TileType.WIND_EAST:  # Can't make sequences with honor tiles
-                continue
-            
-            tile_value = tile.value
-            if (TileType(tile_value + 1) in tiles and 
-                TileType(tile_value + 2) in tiles and 
-                tile_value % 9 <= 6):  # Ensure we don't cross tile types
-                    
-                remaining = list(tiles)
-                remaining.remove(tile)
-                remaining.remove(TileType(tile_value + 1))
-                remaining.remove(TileType(tile_value + 2))
-                if MahjongRules._can_form_sets(remaining):
-                    return True
-                    
-        return False 
\ No newline at end of file
+    def waits(counts: Sequence[int], seven_pairs: bool = True, thirteen_orphans: bool = True) -> FrozenSet[int]:
+        """Tiles that would complete a 3n+1 tile hand; results are LRU-cached per count vector"""
+        return _shanten.waits(counts, seven_pairs, thirteen_orphans)
@@ -0,0 +1,203 @@
+"""
+Per-variant rulesets, compiled once into flat tables.
+
+A `Ruleset` describes a variant declaratively: which tiles are in the wall,
+which discards may be claimed, how many suits a winning hand may use, which
+special hands win and what every special action scores. `get_ruleset`
+compiles it into a `CompiledRuleset` the first time a variant is asked for;
+environments fetch it at construction and the step loop only indexes its
+tables, so no code path branches on `MahjongType`.
+
+Built-in variants:
+- INTERNATIONAL: 144 tiles (flowers included), every claim, seven pairs and
+  thirteen orphans, MCR fan scoring
+- JAPAN: 136 tiles, every claim, seven pairs and thirteen orphans, Riichi
+  yaku/fu scoring
+- SICHUAN: 108 suit tiles, no chi, seven pairs, and the missing-suit rule: a
+  winning hand holds tiles of at most two suits
+
+`register_ruleset` replaces the ruleset of a variant, e.g. to try a house rule.
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Optional, Sequence, Tuple
+
+import numpy as np
+
+from mahjong.core.types import ActionType, MahjongType
+from mahjong.core.decompose import is_complete_batch, is_complete_counts
+from mahjong.core.tiles import NUM_PLAYABLE_TILES, NUM_SUIT_TILES, NUM_TILE_TYPES, SUIT_OF
+
+# Special actions in `waiting_actions` order
+SPECIAL_ACTIONS = (ActionType.CHI, ActionType.PON, ActionType.KAN, ActionType.RON, ActionType.TSUMO)
+CLAIMS = SPECIAL_ACTIONS[:4]
+
+TERMINALS_AND_HONORS = (0, 8, 9, 17, 18, 26, 27, 28, 29, 30, 31, 32, 33)
+_SUIT_WEIGHTS = np.array([1, 2, 4], dtype=np.int64)
+
+
+@dataclass(frozen=True)
+class Ruleset:
+    """Declarative description of a variant"""
+    mahjong_type: MahjongType
+    honors: bool = True
+    flowers: bool = False
+    claims: FrozenSet[ActionType] = frozenset(CLAIMS)
+    max_suits: int = 3
+    seven_pairs: bool = True
+    thirteen_orphans: bool = True
+    # Reward for a successful and for a rejected CHI, PON, KAN, RON, TSUMO
+    rewards: Tuple[int, ...] = (1, 1, 2, 10, 15)
+    penalties: Tuple[int, ...] = (-1, -1, -1, -5, -5)
+    # Scoring system of `mahjong.core.scoring` used for wins when an environment scores them
+    scoring: Optional[str] = None
+
+    def compile(self) -> 'CompiledRuleset':
+        return CompiledRuleset(self)
+
+
+def suit_mask(counts: Sequence[int]) -> int:
+    """Bit s is set when the hand holds a tile of suit s (0 man, 1 pin, 2 sou)"""
+    return (any(counts[0:9]) << 0) | (any(counts[9:18]) << 1) | (any(counts[18:27]) << 2)
+
+
+def suit_mask_batch(counts: np.ndarray) -> np.ndarray:
+    return counts[:, :NUM_SUIT_TILES].reshape(-1, 3, 9).any(axis=2) @ _SUIT_WEIGHTS
+
+
+def is_seven_pairs(counts: Sequence[int]) -> bool:
+    """Seven different pairs"""
+    return sum(1 for count in counts[:NUM_PLAYABLE_TILES] if count == 2) == 7
+
+
+def is_thirteen_orphans(counts: Sequence[int]) -> bool:
+    """One of each terminal and honor plus a pair of one of them"""
+    return all(counts[t] for t in TERMINALS_AND_HONORS) and sum(counts[t] for t in TERMINALS_AND_HONORS) == 14
+
+
+def is_seven_pairs_batch(counts: np.ndarray) -> np.ndarray:
+    return (counts[:, :NUM_PLAYABLE_TILES] == 2).sum(axis=1) == 7
+
+
+def is_thirteen_orphans_batch(counts: np.ndarray) -> np.ndarray:
+    orphans = counts[:, TERMINALS_AND_HONORS]
+    return (orphans > 0).all(axis=1) & (orphans.sum(axis=1) == 14)
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    array.flags.writeable = False
+    return array
+
+
+class CompiledRuleset:
+    """
+    Flat tables derived from a `Ruleset`.
+
+    `is_winning` and `is_winning_batch` expect complete 14-tile hands (callers
+    check the size). The shape checks they run are chosen here, once.
+    """
+
+    def __init__(self, ruleset: Ruleset):
+        self.ruleset = ruleset
+        self.mahjong_type = ruleset.mahjong_type
+        self.seven_pairs = ruleset.seven_pairs
+        self.thirteen_orphans = ruleset.thirteen_orphans
+
+        # Tile set: suits (and honors) four times each, flowers once
+        playable = NUM_PLAYABLE_TILES if ruleset.honors else NUM_SUIT_TILES
+        tiles = np.repeat(np.arange(playable, dtype=np.int8), 4)
+        if ruleset.flowers:
+            tiles = np.concatenate([tiles, np.arange(NUM_PLAYABLE_TILES, NUM_TILE_TYPES, dtype=np.int8)])
+        self.tiles = _read_only(tiles)
+        self.tile_counts = _read_only(np.bincount(tiles, minlength=NUM_TILE_TYPES))
+
+        # Claims, in `claim_options` column order
+        self.claim_mask = _read_only(np.array([action in ruleset.claims for action in CLAIMS]))
+
+        # Missing-suit constraint, indexed by `suit_mask`: may a hand with these suits win,
+        # and which discards keep a hand with these suits within the limit
+        self.suits_ok = tuple(bin(mask).count('1') <= ruleset.max_suits for mask in range(8))
+        self.suits_ok_array = _read_only(np.array(self.suits_ok))
+        self.win_tile_bits = tuple(
+            sum(1 << tile for tile in range(NUM_PLAYABLE_TILES)
+                if self.suits_ok[mask | (1 << SUIT_OF[tile] if tile < NUM_SUIT_TILES else 0)])
+            for mask in range(8)
+        )
+
+        # Special actions
+        self.rewards = ruleset.rewards
+        self.penalties = ruleset.penalties
+        self.reward_array = _read_only(np.array(ruleset.rewards, dtype=np.float32))
+        self.penalty_array = _read_only(np.array(ruleset.penalties, dtype=np.float32))
+        self.scoring = ruleset.scoring
+
+        shapes = [is_complete_counts]
+        batch_shapes = [is_complete_batch]
+        special_sizes = []
+        if ruleset.seven_pairs:
+            shapes.append(is_seven_pairs)
+            batch_shapes.append(is_seven_pairs_batch)
+            special_sizes.append(7)
+        if ruleset.thirteen_orphans:
+            shapes.append(is_thirteen_orphans)
+            batch_shapes.append(is_thirteen_orphans_batch)
+            special_sizes.append(13)
+        self._shapes: Tuple[Callable, ...] = tuple(shapes)
+        self._batch_shapes: Tuple[Callable, ...] = tuple(batch_shapes)
+        self._special_sizes: Tuple[int, ...] = tuple(special_sizes)
+        self._special_size_table = np.isin(np.arange(NUM_TILE_TYPES * 4 + 1), special_sizes)
+
+    def is_winning(self, counts: Sequence[int]) -> bool:
+        """Check a 14-tile concealed count vector"""
+        counts = counts.tolist() if hasattr(counts, 'tolist') else counts
+        if any(counts[NUM_PLAYABLE_TILES:]) or not self.suits_ok[suit_mask(counts)]:
+            return False
+        for shape in self._shapes:
+            if shape(counts):
+                return True
+        return False
+
+    def is_winning_batch(self, counts: np.ndarray) -> np.ndarray:
+        """Vectorized `is_winning` over an (N, tiles) count array"""
+        winning = is_complete_batch(counts)
+        if self._special_sizes:
+            # Seven pairs use 7 distinct tiles and thirteen orphans 13; only those rows need the checks
+            distinct = np.count_nonzero(counts[:, :NUM_PLAYABLE_TILES], axis=1)
+            rows = np.flatnonzero(self._special_size_table[distinct])
+            if rows.size:
+                special = counts[rows]
+                for shape in self._batch_shapes[1:]:
+                    winning[rows] |= shape(special)
+        # Winning hands are rare, so the suit and flower checks only look at those rows
+        rows = np.flatnonzero(winning)
+        if rows.size:
+            candidates = counts[rows]
+            valid = self.suits_ok_array[suit_mask_batch(candidates)]
+            if counts.shape[1] > NUM_PLAYABLE_TILES:
+                valid &= ~candidates[:, NUM_PLAYABLE_TILES:].any(axis=1)
+            winning[rows] = valid
+        return winning
+
+
+RULESETS: Dict[MahjongType, Ruleset] = {
+    MahjongType.INTERNATIONAL: Ruleset(MahjongType.INTERNATIONAL, flowers=True, scoring='mcr'),
+    MahjongType.JAPAN: Ruleset(MahjongType.JAPAN, scoring='riichi'),
+    MahjongType.SICHUAN: Ruleset(
+        MahjongType.SICHUAN, honors=False, claims=frozenset({ActionType.PON, ActionType.KAN, ActionType.RON}),
+        max_suits=2, thirteen_orphans=False,
+    ),
+}
+_compiled: Dict[MahjongType, CompiledRuleset] = {}
+
+
+def register_ruleset(ruleset: Ruleset):
+    """Install (or replace) the ruleset of `ruleset.mahjong_type`; environments built afterwards use it"""
+    RULESETS[ruleset.mahjong_type] = ruleset
+    _compiled.pop(ruleset.mahjong_type, None)
+
+
+def get_ruleset(mahjong_type: MahjongType) -> CompiledRuleset:
+    """The compiled ruleset of a variant, built on first use"""
+    compiled = _compiled.get(mahjong_type)
+    if compiled is None:
+        compiled = _compiled[mahjong_type] = RULESETS[mahjong_type].compile()
+    return compiled
@@ -0,0 +1,632 @@
+"""
+Hand scoring: International (MCR) fan and Riichi yaku/fu.
+
+A winning hand is first split into every valid decomposition (four sets and
+a pair, or one of the special shapes). Suits never interact, so each suit is
+decomposed on its own and memoized on its shape; a hand only combines four
+short option lists, and the combined result is memoized on the packed count
+vector. Each decomposition is then read once per way the winning tile can
+fit into it (the wait), and the best reading is the score.
+
+Scores are memoized as well, keyed on the packed concealed counts, the melds
+and the win context, so scoring a hand that was seen before is a dict lookup.
+`score_batch` scores thousands of hands in one call and shares that cache.
+
+Points:
+- MCR: the fan total. The 8-fan minimum is not enforced.
+- Riichi: what the winner collects (ron from the discarder, or the sum of
+  the tsumo payments) at 4 players, without honba or riichi sticks. A hand
+  without yaku scores 0.
+
+Both fan lists cover the common patterns rather than every rule: MCR hands
+score the fans in `MCR_FANS` with their usual exclusions, and Riichi hands
+score the yaku in `RIICHI_YAKU`, dora from the indicators, and yakuman.
+"""
+from collections import Counter
+from functools import lru_cache
+from itertools import product
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from mahjong.core.types import ActionType
+from mahjong.core.tiles import DORA_OF, NUM_PLAYABLE_TILES, NUM_SUIT_TILES
+from mahjong.core.ruleset import TERMINALS_AND_HONORS, is_seven_pairs, is_thirteen_orphans
+
+MCR = 'mcr'
+RIICHI = 'riichi'
+SYSTEMS = (MCR, RIICHI)
+
+WINDS = range(27, 31)
+DRAGONS = range(31, 34)
+NINE_GATES = (3, 1, 1, 1, 1, 1, 1, 1, 3)
+
+# Forms and waits
+STANDARD, SEVEN_PAIRS, THIRTEEN_ORPHANS = range(3)
+RYANMEN, KANCHAN, PENCHAN, TANKI, SHANPON = range(5)
+
+_TERMINAL_OR_HONOR = tuple(tile in TERMINALS_AND_HONORS for tile in range(NUM_PLAYABLE_TILES))
+_GROUPS = ((0, 9, True), (9, 18, True), (18, 27, True), (27, 34, False))
+_MIXED_STRAIGHTS = ((0, 9, 18), (0, 18, 9), (9, 0, 18), (9, 18, 0), (18, 0, 9), (18, 9, 0))
+
+
+class Meld(NamedTuple):
+    """An exposed (or concealed-kan) set; `tile` is the lowest tile of a chi"""
+    kind: ActionType
+    tile: int
+    concealed: bool = False
+
+
+class Decomposition(NamedTuple):
+    """A standard split of concealed tiles: sequence starts, triplet tiles and the pair"""
+    pair: int
+    sequences: Tuple[int, ...]
+    triplets: Tuple[int, ...]
+
+
+class Score(NamedTuple):
+    points: int
+    value: int  # fan (MCR) or han (Riichi)
+    fu: int  # 0 for MCR
+    items: Tuple[Tuple[str, int], ...]
+
+
+NO_SCORE = Score(0, 0, 0, ())
+
+
+# Decomposition
+
+@lru_cache(maxsize=None)
+def _group_splits(shape: bytes, base: int, sequences: bool) -> Tuple[Tuple[int, Tuple[int, ...], Tuple[int, ...]], ...]:
+    """Every split of one suit (or the honors) into sets and at most one pair, as (pair or -1, sequences, triplets)"""
+    counts = list(shape)
+    size = len(counts)
+    found = set()
+
+    def search(i: int, pair: int, seqs: Tuple[int, ...], trips: Tuple[int, ...]):
+        while i < size and counts[i] == 0:
+            i += 1
+        if i == size:
+            found.add((pair, seqs, trips))
+            return
+        if counts[i] >= 3:
+            counts[i] -= 3
+            search(i, pair, seqs, trips + (base + i,))
+            counts[i] += 3
+        if sequences and i + 2 < size and counts[i + 1] and counts[i + 2]:
+            counts[i] -= 1; counts[i + 1] -= 1; counts[i + 2] -= 1
+            search(i, pair, seqs + (base + i,), trips)
+            counts[i] += 1; counts[i + 1] += 1; counts[i + 2] += 1
+        if pair < 0 and counts[i] >= 2:
+            counts[i] -= 2
+            search(i, base + i, seqs, trips)
+            counts[i] += 2
+
+    search(0, -1, (), ())
+    return tuple(sorted(found))
+
+
+@lru_cache(maxsize=65536)
+def _decompose(key: bytes) -> Tuple[Decomposition, ...]:
+    options = [_group_splits(key[start:end], start, sequences) for start, end, sequences in _GROUPS]
+    if not all(options):
+        return ()
+    found = []
+    for combo in product(*options):
+        pair, sequences, triplets = -1, (), ()
+        for group_pair, group_sequences, group_triplets in combo:
+            if group_pair >= 0:
+                if pair >= 0:
+                    break
+                pair = group_pair
+            sequences += group_sequences
+            triplets += group_triplets
+        else:
+            if pair >= 0:
+                found.append(Decomposition(pair, sequences, triplets))
+    return tuple(found)
+
+
+def _counts_key(counts: Sequence[int]) -> bytes:
+    if hasattr(counts, 'tobytes'):
+        return np.asarray(counts[:NUM_PLAYABLE_TILES], dtype=np.int8).tobytes()
+    return bytes(counts[:NUM_PLAYABLE_TILES])
+
+
+def decompositions(counts: Sequence[int]) -> Tuple[Decomposition, ...]:
+    """Every standard decomposition of a concealed count vector of 3n+2 tiles (empty when there is none)"""
+    return _decompose(_counts_key(counts))
+
+
+# Shapes: one decomposition read with one wait
+
+class _Shape(NamedTuple):
+    form: int
+    sequences: Tuple[int, ...]
+    triplets: Tuple[int, ...]
+    concealed: Tuple[bool, ...]  # per triplet
+    kans: Tuple[bool, ...]  # per triplet
+    pair: int
+    wait: int
+
+
+def _wait_of(start: int, tile: int) -> int:
+    if tile == start + 1:
+        return KANCHAN
+    if (tile == start and start % 9 == 6) or (tile == start + 2 and start % 9 == 0):
+        return PENCHAN
+    return RYANMEN
+
+
+def _shapes(key: bytes, win_tile: int, tsumo: bool, melds: Tuple[Meld, ...]) -> List[_Shape]:
+    open_seqs = trips0 = concealed0 = kans0 = ()
+    if melds:
+        open_seqs = tuple(m.tile for m in melds if m.kind == ActionType.CHI)
+        meld_trips = [m for m in melds if m.kind != ActionType.CHI]
+        trips0 = tuple(m.tile for m in meld_trips)
+        concealed0 = tuple(m.concealed for m in meld_trips)
+        kans0 = tuple(m.kind == ActionType.KAN for m in meld_trips)
+
+    shapes = []
+    for d in _decompose(key):
+        base = (open_seqs + d.sequences, trips0 + d.triplets, kans0 + (False,) * len(d.triplets))
+        concealed = concealed0 + (True,) * len(d.triplets)
+        if d.pair == win_tile:
+            shapes.append(_Shape(STANDARD, base[0], base[1], concealed, base[2], d.pair, TANKI))
+        for start in set(d.sequences):
+            if start <= win_tile <= start + 2:
+                shapes.append(_Shape(STANDARD, base[0], base[1], concealed, base[2], d.pair, _wait_of(start, win_tile)))
+        if win_tile in d.triplets:
+            # A triplet completed by ron counts as exposed
+            if not tsumo:
+                index = len(trips0) + d.triplets.index(win_tile)
+                concealed = concealed[:index] + (False,) + concealed[index + 1:]
+            shapes.append(_Shape(STANDARD, base[0], base[1], concealed, base[2], d.pair, SHANPON))
+
+    # Seven pairs use 7 distinct tiles and thirteen orphans 13
+    distinct = NUM_PLAYABLE_TILES - key.count(0)
+    if not melds and distinct in (7, 13):
+        counts = list(key)
+        if is_seven_pairs(counts):
+            shapes.append(_Shape(SEVEN_PAIRS, (), (), (), (), -1, TANKI))
+        if is_thirteen_orphans(counts):
+            shapes.append(_Shape(THIRTEEN_ORPHANS, (), (), (), (), -1, TANKI))
+    return shapes
+
+
+class _Hand(NamedTuple):
+    """Tile-level facts that do not depend on the decomposition"""
+    total: bytes  # concealed and melded tile counts
+    closed: bool
+    suits: int  # number of suits used
+    honors: bool
+    simples: bool
+    terminals_and_honors: bool
+    green: bool
+    nine_gates: bool
+
+
+def _hand(key: bytes, win_tile: int, melds: Tuple[Meld, ...]) -> _Hand:
+    total = key
+    if melds:
+        total = bytearray(key)
+        for meld in melds:
+            if meld.kind == ActionType.CHI:
+                for tile in range(meld.tile, meld.tile + 3):
+                    total[tile] += 1
+            else:
+                total[meld.tile] += 4 if meld.kind == ActionType.KAN else 3
+        total = bytes(total)
+    size = sum(total)
+    used = (any(total[0:9]), any(total[9:18]), any(total[18:27]))
+    suits = sum(used)
+    honors = any(total[NUM_SUIT_TILES:])
+    orphans = total[0] + total[8] + total[9] + total[17] + total[18] + total[26] + sum(total[NUM_SUIT_TILES:])
+    nine_gates = False
+    if not melds and suits == 1 and not honors:
+        start = used.index(True) * 9
+        rest = list(total[start:start + 9])
+        rest[win_tile - start] -= 1
+        nine_gates = tuple(rest) == NINE_GATES
+    return _Hand(total, all(meld.concealed for meld in melds), suits, honors, not orphans, orphans == size,
+                 # Green tiles: 2, 3, 4, 6 and 8 sou and the green dragon
+                 total[19] + total[20] + total[21] + total[23] + total[25] + total[32] == size, nine_gates)
+
+
+def _outside(shape: _Shape) -> bool:
+    """Every set and the pair hold a terminal or honor"""
+    return (all(start % 9 in (0, 6) for start in shape.sequences)
+            and all(_TERMINAL_OR_HONOR[tile] for tile in shape.triplets)
+            and _TERMINAL_OR_HONOR[shape.pair])
+
+
+def _same_rank_in_three_suits(tiles: Iterable[int]) -> bool:
+    tiles = set(tiles)
+    return any(tile + 9 in tiles and tile + 18 in tiles for tile in tiles if tile < 9)
+
+
+def _honor_triplets(triplets: Tuple[int, ...]) -> Tuple[int, int]:
+    """Number of dragon and of wind triplets"""
+    dragons = winds = 0
+    for tile in triplets:
+        if tile >= 31:
+            dragons += 1
+        elif tile >= 27:
+            winds += 1
+    return dragons, winds
+
+
+def _pure_straight(sequences: Iterable[int]) -> bool:
+    return any(base in sequences and base + 3 in sequences and base + 6 in sequences for base in (0, 9, 18))
+
+
+# Riichi
+
+RIICHI_YAKU = (
+    'Riichi', 'Menzen Tsumo', 'Pinfu', 'Tanyao', 'Iipeikou', 'Yakuhai (dragon)', 'Yakuhai (seat wind)',
+    'Yakuhai (round wind)', 'Sanshoku Doujun', 'Ittsu', 'Toitoi', 'Sanankou', 'Sankantsu', 'Sanshoku Doukou',
+    'Chanta', 'Junchan', 'Honroutou', 'Shousangen', 'Chiitoitsu', 'Ryanpeikou', 'Honitsu', 'Chinitsu',
+)
+RIICHI_YAKUMAN = (
+    'Kokushi Musou', 'Suuankou', 'Daisangen', 'Tsuuiisou', 'Chinroutou', 'Ryuuiisou', 'Shousuushii',
+    'Daisuushii', 'Chuuren Poutou',
+)
+
+
+class _Context(NamedTuple):
+    win_tile: int
+    tsumo: bool
+    seat_wind: int
+    round_wind: int
+    dealer: bool
+    riichi: bool
+    dora: Tuple[int, ...]
+    flowers: int
+
+
+def _ceil100(points: float) -> int:
+    return -(-int(points) // 100) * 100
+
+
+def _riichi_points(han: int, fu: int, yakuman: int, ctx: _Context) -> int:
+    if yakuman:
+        base = 8000 * yakuman
+    elif han >= 13:
+        base = 8000
+    elif han >= 11:
+        base = 6000
+    elif han >= 8:
+        base = 4000
+    elif han >= 6:
+        base = 3000
+    elif han >= 5:
+        base = 2000
+    else:
+        base = min(fu * 2 ** (han + 2), 2000)
+    if not ctx.tsumo:
+        return _ceil100(base * (6 if ctx.dealer else 4))
+    if ctx.dealer:
+        return 3 * _ceil100(base * 2)
+    return _ceil100(base * 2) + 2 * _ceil100(base)
+
+
+def _score_riichi(hand: _Hand, shape: _Shape, ctx: _Context) -> Score:
+    closed = hand.closed
+    open_han = 0 if closed else 1
+    seat, prevalent = 27 + ctx.seat_wind, 27 + ctx.round_wind
+    trips, seqs = shape.triplets, shape.sequences
+    yakuman: List[Tuple[str, int]] = []
+    items: List[Tuple[str, int]] = []
+
+    concealed_trips = sum(shape.concealed)
+    dragon_trips, wind_trips = _honor_triplets(trips)
+    if shape.form == THIRTEEN_ORPHANS:
+        yakuman.append(('Kokushi Musou', 1))
+    if shape.form == STANDARD:
+        if concealed_trips == 4:
+            yakuman.append(('Suuankou', 1))
+        if dragon_trips == 3:
+            yakuman.append(('Daisangen', 1))
+        if wind_trips == 4:
+            yakuman.append(('Daisuushii', 1))
+        elif wind_trips == 3 and shape.pair in WINDS:
+            yakuman.append(('Shousuushii', 1))
+        if hand.nine_gates:
+            yakuman.append(('Chuuren Poutou', 1))
+    if not hand.suits:
+        yakuman.append(('Tsuuiisou', 1))
+    if hand.terminals_and_honors and not hand.honors:
+        yakuman.append(('Chinroutou', 1))
+    if hand.green:
+        yakuman.append(('Ryuuiisou', 1))
+    if yakuman:
+        return Score(_riichi_points(0, 0, len(yakuman), ctx), 13 * len(yakuman), 0, tuple(yakuman))
+
+    if ctx.riichi and closed:
+        items.append(('Riichi', 1))
+    if ctx.tsumo and closed:
+        items.append(('Menzen Tsumo', 1))
+    if hand.simples:
+        items.append(('Tanyao', 1))
+    if hand.suits == 1:
+        items.append(('Honitsu', 3 - open_han) if hand.honors else ('Chinitsu', 6 - open_han))
+    if hand.terminals_and_honors:
+        items.append(('Honroutou', 2))
+
+    pinfu = False
+    if shape.form == SEVEN_PAIRS:
+        items.append(('Chiitoitsu', 2))
+    else:
+        pair = shape.pair
+        yakuhai_pair = pair in DRAGONS or pair == seat or pair == prevalent
+        pinfu = closed and len(seqs) == 4 and not yakuhai_pair and shape.wait == RYANMEN
+        if pinfu:
+            items.append(('Pinfu', 1))
+        if closed and len(set(seqs)) < len(seqs):
+            repeats = sum(n // 2 for n in Counter(seqs).values())
+            if repeats == 2:
+                items.append(('Ryanpeikou', 3))
+            elif repeats == 1:
+                items.append(('Iipeikou', 1))
+        for tile in trips:
+            if tile in DRAGONS:
+                items.append(('Yakuhai (dragon)', 1))
+            if tile == seat:
+                items.append(('Yakuhai (seat wind)', 1))
+            if tile == prevalent:
+                items.append(('Yakuhai (round wind)', 1))
+        if len(seqs) >= 3:
+            if _same_rank_in_three_suits(seqs):
+                items.append(('Sanshoku Doujun', 2 - open_han))
+            if _pure_straight(seqs):
+                items.append(('Ittsu', 2 - open_han))
+        if len(trips) == 4:
+            items.append(('Toitoi', 2))
+        if concealed_trips == 3:
+            items.append(('Sanankou', 2))
+        if sum(shape.kans) == 3:
+            items.append(('Sankantsu', 2))
+        if len(trips) >= 3 and _same_rank_in_three_suits(trips):
+            items.append(('Sanshoku Doukou', 2))
+        if seqs and not hand.simples and _outside(shape):
+            items.append(('Chanta', 2 - open_han) if hand.honors else ('Junchan', 3 - open_han))
+        if dragon_trips == 2 and pair in DRAGONS:
+            items.append(('Shousangen', 2))
+
+    han = sum(value for _, value in items)
+    if not han:
+        return NO_SCORE
+    dora = sum(hand.total[DORA_OF[indicator]] for indicator in ctx.dora)
+    if dora:
+        items.append(('Dora', dora))
+        han += dora
+
+    # Fu
+    if shape.form == SEVEN_PAIRS:
+        fu = 25
+    elif pinfu:
+        fu = 20 if ctx.tsumo else 30
+    else:
+        fu = 20
+        if closed and not ctx.tsumo:
+            fu += 10
+        if ctx.tsumo:
+            fu += 2
+        for tile, concealed, kan in zip(trips, shape.concealed, shape.kans):
+            fu += 2 * (2 if concealed else 1) * (2 if _TERMINAL_OR_HONOR[tile] else 1) * (4 if kan else 1)
+        fu += 2 * ((shape.pair in DRAGONS) + (shape.pair == seat) + (shape.pair == prevalent))
+        if shape.wait in (KANCHAN, PENCHAN, TANKI):
+            fu += 2
+        fu = max(-(-fu // 10) * 10, 30)
+    return Score(_riichi_points(han, fu, 0, ctx), han, fu, tuple(items))
+
+
+# MCR
+
+MCR_FANS: Dict[str, int] = {
+    'Big Four Winds': 88, 'Big Three Dragons': 88, 'All Green': 88, 'Nine Gates': 88, 'Thirteen Orphans': 88,
+    'All Terminals': 64, 'Little Four Winds': 64, 'Little Three Dragons': 64, 'All Honors': 64,
+    'Four Concealed Pungs': 64,
+    'All Terminals and Honors': 32,
+    'Seven Pairs': 24, 'Full Flush': 24, 'Pure Triple Chow': 24,
+    'Pure Straight': 16, 'Triple Pung': 16, 'Three Concealed Pungs': 16, 'All Fives': 16,
+    'Big Three Winds': 12,
+    'Mixed Triple Chow': 8, 'Mixed Straight': 8,
+    'All Pungs': 6, 'Half Flush': 6, 'All Types': 6, 'Two Dragon Pungs': 6,
+    'Outside Hand': 4, 'Fully Concealed Hand': 4,
+    'Dragon Pung': 2, 'Prevalent Wind': 2, 'Seat Wind': 2, 'Concealed Hand': 2, 'All Chows': 2, 'Tile Hog': 2,
+    'Two Concealed Pungs': 2, 'All Simples': 2,
+    'Pure Double Chow': 1, 'Short Straight': 1, 'Two Terminal Chows': 1, 'Pung of Terminals or Honors': 1,
+    'No Honors': 1, 'Edge Wait': 1, 'Closed Wait': 1, 'Single Wait': 1, 'Self-Drawn': 1, 'Flower Tiles': 1,
+}
+
+# Fans a larger fan already accounts for
+_MCR_EXCLUDES: Dict[str, FrozenSet[str]] = {name: frozenset(excluded) for name, excluded in {
+    'Big Four Winds': ('Little Four Winds', 'Big Three Winds', 'All Pungs', 'Seat Wind', 'Prevalent Wind',
+                       'Pung of Terminals or Honors'),
+    'Big Three Dragons': ('Little Three Dragons', 'Two Dragon Pungs', 'Dragon Pung'),
+    'All Green': ('Half Flush',),
+    'Nine Gates': ('Full Flush', 'Fully Concealed Hand', 'Concealed Hand', 'No Honors', 'Pung of Terminals or Honors'),
+    'Thirteen Orphans': ('All Terminals and Honors', 'All Types', 'Fully Concealed Hand', 'Concealed Hand',
+                         'Single Wait'),
+    'All Terminals': ('All Terminals and Honors', 'All Pungs', 'Outside Hand', 'Pung of Terminals or Honors',
+                      'No Honors'),
+    'Little Four Winds': ('Big Three Winds', 'Pung of Terminals or Honors'),
+    'Little Three Dragons': ('Two Dragon Pungs', 'Dragon Pung'),
+    'All Honors': ('All Terminals and Honors', 'All Pungs', 'Outside Hand', 'Pung of Terminals or Honors'),
+    'Four Concealed Pungs': ('All Pungs', 'Three Concealed Pungs', 'Two Concealed Pungs', 'Fully Concealed Hand',
+                             'Concealed Hand'),
+    'All Terminals and Honors': ('All Pungs', 'Outside Hand', 'Pung of Terminals or Honors'),
+    'Seven Pairs': ('Concealed Hand', 'Single Wait'),
+    'Full Flush': ('Half Flush', 'No Honors'),
+    'Pure Triple Chow': ('Pure Double Chow',),
+    'Pure Straight': ('Short Straight', 'Two Terminal Chows'),
+    'Three Concealed Pungs': ('Two Concealed Pungs',),
+    'Big Three Winds': ('Pung of Terminals or Honors',),
+    'Two Dragon Pungs': ('Dragon Pung',),
+    'Fully Concealed Hand': ('Self-Drawn', 'Concealed Hand'),
+    'All Chows': ('No Honors',),
+    'All Simples': ('No Honors',),
+}.items()}
+
+
+def _score_mcr(hand: _Hand, shape: _Shape, ctx: _Context) -> Score:
+    seat, prevalent = 27 + ctx.seat_wind, 27 + ctx.round_wind
+    trips, seqs = shape.triplets, shape.sequences
+    names: List[str] = []
+    add = names.append
+
+    if hand.green:
+        add('All Green')
+    if hand.nine_gates:
+        add('Nine Gates')
+    if shape.form == THIRTEEN_ORPHANS:
+        add('Thirteen Orphans')
+    if not hand.suits:
+        add('All Honors')
+    elif hand.terminals_and_honors:
+        add('All Terminals and Honors' if hand.honors else 'All Terminals')
+    if hand.suits == 1:
+        add('Half Flush' if hand.honors else 'Full Flush')
+    if hand.simples:
+        add('All Simples')
+    if not hand.honors:
+        add('No Honors')
+    if hand.suits == 3 and any(hand.total[t] for t in WINDS) and any(hand.total[t] for t in DRAGONS):
+        add('All Types')
+    if hand.closed:
+        add('Fully Concealed Hand' if ctx.tsumo else 'Concealed Hand')
+    if ctx.tsumo:
+        add('Self-Drawn')
+
+    if shape.form == SEVEN_PAIRS:
+        add('Seven Pairs')
+    elif shape.form == STANDARD:
+        pair = shape.pair
+        dragon_trips, wind_trips = _honor_triplets(trips)
+        if wind_trips == 4:
+            add('Big Four Winds')
+        elif wind_trips == 3:
+            add('Little Four Winds' if pair in WINDS else 'Big Three Winds')
+        if dragon_trips == 3:
+            add('Big Three Dragons')
+        elif dragon_trips == 2:
+            add('Little Three Dragons' if pair in DRAGONS else 'Two Dragon Pungs')
+        concealed_trips = sum(shape.concealed)
+        if concealed_trips >= 2:
+            add({2: 'Two Concealed Pungs', 3: 'Three Concealed Pungs', 4: 'Four Concealed Pungs'}[concealed_trips])
+        if len(trips) == 4:
+            add('All Pungs')
+        if len(seqs) == 4 and pair < 27:
+            add('All Chows')
+        seq_set = set(seqs)
+        if len(seq_set) < len(seqs):
+            repeats = Counter(seqs)
+            if max(repeats.values()) >= 3:
+                add('Pure Triple Chow')
+            names.extend('Pure Double Chow' for n in repeats.values() if n == 2)
+        if len(seq_set) >= 3:
+            if _pure_straight(seq_set):
+                add('Pure Straight')
+            if _same_rank_in_three_suits(seq_set):
+                add('Mixed Triple Chow')
+            if any(a in seq_set and b + 3 in seq_set and c + 6 in seq_set for a, b, c in _MIXED_STRAIGHTS):
+                add('Mixed Straight')
+        if len(trips) >= 3 and _same_rank_in_three_suits(trips):
+            add('Triple Pung')
+        if (pair < 27 and pair % 9 == 4 and all(start % 9 in (2, 3, 4) for start in seqs)
+                and all(tile < 27 and tile % 9 == 4 for tile in trips)):
+            add('All Fives')
+        if not hand.simples and _outside(shape):
+            add('Outside Hand')
+        for start in seq_set:
+            if start % 9 <= 3 and start + 3 in seq_set:
+                add('Short Straight')
+            if start % 9 == 0 and start + 6 in seq_set:
+                add('Two Terminal Chows')
+        for tile in trips:
+            if tile in DRAGONS:
+                add('Dragon Pung')
+            elif tile in WINDS:
+                if tile == prevalent:
+                    add('Prevalent Wind')
+                if tile == seat:
+                    add('Seat Wind')
+                if tile != prevalent and tile != seat:
+                    add('Pung of Terminals or Honors')
+            elif _TERMINAL_OR_HONOR[tile]:
+                add('Pung of Terminals or Honors')
+        if 4 in hand.total:
+            kan_tiles = {tile for tile, kan in zip(trips, shape.kans) if kan}
+            names.extend('Tile Hog' for tile in range(NUM_PLAYABLE_TILES)
+                         if hand.total[tile] == 4 and tile not in kan_tiles)
+        if shape.wait == PENCHAN:
+            add('Edge Wait')
+        elif shape.wait == KANCHAN:
+            add('Closed Wait')
+        elif shape.wait == TANKI:
+            add('Single Wait')
+
+    # Larger fans first, so a fan that is itself excluded excludes nothing
+    excluded = set()
+    items = []
+    for name in sorted(names, key=MCR_FANS.__getitem__, reverse=True):
+        if name not in excluded:
+            items.append((name, MCR_FANS[name]))
+            excluded |= _MCR_EXCLUDES.get(name, frozenset())
+    if ctx.flowers:
+        items.append(('Flower Tiles', ctx.flowers))
+    fan = sum(value for _, value in items)
+    return Score(fan, fan, 0, tuple(items))
+
+
+_EVALUATORS = {MCR: _score_mcr, RIICHI: _score_riichi}
+
+
+@lru_cache(maxsize=1 << 16)
+def _score(key: bytes, system: str, melds: Tuple[Meld, ...], ctx: _Context) -> Score:
+    shapes = _shapes(key, ctx.win_tile, ctx.tsumo, melds)
+    if not shapes:
+        return NO_SCORE
+    hand = _hand(key, ctx.win_tile, melds)
+    evaluate = _EVALUATORS[system]
+    return max((evaluate(hand, shape, ctx) for shape in shapes), key=lambda score: (score.points, score.value))
+
+
+def score_hand(counts: Sequence[int], win_tile: int, system: str, tsumo: bool = False, melds: Sequence[Meld] = (),
+               seat_wind: int = 0, round_wind: int = 0, dealer: bool = False, riichi: bool = False,
+               dora: Sequence[int] = (), flowers: int = 0) -> Score:
+    """
+    Score a winning hand.
+    `counts` are the concealed tiles including `win_tile`; `melds` the exposed sets. Winds count from
+    0 (east). `dora` holds indicator tiles (Riichi) and `flowers` the flowers drawn (MCR).
+    Returns `NO_SCORE` when the tiles do not form a winning hand.
+    """
+    ctx = _Context(int(win_tile), bool(tsumo), seat_wind, round_wind, bool(dealer), bool(riichi),
+                   tuple(int(tile) for tile in dora), flowers)
+    return _score(_counts_key(counts), system, tuple(melds), ctx)
+
+
+def score_batch(counts: np.ndarray, win_tiles: np.ndarray, system: str, tsumo: Optional[np.ndarray] = None,
+                seat_winds: Optional[np.ndarray] = None, dealer: Optional[np.ndarray] = None,
+                dora: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Points of N concealed winning hands.
+    `counts` is (N, >=34) and every other argument is (N,) (`dora` a single indicator per hand);
+    returns an int32 array of points. Hands repeated in the batch or seen before are not rescored.
+    """
+    counts = np.ascontiguousarray(np.asarray(counts)[:, :NUM_PLAYABLE_TILES], dtype=np.int8)
+    n = len(counts)
+    win_tiles = np.asarray(win_tiles).tolist()
+    tsumo = [False] * n if tsumo is None else np.asarray(tsumo, dtype=bool).tolist()
+    seat_winds = [0] * n if seat_winds is None else np.asarray(seat_winds).tolist()
+    dealer = [False] * n if dealer is None else np.asarray(dealer, dtype=bool).tolist()
+    dora = [()] * n if dora is None else [(tile,) for tile in np.asarray(dora).tolist()]
+    keys = counts.tobytes()
+    size = NUM_PLAYABLE_TILES
+
+    points = np.zeros(n, dtype=np.int32)
+    for i in range(n):
+        ctx = _Context(win_tiles[i], tsumo[i], seat_winds[i], 0, dealer[i], False, dora[i], 0)
+        points[i] = _score(keys[i * size:(i + 1) * size], system, (), ctx).points
+    return points
@@ -0,0 +1,180 @@
+"""
+Shanten numbers and winning waits on tile count vectors.
+
+Shanten is the number of tiles a hand still needs before it is ready (tenpai):
+0 means one tile away from winning and -1 means already complete. The standard
+form is evaluated per suit: every suit shape is decomposed once into its best
+(sets, partial sets, pair) options and memoized, so a whole hand only combines
+four small option lists. Seven pairs and thirteen orphans have closed formulas.
+
+Waits reuse the completeness tables of `mahjong.core.decompose`: adding a tile
+only changes one group key, so each candidate tile is a single table lookup.
+
+Both entry points are LRU-cached on the packed count vector, so asking again
+for an unchanged hand (e.g. every opponent on every discard) is a dict lookup.
+"""
+from functools import lru_cache
+from typing import FrozenSet, List, Sequence, Set, Tuple
+
+from mahjong.core.decompose import (
+    FLOWER_OFFSET, HONOR_OFFSET, SETS_ONLY, SETS_AND_PAIR, SUIT_TABLE, HONOR_TABLE, TILE_WEIGHT, pack
+)
+
+NUM_KINDS = FLOWER_OFFSET  # 34 tile kinds without flowers
+TERMINALS_AND_HONORS = (0, 8, 9, 17, 18, 26, 27, 28, 29, 30, 31, 32, 33)
+MAX_PARTIALS = 4
+GROUP_RANGES = ((0, 9), (9, 18), (18, 27), (HONOR_OFFSET, FLOWER_OFFSET))
+
+Option = Tuple[int, int, int]  # (sets, partial sets, pair)
+
+
+def _pareto(options: Set[Option]) -> Tuple[Option, ...]:
+    """Drop options that another option beats on sets and partials with the same pair use"""
+    return tuple(
+        (m, t, p) for (m, t, p) in options
+        if not any(m2 >= m and t2 >= t and p2 == p and (m2, t2) != (m, t) for (m2, t2, p2) in options)
+    )
+
+
+@lru_cache(maxsize=None)
+def _group_options(shape: Tuple[int, ...], honors: bool) -> Tuple[Option, ...]:
+    """All useful (sets, partial sets, pair) decompositions of one suit or of the honors"""
+    counts = list(shape)
+    size = len(counts)
+    found: Set[Option] = set()
+
+    def search(i: int, m: int, t: int, p: int):
+        while i < size and counts[i] == 0:
+            i += 1
+        if i == size:
+            found.add((m, min(t, MAX_PARTIALS), p))
+            return
+        # Triplet
+        if counts[i] >= 3:
+            counts[i] -= 3
+            search(i, m + 1, t, p)
+            counts[i] += 3
+        # Sequence
+        if not honors and i + 2 < size and counts[i + 1] and counts[i + 2]:
+            counts[i] -= 1; counts[i + 1] -= 1; counts[i + 2] -= 1
+            search(i, m + 1, t, p)
+            counts[i] += 1; counts[i + 1] += 1; counts[i + 2] += 1
+        if counts[i] >= 2:
+            counts[i] -= 2
+            # Pair as the head, or as a partial triplet
+            if not p:
+                search(i, m, t, 1)
+            search(i, m, t + 1, p)
+            counts[i] += 2
+        if not honors:
+            # Two-sided / edge wait and closed wait partial sequences
+            for gap in (1, 2):
+                if i + gap < size and counts[i + gap]:
+                    counts[i] -= 1; counts[i + gap] -= 1
+                    search(i, m, t + 1, p)
+                    counts[i] += 1; counts[i + gap] += 1
+        # Leave the tile isolated
+        counts[i] -= 1
+        search(i, m, t, p)
+        counts[i] += 1
+
+    search(0, 0, 0, 0)
+    return _pareto(found)
+
+
+def _counts_key(counts: Sequence[int]) -> bytes:
+    """Pack a count vector into a hashable cache key"""
+    if hasattr(counts, 'tobytes'):
+        if counts.dtype.itemsize != 1:
+            counts = counts.astype('int8')
+        return counts.tobytes()
+    return bytes(counts)
+
+
+def _standard_shanten(counts: List[int], melds: int) -> int:
+    combined: Set[Option] = {(0, 0, 0)}
+    for start, end in GROUP_RANGES:
+        options = _group_options(tuple(counts[start:end]), start == HONOR_OFFSET)
+        combined = set(_pareto({
+            (m + m2, t + t2, p + p2)
+            for (m, t, p) in combined for (m2, t2, p2) in options if p + p2 <= 1
+        }))
+    best = 8
+    for m, t, p in combined:
+        sets = min(m + melds, 4)
+        best = min(best, 8 - 2 * sets - min(t, 4 - sets) - p)
+    return best
+
+
+def _seven_pairs_shanten(counts: List[int]) -> int:
+    pairs = sum(1 for c in counts if c >= 2)
+    kinds = sum(1 for c in counts if c)
+    return 6 - pairs + max(0, 7 - kinds)
+
+
+def _thirteen_orphans_shanten(counts: List[int]) -> int:
+    kinds = sum(1 for t in TERMINALS_AND_HONORS if counts[t])
+    has_pair = any(counts[t] >= 2 for t in TERMINALS_AND_HONORS)
+    return 13 - kinds - has_pair
+
+
+@lru_cache(maxsize=65536)
+def _shanten(key: bytes, melds: int, seven_pairs: bool, thirteen_orphans: bool) -> int:
+    # Flowers are bonus tiles and never part of the hand shape
+    counts = list(key[:NUM_KINDS])
+    best = _standard_shanten(counts, melds)
+    if melds == 0 and sum(counts) >= 13:
+        if seven_pairs:
+            best = min(best, _seven_pairs_shanten(counts))
+        if thirteen_orphans:
+            best = min(best, _thirteen_orphans_shanten(counts))
+    return best
+
+
+@lru_cache(maxsize=65536)
+def _waits(key: bytes, seven_pairs: bool, thirteen_orphans: bool) -> FrozenSet[int]:
+    # Like `is_complete_counts`, a hand still holding flowers cannot win
+    if any(key[NUM_KINDS:]):
+        return frozenset()
+    counts = list(key)
+    keys = [pack(counts[start:end]) for start, end in GROUP_RANGES]
+    tables = (SUIT_TABLE, SUIT_TABLE, SUIT_TABLE, HONOR_TABLE)
+    values = [tables[g][keys[g]] for g in range(4)]
+
+    waits = set()
+    # One extra tile can repair at most one group
+    if values.count(0) <= 1:
+        for group, (start, end) in enumerate(GROUP_RANGES):
+            others = [values[g] for g in range(4) if g != group]
+            # The group holding the new tile must supply whatever the others lack
+            needed = 5 - sum(others)
+            if not all(others) or needed not in (SETS_ONLY, SETS_AND_PAIR):
+                continue
+            table, key = tables[group], keys[group]
+            for tile in range(start, end):
+                if counts[tile] < 4 and table[key + TILE_WEIGHT[tile]] == needed:
+                    waits.add(tile)
+
+    if sum(counts) == 13:
+        if seven_pairs and sum(1 for c in counts if c == 2) == 6:
+            waits.update(t for t in range(NUM_KINDS) if counts[t] == 1)
+        if thirteen_orphans and all(counts[t] == 0 for t in range(NUM_KINDS) if t not in TERMINALS_AND_HONORS):
+            missing = [t for t in TERMINALS_AND_HONORS if not counts[t]]
+            if not missing:
+                waits.update(TERMINALS_AND_HONORS)
+            elif len(missing) == 1:
+                waits.add(missing[0])
+    return frozenset(waits)
+
+
+def shanten(counts: Sequence[int], melds: int = 0, seven_pairs: bool = True, thirteen_orphans: bool = True) -> int:
+    """
+    Shanten number of a concealed count vector with `melds` called sets.
+    Returns -1 for a complete hand and 0 for a ready (tenpai) hand. Flower counts are ignored.
+    """
+    return _shanten(_counts_key(counts), melds, seven_pairs, thirteen_orphans)
+
+
+def waits(counts: Sequence[int], seven_pairs: bool = True, thirteen_orphans: bool = True) -> FrozenSet[int]:
+    """Tiles that complete a concealed hand of 3n+1 tiles (empty unless the hand is tenpai)"""
+    return _waits(_counts_key(counts), seven_pairs, thirteen_orphans)
@@ -0,0 +1,199 @@
+"""
+Game state in one contiguous buffer.
+
+A `StateLayout` places every piece of `MahjongEnv` state at a fixed offset of
+a single byte buffer:
+
+    header          int16  format, variant, players, wall size, then wall position,
+                           current player, last action and last discard (-1 when none),
+                           dora revealed, the seat whose discard is open to claims
+                           (-1 when none), discard lengths and hand sizes per seat
+    wall            int8   (tiles,) in draw order
+    hand_counts     int8   (players, tile types)
+    meld_counts     int8   (players, tile types)
+    discard_counts  int8   (tile types,)
+    seat_discards   int8   (players, tile types)
+    discard_history int8   (players, tiles), `discard_lengths[p]` entries of row p used
+    dora_array      int8   (5,)
+    waiting_actions int8   (5,) CHI, PON, KAN, RON, TSUMO
+    claim_options   bool   (players, 4)
+    action_mask     bool   (actions,)
+    claim_bits      int64  (4, players) pon, kan, chi and cached ron bitsets (-1 when not computed)
+
+`MahjongEnv` keeps its arrays as views into a buffer of this layout and its
+scalars in the header, so its `get_state()` is one copy of the buffer (after
+syncing the claim bitsets) and `set_state()` one copy back. The result is a `GameState`: an immutable value wrapping the
+`bytes`, which are also its serialized form (`bytes(state)`,
+`GameState.from_bytes`) and pickle as such. Equality and the cached hash cover
+everything before `claim_bits`, which only caches what the counts imply, so
+two envs reaching the same position give equal states for transposition tables.
+"""
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from mahjong.core.types import ActionType, MahjongType
+from mahjong.core.tiles import NUM_TILE_TYPES
+
+FORMAT = 1
+NUM_ACTIONS = NUM_TILE_TYPES + 6  # Tiles, then CHI, PON, KAN, RON, TSUMO, PASS
+NUM_CLAIMS = 4
+
+# Header entries before the per-seat lists
+(H_FORMAT, H_VARIANT, H_PLAYERS, H_WALL_SIZE, H_WALL_POS, H_CURRENT_PLAYER, H_LAST_ACTION, H_LAST_DISCARD,
+ H_DORA_REVEALED, H_DISCARDER) = range(10)
+HEADER_FIXED = 10
+
+
+class StateLayout:
+    """Offset, dtype and shape of every field of a state buffer for one table size"""
+
+    def __init__(self, num_players: int, wall_size: int):
+        self.num_players = num_players
+        self.wall_size = wall_size
+        self.fields: Dict[str, Tuple[int, np.dtype, Tuple[int, ...]]] = {}
+        offset = 0
+        for name, dtype, shape in (
+            ('header', np.int16, (HEADER_FIXED + 2 * num_players,)),
+            ('wall', np.int8, (wall_size,)),
+            ('hand_counts', np.int8, (num_players, NUM_TILE_TYPES)),
+            ('meld_counts', np.int8, (num_players, NUM_TILE_TYPES)),
+            ('discard_counts', np.int8, (NUM_TILE_TYPES,)),
+            ('seat_discards', np.int8, (num_players, NUM_TILE_TYPES)),
+            ('discard_history', np.int8, (num_players, wall_size)),
+            ('dora_array', np.int8, (5,)),
+            ('waiting_actions', np.int8, (5,)),
+            ('claim_options', np.bool_, (num_players, NUM_CLAIMS)),
+            ('action_mask', np.bool_, (NUM_ACTIONS,)),
+            ('claim_bits', np.int64, (NUM_CLAIMS, num_players)),
+        ):
+            dtype = np.dtype(dtype)
+            offset = -(-offset // dtype.alignment) * dtype.alignment
+            self.fields[name] = (offset, dtype, shape)
+            offset += dtype.itemsize * int(np.prod(shape))
+        # The position ends where the cached claim bitsets start
+        self.key_size = self.fields['claim_bits'][0]
+        self.size = offset
+
+    def views(self, buffer) -> Dict[str, np.ndarray]:
+        """Arrays over `buffer` (a writable uint8 array for an env, `bytes` for a read-only state)"""
+        return {name: np.frombuffer(buffer, dtype, int(np.prod(shape)), offset).reshape(shape)
+                for name, (offset, dtype, shape) in self.fields.items()}
+
+    def new_buffer(self, mahjong_type: MahjongType) -> np.ndarray:
+        """A zeroed buffer with the fixed part of its header filled in"""
+        buffer = np.zeros(self.size, dtype=np.uint8)
+        self.views(buffer)['header'][:H_WALL_POS] = (FORMAT, mahjong_type, self.num_players, self.wall_size)
+        return buffer
+
+
+@lru_cache(maxsize=None)
+def state_layout(num_players: int, wall_size: int) -> StateLayout:
+    return StateLayout(num_players, wall_size)
+
+
+class GameState:
+    """
+    Immutable snapshot of a game in one `bytes` buffer (see the module docstring).
+    Take it with `MahjongEnv.get_state()`, put it back with `set_state()`.
+    """
+    __slots__ = ('data', 'layout', '_hash')
+
+    def __init__(self, data: bytes, layout: StateLayout):
+        self.data = data
+        self.layout = layout
+        self._hash = None
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'GameState':
+        """Inverse of `bytes(state)`; raises ValueError on a buffer that is not a state of this format"""
+        data = bytes(data)
+        if len(data) < 2 * HEADER_FIXED:
+            raise ValueError(f"Game state needs at least {2 * HEADER_FIXED} bytes, got {len(data)}")
+        header = np.frombuffer(data, np.int16, HEADER_FIXED)
+        if header[H_FORMAT] != FORMAT:
+            raise ValueError(f"Unsupported game state format {header[H_FORMAT]}")
+        MahjongType(int(header[H_VARIANT]))  # ValueError for an unknown variant
+        if header[H_PLAYERS] < 1 or header[H_WALL_SIZE] < 1:
+            raise ValueError("Game state has no players or no wall")
+        layout = state_layout(int(header[H_PLAYERS]), int(header[H_WALL_SIZE]))
+        if len(data) != layout.size:
+            raise ValueError(f"Game state of {header[H_PLAYERS]} players and {header[H_WALL_SIZE]} tiles "
+                             f"has {layout.size} bytes, got {len(data)}")
+        return cls(data, layout)
+
+    def to_bytes(self) -> bytes:
+        return self.data
+
+    def __bytes__(self) -> bytes:
+        return self.data
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __reduce__(self):
+        return GameState.from_bytes, (self.data,)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, GameState):
+            return NotImplemented
+        key = self.layout.key_size
+        return len(self.data) == len(other.data) and memoryview(self.data)[:key] == memoryview(other.data)[:key]
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(self.data[:self.layout.key_size])
+        return self._hash
+
+    def __repr__(self) -> str:
+        return (f"GameState({self.mahjong_type.name}, players={self.layout.num_players}, "
+                f"wall_pos={self.wall_pos}, current_player={self.current_player})")
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Read-only views of every field, without copying"""
+        return self.layout.views(self.data)
+
+    @property
+    def header(self) -> np.ndarray:
+        return np.frombuffer(self.data, np.int16, HEADER_FIXED + 2 * self.layout.num_players)
+
+    @property
+    def mahjong_type(self) -> MahjongType:
+        return MahjongType(int(self.header[H_VARIANT]))
+
+    @property
+    def wall_pos(self) -> int:
+        return int(self.header[H_WALL_POS])
+
+    @property
+    def current_player(self) -> int:
+        return int(self.header[H_CURRENT_PLAYER])
+
+    @property
+    def last_action(self) -> Optional[ActionType]:
+        value = int(self.header[H_LAST_ACTION])
+        return None if value < 0 else ActionType(value)
+
+    @property
+    def last_discard(self) -> Optional[int]:
+        value = int(self.header[H_LAST_DISCARD])
+        return None if value < 0 else value
+
+    @property
+    def dora_revealed(self) -> int:
+        return int(self.header[H_DORA_REVEALED])
+
+    @property
+    def discarder(self) -> Optional[int]:
+        """The seat whose discard is open to claims, if any"""
+        value = int(self.header[H_DISCARDER])
+        return None if value < 0 else value
+
+    @property
+    def discard_lengths(self) -> np.ndarray:
+        return self.header[HEADER_FIXED:HEADER_FIXED + self.layout.num_players]
+
+    @property
+    def hand_sizes(self) -> np.ndarray:
+        return self.header[HEADER_FIXED + self.layout.num_players:]
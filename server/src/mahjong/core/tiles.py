@@ -0,0 +1,110 @@
+"""
+Precomputed tile attributes, indexed by the plain int value of a `TileType`.
+
+Rules code used to rebuild `TileType(value)` enums and recompute
+`value // 9` and `value % 9` inside its loops; these tables answer the same
+questions with one index. The NumPy arrays are read-only and suit batched
+code (`SUIT[tiles]`); the tuples are for scalar loops, where indexing a
+tuple is cheaper than indexing an array.
+
+Suits are 0 man, 1 pin, 2 sou, 3 honors and 4 flowers. Ranks count from 0
+within each group, so a suit tile's rank is its number minus one.
+"""
+from typing import Tuple
+
+import numpy as np
+
+from mahjong.core.types import TileType
+
+NUM_TILE_TYPES = len(TileType)
+NUM_SUIT_TILES = int(TileType.WIND_EAST)
+NUM_PLAYABLE_TILES = int(TileType.DRAGON_WHITE) + 1
+
+MAN, PIN, SOU, HONOR, FLOWER = range(5)
+
+_WINDS = [TileType.WIND_EAST, TileType.WIND_SOUTH, TileType.WIND_WEST, TileType.WIND_NORTH]
+_DRAGONS = [TileType.DRAGON_WHITE, TileType.DRAGON_GREEN, TileType.DRAGON_RED]
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    array.flags.writeable = False
+    return array
+
+
+def _suit(tile: int) -> int:
+    if tile < NUM_SUIT_TILES:
+        return tile // 9
+    return HONOR if tile < NUM_PLAYABLE_TILES else FLOWER
+
+
+def _rank(tile: int) -> int:
+    if tile < NUM_SUIT_TILES:
+        return tile % 9
+    return tile - NUM_SUIT_TILES if tile < NUM_PLAYABLE_TILES else tile - NUM_PLAYABLE_TILES
+
+
+def _chi_pairs(tile: int) -> Tuple[Tuple[int, int], ...]:
+    """The two other tiles of every sequence `tile` can complete"""
+    if tile >= NUM_SUIT_TILES:
+        return ()
+    rank = tile % 9
+    pairs = []
+    if rank <= 6:
+        pairs.append((tile + 1, tile + 2))
+    if 1 <= rank <= 7:
+        pairs.append((tile - 1, tile + 1))
+    if rank >= 2:
+        pairs.append((tile - 2, tile - 1))
+    return tuple(pairs)
+
+
+def _chi_targets(tile: int) -> Tuple[int, ...]:
+    """Discards whose chi can use `tile`: same suit, at most two ranks away"""
+    if tile >= NUM_SUIT_TILES:
+        return ()
+    base = tile - tile % 9
+    return tuple(range(max(base, tile - 2), min(base + 9, tile + 3)))
+
+
+def _dora_next(tile: int) -> int:
+    """The tile a dora indicator points at: the next number, wind or dragon, wrapping around"""
+    if tile < NUM_SUIT_TILES:
+        return tile - tile % 9 + (tile % 9 + 1) % 9
+    for cycle in (_WINDS, _DRAGONS):
+        if tile in cycle:
+            return int(cycle[(cycle.index(tile) + 1) % len(cycle)])
+    return tile  # flowers are never indicators
+
+
+_TILES = range(NUM_TILE_TYPES)
+
+# Scalar tables
+SUIT_OF: Tuple[int, ...] = tuple(_suit(tile) for tile in _TILES)
+RANK_OF: Tuple[int, ...] = tuple(_rank(tile) for tile in _TILES)
+CHI_PAIRS: Tuple[Tuple[Tuple[int, int], ...], ...] = tuple(_chi_pairs(tile) for tile in _TILES)
+CHI_TARGETS: Tuple[Tuple[int, ...], ...] = tuple(_chi_targets(tile) for tile in _TILES)
+DORA_OF: Tuple[int, ...] = tuple(_dora_next(tile) for tile in _TILES)
+
+# Array tables
+SUIT = _read_only(np.array(SUIT_OF, dtype=np.int8))
+RANK = _read_only(np.array(RANK_OF, dtype=np.int8))
+IS_SUIT = _read_only(SUIT < HONOR)
+IS_HONOR = _read_only(SUIT == HONOR)
+IS_FLOWER = _read_only(SUIT == FLOWER)
+DORA_NEXT = _read_only(np.array(DORA_OF, dtype=np.int8))
+
+# Chi-neighbour triples: CHI_SEQUENCES[t, k] is the k-th sequence containing t (start, middle, end
+# position), CHI_NEEDS[t, k] its two other tiles and CHI_VALID[t, k] whether it exists at all;
+# missing entries point at tile 0 so the arrays can be used as gather indices
+CHI_SEQUENCES = np.zeros((NUM_TILE_TYPES, 3, 3), dtype=np.int8)
+CHI_NEEDS = np.zeros((NUM_TILE_TYPES, 3, 2), dtype=np.int8)
+CHI_VALID = np.zeros((NUM_TILE_TYPES, 3), dtype=bool)
+for _tile in range(NUM_SUIT_TILES):
+    for _k, _start in enumerate((_tile, _tile - 1, _tile - 2)):
+        if _start // 9 == _tile // 9 and _start >= 0 and _start % 9 <= 6:
+            CHI_SEQUENCES[_tile, _k] = (_start, _start + 1, _start + 2)
+            CHI_NEEDS[_tile, _k] = [t for t in (_start, _start + 1, _start + 2) if t != _tile]
+            CHI_VALID[_tile, _k] = True
+for _array in (CHI_SEQUENCES, CHI_NEEDS, CHI_VALID):
+    _read_only(_array)
+del _tile, _k, _start, _array
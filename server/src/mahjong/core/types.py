@@ -66,6 +66,7 @@ class ActionType(IntEnum):
     KAN = 104    # 杠
     RON = 105    # 胡
     TSUMO = 106  # 自摸
+    PASS = 107   # 过
 
 class MahjongType(IntEnum):
     """麻将类型"""
@@ -0,0 +1,58 @@
+"""
+Seeded wall generation and compact wall encoding.
+
+A wall is an int8 array of tile ids, one per tile of the variant's tile set
+(see `mahjong.core.ruleset`): 144 for INTERNATIONAL (flowers included), 136
+for JAPAN and 108 for SICHUAN. Both environments build
+it as a single permutation of a precomputed tile array drawn from their
+seeded Generator, so a game is fully determined by (seed, mahjong_type):
+`wall_from_seed` rebuilds the wall `MahjongEnv.reset(seed=seed)` plays.
+
+`encode_wall` stores a wall as one byte per tile, which is enough to replay a
+game with `MahjongEnv.reset(options={'wall': data})` even when the seed is
+unknown.
+"""
+from typing import Union
+
+import numpy as np
+
+from mahjong.core.types import TileType, MahjongType
+from mahjong.core.ruleset import get_ruleset
+
+DEAD_WALL = 5  # Last 5 tiles are dora indicators
+
+
+def wall_tiles(mahjong_type: MahjongType) -> np.ndarray:
+    """Unshuffled (read-only) wall of a variant"""
+    return get_ruleset(mahjong_type).tiles
+
+
+def shuffle_wall(rng: np.random.Generator, mahjong_type: MahjongType) -> np.ndarray:
+    """New shuffled wall drawn from `rng`"""
+    return rng.permutation(get_ruleset(mahjong_type).tiles)
+
+
+def wall_from_seed(seed: int, mahjong_type: MahjongType = MahjongType.INTERNATIONAL) -> np.ndarray:
+    """The wall dealt by `MahjongEnv(mahjong_type=mahjong_type).reset(seed=seed)`"""
+    return shuffle_wall(np.random.default_rng(seed), mahjong_type)
+
+
+def encode_wall(wall: np.ndarray) -> bytes:
+    """One byte per tile, in wall order"""
+    return np.asarray(wall, dtype=np.int8).tobytes()
+
+
+def decode_wall(data: Union[bytes, np.ndarray], mahjong_type: MahjongType = MahjongType.INTERNATIONAL) -> np.ndarray:
+    """Inverse of `encode_wall`; raises ValueError unless `data` is a full wall of `mahjong_type`"""
+    if isinstance(data, np.ndarray):
+        wall = data.astype(np.int8)
+    else:
+        wall = np.frombuffer(data, dtype=np.int8).copy()
+    ruleset = get_ruleset(mahjong_type)
+    expected = ruleset.tiles
+    if len(wall) != len(expected):
+        raise ValueError(f"{mahjong_type.name} wall has {len(expected)} tiles, got {len(wall)}")
+    if wall.min() < 0 or wall.max() >= len(TileType) \
+            or not np.array_equal(np.bincount(wall, minlength=len(TileType)), ruleset.tile_counts):
+        raise ValueError(f"Not a permutation of the {mahjong_type.name} tile set")
+    return wall
@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from mahjong.app.main import app
+from mahjong.app.api.models.user import Base
+from mahjong.app.config.database import create_tables, get_db
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Path of a SQLite file with the app's schema; override it in a module to seed rows"""
+    path = tmp_path / "app.db"
+
+    async def create():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        async with engine.begin() as conn:
+            await conn.run_sync(create_tables, Base.metadata)
+        await engine.dispose()
+
+    asyncio.run(create())
+    return path
+
+
+@pytest.fixture
+def client(database):
+    """A TestClient whose requests get sessions on `database`"""
+    engines = []
+
+    async def test_db():
+        # Created lazily so the engine belongs to the test client's event loop
+        if not engines:
+            engines.append(create_async_engine(f"sqlite+aiosqlite:///{database}"))
+        async with async_sessionmaker(engines[0], expire_on_commit=False)() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = test_db
+    with TestClient(app) as c:
+        yield c
+    app.dependency_overrides.pop(get_db, None)
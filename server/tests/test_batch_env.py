@@ -0,0 +1,100 @@
+import numpy as np
+
+from mahjong.core.types import TileType, MahjongType
+from mahjong.core.env import MahjongEnv
+from mahjong.core.batch_env import RON, BatchedMahjongEnv
+
+PASS = len(TileType) + 5
+
+
+def pick_actions(rng, obs, masks):
+    """Mostly discard a held tile or pass, sometimes try a special or an illegal action"""
+    actions = []
+    for hand, waiting, mask in zip(obs['hand'], obs['waiting_actions'], masks):
+        roll = rng.random()
+        if roll < 0.05:
+            actions.append(rng.integers(len(TileType) + 6))
+        elif roll < 0.5 and waiting.any():
+            actions.append(len(TileType) + rng.choice(np.flatnonzero(waiting)))
+        else:
+            actions.append(PASS if mask[PASS] else rng.choice(np.flatnonzero(hand)))
+    return np.array(actions)
+
+
+def assert_obs_equal(batched, scalar, row):
+    for key, value in scalar.items():
+        np.testing.assert_array_equal(batched[key][row], value, err_msg=key)
+
+
+def test_batched_env_matches_scalar_env():
+    num_envs, seed = 6, 123
+    for mahjong_type in (MahjongType.INTERNATIONAL, MahjongType.JAPAN):
+        batched = BatchedMahjongEnv(num_envs, mahjong_type=mahjong_type)
+        envs = [MahjongEnv(mahjong_type=mahjong_type) for _ in range(num_envs)]
+        obs, info = batched.reset(seed=seed)
+        for i, env in enumerate(envs):
+            scalar_obs, scalar_info = env.reset(seed=seed + i)
+            assert_obs_equal(obs, scalar_obs, i)
+            np.testing.assert_array_equal(info['action_mask'][i], scalar_info['action_mask'])
+
+        rng = np.random.default_rng(0)
+        for _ in range(400):
+            actions = pick_actions(rng, obs, info['action_mask'])
+            obs, rewards, terminated, truncated, info = batched.step(actions)
+            for i, env in enumerate(envs):
+                scalar_obs, reward, term, trunc, scalar_info = env.step(int(actions[i]))
+                assert rewards[i] == reward
+                assert terminated[i] == term and truncated[i] == trunc
+                if term or trunc:
+                    assert_obs_equal(info['final_obs'], scalar_obs, i)
+                    scalar_obs, scalar_info = env.reset()
+                assert_obs_equal(obs, scalar_obs, i)
+                np.testing.assert_array_equal(info['action_mask'][i], scalar_info['action_mask'])
+
+
+def test_batched_env_auto_resets_finished_tables():
+    env = BatchedMahjongEnv(4)
+    obs, info = env.reset(seed=0)
+    finished = 0
+    for _ in range(200):
+        actions = np.array([PASS if mask[PASS] else np.flatnonzero(hand)[0]
+                            for hand, mask in zip(obs['hand'], info['action_mask'])])
+        obs, _, terminated, truncated, info = env.step(actions)
+        if (terminated | truncated).any():
+            finished += 1
+            assert 'final_obs' in info
+            done = np.flatnonzero(terminated | truncated)
+            assert (env.discards[done] == 0).all()
+    assert finished > 0
+
+
+def test_batched_env_tsumo_terminates_and_resets():
+    env = BatchedMahjongEnv(2)
+    env.reset(seed=1)
+    winning = np.bincount([0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 9, 9, 27, 27], minlength=len(TileType))
+    env.hands[0, 0] = winning
+    env.waiting_actions[0, 4] = 1
+    tsumo = len(TileType) + 4
+
+    obs, rewards, terminated, truncated, info = env.step(np.array([tsumo, tsumo]))
+    assert rewards.tolist() == [15, 0]
+    assert terminated.tolist() == [True, False]
+    np.testing.assert_array_equal(info['final_obs']['hand'][0], winning)
+    assert obs['hand'][0].sum() == 14
+
+
+def test_batched_env_ron_on_an_open_discard():
+    env = BatchedMahjongEnv(2, mahjong_type=MahjongType.JAPAN)
+    env.reset(seed=3)
+    # Seat 1 waits on 9 or 27 with 13 tiles and seat 0 holds a 9 to discard
+    env.hands[:, 1] = np.bincount([0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 9, 27, 27], minlength=len(TileType))
+    env.hands[:, 0, 9] += 1
+    ron = len(TileType) + 3
+
+    _, rewards, terminated, _, _ = env.step(np.array([9, 9]))
+    assert rewards.tolist() == [0, 0] and not terminated.any()
+    assert env.discarder.tolist() == [0, 0] and env.current_player.tolist() == [1, 1]
+    assert env.claim_options[:, 1, RON].all()
+
+    _, rewards, terminated, _, _ = env.step(np.array([ron, PASS]))
+    assert terminated.tolist() == [True, False] and rewards[0] > 0
@@ -0,0 +1,130 @@
+import asyncio
+import time
+
+import pytest
+from jose import jwt
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from mahjong.app import cache as cache_module
+from mahjong.app.api.models.user import User
+from mahjong.app.auth import security
+from mahjong.app.cache import (LRUCache, RedisCache, get_profile, get_verified_token, profile_key, remember_token,
+                               set_profile)
+
+
+class FakeRedis:
+    """The subset of redis.asyncio.Redis used by RedisCache, with a controllable clock"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.data = {}
+
+    async def get(self, key):
+        item = self.data.get(key)
+        if item is None or (item[1] is not None and item[1] <= self.now):
+            return None
+        return item[0].encode()
+
+    async def set(self, key, value, px=None):
+        self.data[key] = (value, None if px is None else self.now + px / 1000)
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def client(client, monkeypatch):
+    monkeypatch.setattr(cache_module, "cache", LRUCache())
+    return client
+
+
+def _login(client, username):
+    user = {"username": username, "email": f"{username}@example.com", "password": "secret"}
+    assert client.post("/api/users/register", json=user).status_code == 200
+    token = client.post("/api/users/login", json={"username": username, "password": "secret"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_lru_expires_and_evicts():
+    clock = Clock()
+    backend = LRUCache(maxsize=2, clock=clock)
+
+    async def scenario():
+        await backend.set("a", "1", ttl=10)
+        await backend.set("b", "2")
+        assert await backend.get("a") == "1"  # "a" is now the most recently used
+        await backend.set("c", "3")
+        assert await backend.get("b") is None
+        clock.now = 10
+        assert await backend.get("a") is None
+        assert await backend.get("c") == "3"
+
+    asyncio.run(scenario())
+    assert len(backend) == 1
+
+
+def test_redis_backend_round_trip():
+    redis = FakeRedis()
+    backend = RedisCache(redis)
+
+    async def scenario():
+        await remember_token(backend, "token", "alice", time.time() + 30)
+        assert await get_verified_token(backend, "token") == "alice"
+        await remember_token(backend, "expired", "alice", time.time() - 1)
+        assert await get_verified_token(backend, "expired") is None
+
+        await set_profile(backend, "alice", {"username": "alice", "win_count": 1}, ttl=5)
+        assert await get_profile(backend, "alice") == {"username": "alice", "win_count": 1}
+        redis.now = 5
+        assert await get_profile(backend, "alice") is None
+
+        await set_profile(backend, "bob", {"username": "bob"})
+        backend.delete_nowait(profile_key("bob"))
+        await asyncio.sleep(0)
+        assert await get_profile(backend, "bob") is None
+
+    asyncio.run(scenario())
+    assert all(key.startswith("mahjong:") for key in redis.data)
+
+
+def test_verified_tokens_skip_decoding(client, monkeypatch):
+    headers = _login(client, "alice")
+    calls = []
+    decode = jwt.decode
+    monkeypatch.setattr(security.jwt, "decode", lambda *args, **kwargs: calls.append(1) or decode(*args, **kwargs))
+
+    for _ in range(3):
+        assert client.get("/api/users/me", headers=headers).json()["username"] == "alice"
+    assert len(calls) == 1
+    assert client.get("/api/users/me", headers={"Authorization": "Bearer invalid"}).status_code == 401
+
+
+def test_stat_writes_invalidate_cached_profile(client, database):
+    headers = _login(client, "carol")
+    assert client.get("/api/users/me", headers=headers).json()["win_count"] == 0
+
+    async def record_win():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{database}")
+        async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+            user = await session.scalar(select(User).where(User.username == "carol"))
+            user.email = "carol@example.org"
+            await session.commit()
+            # Only stat fields invalidate the profile
+            assert await get_profile(cache_module.cache, "carol") is not None
+            user.win_count += 1
+            user.total_score += 8
+            await session.commit()
+        await engine.dispose()
+
+    asyncio.run(record_win())
+    me = client.get("/api/users/me", headers=headers).json()
+    assert me["win_count"] == 1 and me["total_score"] == 8
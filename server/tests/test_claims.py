@@ -0,0 +1,75 @@
+import numpy as np
+
+from mahjong.core.types import TileType, ActionType
+from mahjong.core.rules import MahjongRules
+from mahjong.core.claims import ClaimEngine, CHI, PON, KAN, RON
+from mahjong.core.wall import wall_from_seed
+
+
+def brute_force(counts, tile):
+    rules = MahjongRules()
+    return [
+        rules.is_valid_chi_counts(counts, tile),
+        counts[tile] >= 2,
+        counts[tile] == 3,
+        counts.sum() == 13 and tile in rules.waits(counts, seven_pairs=False, thirteen_orphans=False),
+    ]
+
+
+def test_incremental_bitsets_match_hand_scans():
+    rng = np.random.default_rng(0)
+    hands = np.zeros((4, len(TileType)), dtype=np.int8)
+    engine = ClaimEngine(hands)
+    wall = wall_from_seed(1)
+    for player in range(4):
+        np.add.at(hands[player], wall[player * 13:(player + 1) * 13], 1)
+    engine.rebuild()
+    position = 52
+    for _ in range(300):
+        player = int(rng.integers(4))
+        if hands[player].sum() > 13 or (rng.random() < 0.5 and hands[player].sum() > 10):
+            tile = int(rng.choice(np.flatnonzero(hands[player])))
+            hands[player, tile] -= 1
+        else:
+            tile = int(wall[position % len(wall)])
+            position += 1
+            if hands[player, tile] == 4:
+                continue
+            hands[player, tile] += 1
+        engine.update(player, tile)
+        for target in range(TileType.DRAGON_WHITE + 1):
+            expected = brute_force(hands[player], target)
+            actual = [engine.can_chi(player, target), engine.can_pon(player, target),
+                      engine.can_kan(player, target), engine.can_ron(player, target)]
+            assert actual == expected, (player, target)
+
+
+def set_hand(hands, player, tiles):
+    hands[player] = 0
+    np.add.at(hands[player], tiles, 1)
+
+
+def test_priority_and_chi_seat():
+    hands = np.zeros((4, len(TileType)), dtype=np.int8)
+    engine = ClaimEngine(hands)
+    # Player 1 can chi 3m, player 2 can pon it, player 3 waits on it
+    set_hand(hands, 0, [TileType.MAN_3] * 3)
+    set_hand(hands, 1, [TileType.MAN_1, TileType.MAN_2, TileType.PIN_5])
+    set_hand(hands, 2, [TileType.MAN_3, TileType.MAN_3, TileType.SOU_1])
+    set_hand(hands, 3, [TileType.MAN_1, TileType.MAN_2, TileType.PIN_1, TileType.PIN_2, TileType.PIN_3,
+                        TileType.SOU_4, TileType.SOU_5, TileType.SOU_6, TileType.WIND_EAST, TileType.WIND_EAST,
+                        TileType.WIND_EAST, TileType.DRAGON_RED, TileType.DRAGON_RED])
+    engine.rebuild()
+
+    eligible = engine.eligible(TileType.MAN_3, discarder=0)
+    assert not eligible[0].any()
+    assert eligible[1, CHI] and eligible[2, PON] and eligible[3, RON]
+    assert engine.resolve(TileType.MAN_3, discarder=0) == [
+        (3, ActionType.RON), (2, ActionType.PON), (1, ActionType.CHI)]
+
+    # Player 3 is not the next seat of player 1, so it cannot chi 3m
+    set_hand(hands, 3, [TileType.MAN_1, TileType.MAN_2])
+    engine.rebuild()
+    assert engine.can_chi(3, TileType.MAN_3)
+    assert not engine.eligible(TileType.MAN_3, discarder=1)[3, CHI]
+    assert engine.eligible(TileType.MAN_3, discarder=2)[3, CHI]
@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+
+from mahjong.core.types import TileType, MahjongType
+from mahjong.core.env import MahjongEnv
+
+RON = len(TileType) + 3
+PASS = len(TileType) + 5
+
+
+def first_held_tile(obs):
+    return int(np.flatnonzero(obs['hand'])[0])
+
+
+def test_zero_copy_observations_match_copies():
+    copying = MahjongEnv()
+    zero_copy = MahjongEnv(zero_copy=True)
+    obs_a, _ = copying.reset(seed=5)
+    obs_b, _ = zero_copy.reset(seed=5)
+    for _ in range(30):
+        assert obs_a.keys() == obs_b.keys()
+        for key in obs_a:
+            np.testing.assert_array_equal(obs_a[key], obs_b[key], err_msg=key)
+        action = first_held_tile(obs_a)
+        obs_a, *_ = copying.step(action)
+        obs_b, *_ = zero_copy.step(action)
+
+
+def test_zero_copy_observations_are_read_only_views():
+    env = MahjongEnv(zero_copy=True)
+    obs, _ = env.reset(seed=0)
+    with pytest.raises(ValueError):
+        obs['hand'][0] = 1
+    discards_before = obs['discards'].sum()
+    env.step(first_held_tile(obs))
+    assert obs['discards'].sum() == discards_before + 1
+
+
+def test_count_arrays_track_discards_and_draws():
+    env = MahjongEnv()
+    obs, _ = env.reset(seed=3)
+    assert obs['hand'].sum() == 14
+    tile = first_held_tile(obs)
+    obs, reward, *_ = env.step(tile)
+    assert reward == 0
+    while env.discarder is not None:
+        obs, *_ = env.step(PASS)
+    assert env.discard_counts[tile] == 1
+    assert env.hand_counts[0].sum() == 13
+    assert env.current_player == 1
+    assert obs['hand'].sum() == 14
+    assert sorted(env.hands[0]) == [TileType(t) for t in np.repeat(np.arange(len(TileType)), env.hand_counts[0])]
+
+
+def test_actions_allowed_by_the_mask_are_never_penalized():
+    env = MahjongEnv()
+    obs, info = env.reset(seed=8)
+    rng = np.random.default_rng(8)
+    for _ in range(200):
+        mask = info['action_mask']
+        np.testing.assert_array_equal(mask[:len(TileType)], (obs['hand'] > 0) & (env.discarder is None))
+        assert not mask[len(TileType):].any() or obs['waiting_actions'].any()
+        action = int(rng.choice(np.flatnonzero(mask)))
+        obs, reward, terminated, truncated, info = env.step(action)
+        assert reward >= 0
+        if terminated or truncated:
+            obs, info = env.reset()
+
+
+def test_reject_masked_leaves_state_untouched():
+    env = MahjongEnv(reject_masked=True)
+    obs, info = env.reset(seed=2)
+    illegal = int(np.flatnonzero(~info['action_mask'])[0])
+    hand_before = env.hand_counts.copy()
+    with pytest.raises(ValueError):
+        env.step(illegal)
+    np.testing.assert_array_equal(env.hand_counts, hand_before)
+    env.step(int(np.flatnonzero(info['action_mask'])[0]))
+
+
+def ron_position(env):
+    """Seat 1 waits on 9 or 27 with 13 tiles and seat 0 holds a 9 to discard"""
+    env.reset(seed=3)
+    env.hand_counts[1] = np.bincount([0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 9, 27, 27], minlength=len(TileType))
+    env.hand_counts[0] = np.bincount([9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22],
+                                     minlength=len(TileType))
+    env.claims.rebuild()
+    env._update_action_mask()
+
+
+def test_discard_is_claimed_on_the_13_tile_hands_before_the_next_draw():
+    env = MahjongEnv(mahjong_type=MahjongType.JAPAN)
+    ron_position(env)
+    wall_pos = env.wall_pos
+    obs, reward, terminated, truncated, info = env.step(9)
+    assert (reward, terminated, truncated) == (0, False, False)
+    assert env.discarder == 0 and env.current_player == 1
+    assert env.wall_pos == wall_pos and env.hand_counts[1].sum() == 13
+    assert info['action_mask'][RON] and info['action_mask'][PASS]
+    assert not info['action_mask'][:len(TileType)].any()
+
+    _, reward, terminated, _, _ = env.step(RON)
+    assert terminated and reward == env.ruleset.rewards[3] > 0
+
+
+def test_passing_every_claim_lets_the_next_seat_draw():
+    env = MahjongEnv(mahjong_type=MahjongType.JAPAN)
+    ron_position(env)
+    wall_pos = env.wall_pos
+    env.step(9)
+    while env.discarder is not None:
+        _, reward, *_ = env.step(PASS)
+        assert reward == 0
+    assert env.current_player == 1
+    assert env.wall_pos == wall_pos + 1 and env.hand_counts[1].sum() == 14
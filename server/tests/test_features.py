@@ -0,0 +1,78 @@
+import numpy as np
+
+from mahjong.core.types import TileType, MahjongType
+from mahjong.core.env import MahjongEnv
+from mahjong.core.batch_env import BatchedMahjongEnv
+from mahjong.core.features import FeatureEncoder
+
+from test_batch_env import PASS, pick_actions
+
+
+def discard(env, tile):
+    env.hand_counts[env.current_player, tile] += 1
+    env.step(tile)
+    while env.discarder is not None:
+        env.step(PASS)
+
+
+def test_encoder_layout():
+    encoder = FeatureEncoder()
+    assert encoder.num_channels == len(encoder.channels) == 4 + 4 * 8 + 2
+    env = MahjongEnv()
+    env.reset(seed=4)
+    features = encoder.encode(env)
+    assert features.shape == (38, 34) and features.dtype == np.int8
+
+    hand = env.hand_counts[0, :34]
+    for level in range(4):
+        np.testing.assert_array_equal(features[level], hand > level)
+    assert features[encoder.channels.index('dora')].sum() == (env.dora_indicators[0] < 34)
+    assert (features[-1] == env.tiles_left).all()
+
+
+def test_discard_planes_are_relative_and_newest_first():
+    encoder = FeatureEncoder(history=2)
+    env = MahjongEnv(mahjong_type=MahjongType.JAPAN)
+    env.reset(seed=0)
+    # Seats 0..3 discard, then seat 0 again
+    for tile in (TileType.MAN_1, TileType.PIN_1, TileType.SOU_1, TileType.WIND_EAST, TileType.MAN_9):
+        discard(env, tile)
+
+    features = encoder.encode(env, seat=1)
+    channel = {name: features[i] for i, name in enumerate(encoder.channels)}
+    assert np.flatnonzero(channel['seat+0.discard-0']).tolist() == [TileType.PIN_1]
+    assert not channel['seat+0.discard-1'].any()
+    # Seat 0 sits three places after seat 1
+    assert np.flatnonzero(channel['seat+3.discard-0']).tolist() == [TileType.MAN_9]
+    assert np.flatnonzero(channel['seat+3.discard-1']).tolist() == [TileType.MAN_1]
+    assert channel['seat+3.discards'].sum() == 2
+    assert np.flatnonzero(channel['seat+2.discard-0']).tolist() == [TileType.WIND_EAST]
+
+
+def test_batch_encoding_matches_scalar_and_reuses_buffers():
+    num_envs, seed = 4, 9
+    encoder = FeatureEncoder(dtype=np.float16)
+    batched = BatchedMahjongEnv(num_envs)
+    envs = [MahjongEnv() for _ in range(num_envs)]
+    obs, info = batched.reset(seed=seed)
+    for i, env in enumerate(envs):
+        env.reset(seed=seed + i)
+
+    out = encoder.buffer(num_envs)
+    single = encoder.buffer()
+    rng = np.random.default_rng(2)
+    for _ in range(150):
+        actions = pick_actions(rng, obs, info['action_mask'])
+        obs, _, _, _, info = batched.step(actions)
+        for i, env in enumerate(envs):
+            _, _, term, trunc, _ = env.step(int(actions[i]))
+            if term or trunc:
+                env.reset()
+        assert encoder.encode_batch(batched, out=out) is out
+        assert out.dtype == np.float16
+        for i, env in enumerate(envs):
+            np.testing.assert_array_equal(out[i], encoder.encode(env, out=single))
+        seats = rng.integers(0, 4, size=num_envs)
+        features = encoder.encode_batch(batched, seats=seats)
+        for i, env in enumerate(envs):
+            np.testing.assert_array_equal(features[i], encoder.encode(env, seat=int(seats[i])))
@@ -0,0 +1,163 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from mahjong.core.env import MahjongEnv
+from mahjong.core.features import FeatureEncoder
+from mahjong.ai.policy import NUM_ACTIONS, LinearPolicy, load_policy, masked_argmax
+from mahjong.app import inference
+from mahjong.app.inference import InferenceServer
+from mahjong.app.game import Table, TableManager
+
+
+class RecordingPolicy:
+    def __init__(self, policy):
+        self.policy = policy
+        self.sizes = []
+
+    def __call__(self, features):
+        self.sizes.append(len(features))
+        return self.policy(features)
+
+
+def test_linear_policy_round_trip_and_masking(tmp_path):
+    encoder = FeatureEncoder()
+    policy = load_policy(encoder=encoder)
+    path = str(tmp_path / "policy.npz")
+    policy.save(path)
+    loaded = load_policy(path)
+
+    features = np.random.default_rng(0).integers(0, 4, size=(5,) + encoder.shape).astype(np.int8)
+    np.testing.assert_array_equal(loaded(features), policy(features))
+    masks = np.zeros((5, NUM_ACTIONS), dtype=bool)
+    masks[np.arange(5), [0, 3, 7, 40, 46]] = True
+    assert masked_argmax(policy(features), masks).tolist() == [0, 3, 7, 40, 46]
+
+
+def test_concurrent_requests_share_batches():
+    encoder = FeatureEncoder()
+    policy = RecordingPolicy(LinearPolicy.random(encoder.num_channels * encoder.shape[1], seed=1))
+    envs = []
+    for seed in range(10):
+        env = MahjongEnv()
+        env.reset(seed=seed)
+        envs.append(env)
+
+    async def scenario():
+        server = InferenceServer(policy, max_batch=4, max_wait_us=200_000)
+        try:
+            actions = await asyncio.gather(*(server.act(env) for env in envs))
+        finally:
+            await server.stop()
+        return actions, server.metrics()
+
+    actions, metrics = asyncio.run(scenario())
+    assert policy.sizes == [4, 4, 2]
+    assert metrics['requests'] == 10 and metrics['batches'] == 3 and metrics['batch_size_mean'] == 10 / 3
+    features = np.stack([encoder.encode(env) for env in envs])
+    masks = np.stack([env.action_mask for env in envs])
+    assert actions == masked_argmax(policy.policy(features), masks).tolist()
+    assert all(env.action_mask[action] for env, action in zip(envs, actions))
+
+
+def test_a_lone_request_waits_at_most_max_wait():
+    env = MahjongEnv()
+    env.reset(seed=0)
+
+    async def scenario():
+        server = InferenceServer(max_batch=64, max_wait_us=1000)
+        try:
+            return await asyncio.wait_for(server.act(env), 1)
+        finally:
+            await server.stop()
+
+    assert env.action_mask[asyncio.run(scenario())]
+
+
+def test_policy_errors_reach_every_waiter():
+    def broken(features):
+        raise RuntimeError("model failed")
+
+    async def scenario():
+        server = InferenceServer(broken, max_batch=2, max_wait_us=100)
+        mask = np.ones(NUM_ACTIONS, dtype=bool)
+        results = await asyncio.gather(*(server.infer(server.encoder.buffer(), mask) for _ in range(3)),
+                                       return_exceptions=True)
+        await server.stop()
+        return results, server.failures
+
+    results, failures = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert failures == 2
+
+
+def test_a_model_that_fails_to_load_fails_every_batch_without_reloading(tmp_path, monkeypatch):
+    monkeypatch.setattr("mahjong.app.inference.POLICY_MODEL", str(tmp_path / "missing.npz"))
+    loads = []
+
+    def counting_load_policy(*args):
+        loads.append(threading.current_thread().name)
+        return load_policy(*args)
+
+    monkeypatch.setattr(inference, "load_policy", counting_load_policy)
+
+    async def scenario():
+        server = InferenceServer(max_batch=2, max_wait_us=100)
+        mask = np.ones(NUM_ACTIONS, dtype=bool)
+        first = await asyncio.gather(*(server.infer(server.encoder.buffer(), mask) for _ in range(2)),
+                                     return_exceptions=True)
+        # The batching task survives, but the next batch fails fast on the remembered error
+        second = await asyncio.gather(asyncio.wait_for(server.infer(server.encoder.buffer(), mask), 5),
+                                      return_exceptions=True)
+        await server.stop()
+        return first + second, server.failures
+
+    results, failures = asyncio.run(scenario())
+    assert all(isinstance(result, OSError) for result in results)
+    assert failures == 2
+    assert len(loads) == 1 and loads[0].startswith("inference")
+
+
+def test_bots_fall_back_to_the_timeout_action_on_slow_inference():
+    class Stalled:
+        async def act(self, env, seat=None):
+            await asyncio.sleep(3600)
+
+    async def scenario():
+        manager = TableManager(turn_timeout=0.01, inference=Stalled())
+        table = manager.create(seed=0, bots=range(4))
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if table.step_count >= 2:
+                break
+        await manager.shutdown()
+        return table
+
+    table = asyncio.run(scenario())
+    assert table.step_count >= 2
+    assert table.timeouts >= 2
+
+
+def test_bot_seats_play_through_the_inference_server():
+    async def scenario():
+        server = InferenceServer(max_batch=8, max_wait_us=500)
+        manager = TableManager(turn_timeout=5, inference=server)
+        tables = [manager.create(seed=seed, bots=range(4)) for seed in range(3)]
+        for _ in range(200):
+            await asyncio.sleep(0)
+            if all(table.step_count >= 20 or table.game > 1 for table in tables):
+                break
+            await asyncio.sleep(0.001)
+        await manager.shutdown()
+        await server.stop()
+        return tables, server.metrics()
+
+    tables, metrics = asyncio.run(scenario())
+    assert all(table.timeouts == 0 for table in tables)
+    assert sum(table.step_count for table in tables) > 0
+    assert metrics['batches'] > 0 and metrics['failures'] == 0
+
+    with pytest.raises(ValueError):
+        Table("bad", bots=[0])
@@ -0,0 +1,104 @@
+import json
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from mahjong.core import instrument
+from mahjong.core.env import MahjongEnv
+from mahjong.core.rules import MahjongRules
+from mahjong.app.api.routers import metrics
+from mahjong.app.instrumentation import DB_QUERIES, REQUEST_SECONDS, _count_query, install
+
+STEP = 'mahjong.core.env:MahjongEnv.step'
+
+
+def series(name, **labels):
+    for entry in instrument.registry.snapshot()['histograms'] + instrument.registry.snapshot()['counters']:
+        if entry['name'] == name and all(entry['labels'].get(k) == v for k, v in labels.items()):
+            return entry
+    return None
+
+
+def play(env, steps):
+    env.reset(seed=0)
+    for _ in range(steps):
+        env.step(int(np.flatnonzero(env.action_mask)[0]))
+
+
+def test_hot_paths_are_untouched_until_enabled():
+    step = MahjongEnv.__dict__['step']
+    winning = MahjongRules.__dict__['is_winning_hand']
+    instrument.registry.reset()
+    try:
+        instrument.enable()
+        assert instrument.enabled() and MahjongEnv.__dict__['step'] is not step
+        play(MahjongEnv(), 30)
+        assert MahjongRules.is_winning_hand([0] * 14) is False
+        assert MahjongRules().is_winning_hand([0] * 14) is False
+    finally:
+        instrument.disable()
+    assert MahjongEnv.__dict__['step'] is step and MahjongRules.__dict__['is_winning_hand'] is winning
+    assert series(instrument.CALL_SECONDS, function='MahjongEnv.step')['count'] == 30
+    assert series(instrument.CALL_SECONDS, function='MahjongRules.is_winning_hand')['count'] == 2
+    assert series(instrument.CALL_SECONDS, function='MahjongEnv._update_action_mask')['count'] >= 30
+
+    # Disabled: nothing more is recorded
+    play(MahjongEnv(), 5)
+    assert series(instrument.CALL_SECONDS, function='MahjongEnv.step')['count'] == 30
+
+
+def test_slow_calls_keep_their_stack_and_sampled_profiles(tmp_path):
+    instrument.registry.reset()
+    try:
+        instrument.enable([STEP, 'mahjong.core.env:MahjongEnv._update_action_mask'], slow_ms=0, profile_every=2)
+        play(MahjongEnv(), 4)
+    finally:
+        instrument.disable()
+    slow = [sample for sample in instrument.registry.slow if sample['function'] == 'MahjongEnv.step']
+    assert len(slow) == 4
+    assert 'play' in ''.join(slow[0]['stack'])
+    # Every second call is profiled
+    assert ['profile' in sample for sample in slow] == [False, True, False, True]
+    assert 'function calls' in slow[1]['profile'] and 'env.py' in slow[1]['profile']
+
+    text = instrument.registry.prometheus()
+    assert 'mahjong_call_seconds_bucket{function="MahjongEnv.step",le="+Inf"} 4' in text
+    assert 'mahjong_slow_calls_total{function="MahjongEnv.step"} 4' in text
+    path = tmp_path / "metrics.json"
+    instrument.dump_json(str(path))
+    assert len(json.loads(path.read_text())['slow']) == len(instrument.registry.slow)
+
+
+def test_middleware_records_routes_and_query_counts():
+    app = FastAPI()
+    engine = create_async_engine("sqlite+aiosqlite://")
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+            await connection.execute(text("SELECT :id"), {"id": item_id})
+        return {"id": item_id}
+
+    app.include_router(metrics.exporter)
+    instrument.registry.reset()
+    try:
+        install(app, slow_ms=0, profile_every=0, dump="")
+        with TestClient(app) as client:
+            for item_id in (1, 2):
+                assert client.get(f"/items/{item_id}").json() == {"id": item_id}
+            assert client.get("/nowhere").status_code == 404
+            exported = client.get("/metrics")
+    finally:
+        instrument.disable()
+        event.remove(Engine, 'before_cursor_execute', _count_query)
+
+    assert series(REQUEST_SECONDS, route='/items/{item_id}', method='GET', status='200')['count'] == 2
+    assert series(DB_QUERIES, route='/items/{item_id}')['value'] == 4
+    assert series(REQUEST_SECONDS, route='unmatched', status='404')['count'] == 1
+    assert exported.headers['content-type'].startswith('text/plain')
+    assert 'mahjong_http_db_queries_total{method="GET",route="/items/{item_id}"} 4' in exported.text
@@ -0,0 +1,161 @@
+import asyncio
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from mahjong.app import cache as cache_module
+from mahjong.app.api.models.user import User
+from mahjong.app.auth.security import create_access_token
+from mahjong.app.cache import LRUCache, get_profile, set_profile
+from mahjong.app.game import GameResult, ResultBuffer, TableManager
+from mahjong.app import leaderboard
+
+
+@pytest.fixture
+def database(database, monkeypatch):
+    monkeypatch.setattr(cache_module, "cache", LRUCache())
+    with sqlite3.connect(database) as connection:
+        connection.executemany(
+            "INSERT INTO users (username, email, hashed_password, win_count, lose_count, total_score) "
+            "VALUES (?, ?, 'x', ?, 0, ?)",
+            [(name, f"{name}@example.com", wins, score)
+             for name, wins, score in [("ann", 1, 10.0), ("ben", 3, 30.0), ("cat", 2, 10.0),
+                                       ("dan", 1, 10.0), ("eve", 0, -5.0)]])
+    return database
+
+
+def _names(page):
+    return [entry["username"] for entry in page["entries"]]
+
+
+def test_result_buffer_batches_updates(database):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{database}")
+        session = async_sessionmaker(engine, expire_on_commit=False)
+        buffer = ResultBuffer(session, flush_interval=60, max_batch=3)
+        await set_profile(cache_module.cache, "eve", {"username": "eve"})
+
+        buffer.submit(GameResult({"ann": 10.0, "eve": -5.0, "dan": -5.0}, winner="ann"))
+        buffer.submit(GameResult({"ann": 0.0, "eve": 0.0}, draw=True))
+        await asyncio.sleep(0)
+        assert buffer.metrics()["pending"] == 2  # neither the interval nor the batch size was reached
+        buffer.submit(GameResult({"eve": 15.0, "ann": -7.5}, winner="eve"))
+        for _ in range(20):
+            if buffer.batches:
+                break
+            await asyncio.sleep(0.01)
+        assert buffer.metrics() == {"pending": 0, "flushed": 3, "batches": 1, "failures": 0, "dropped": 0}
+        assert await get_profile(cache_module.cache, "eve") is None
+
+        # A winner without a signed-in player still charges the others a loss
+        buffer.submit(GameResult({"ben": -10.0}))
+        await buffer.stop()
+        async with session() as db:
+            rows = (await db.execute(select(User.username, User.win_count, User.lose_count, User.total_score)
+                                     .order_by(User.username))).all()
+        await engine.dispose()
+        return rows, buffer.metrics()
+
+    rows, metrics = asyncio.run(scenario())
+    assert rows == [("ann", 2, 1, 12.5), ("ben", 3, 1, 20.0), ("cat", 2, 0, 10.0),
+                    ("dan", 1, 1, 5.0), ("eve", 1, 1, 5.0)]
+    assert metrics["batches"] == 2
+
+
+def test_result_buffer_drops_a_batch_after_max_retries():
+    class Failing:
+        async def __aenter__(self):
+            raise OSError("database is down")
+
+        async def __aexit__(self, *exc):
+            return False
+
+    async def scenario():
+        buffer = ResultBuffer(Failing, flush_interval=60, max_retries=2)
+        buffer.pending.append(GameResult({"ann": 10.0}, winner="ann"))
+        # The first write and two retries fail, then the result is given up
+        for _ in range(2):
+            assert await buffer.flush() == 0
+            assert len(buffer.pending) == 1
+        await buffer.flush()
+        return buffer.metrics()
+
+    assert asyncio.run(scenario()) == {"pending": 0, "flushed": 0, "batches": 0, "failures": 3, "dropped": 1}
+
+
+def test_keyset_pages_and_rank(client, database):
+    assert _names(client.get("/api/leaderboard").json()) == ["ben", "cat", "ann", "dan", "eve"]
+    first = client.get("/api/leaderboard", params={"limit": 2}).json()
+    assert _names(first) == ["ben", "cat"] and first["next"]
+    page = client.get("/api/leaderboard", params={"limit": 2, "after": first["next"]}).json()
+    # ann and dan tie on score and wins, so the older account goes first
+    assert _names(page) == ["ann", "dan"] and [entry["rank"] for entry in page["entries"]] == [3, 4]
+    last = client.get("/api/leaderboard", params={"limit": 2, "after": page["next"]}).json()
+    assert _names(last) == ["eve"] and last["entries"][0]["rank"] == 5 and last["next"] is None
+    assert client.get("/api/leaderboard", params={"limit": 0}).status_code == 422
+    assert client.get("/api/leaderboard", params={"after": "not-a-cursor"}).status_code == 400
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'dan'})}"}
+    me = client.get("/api/leaderboard/me", headers=headers).json()
+    assert me["rank"] == 4 and me["username"] == "dan"
+    assert client.get("/api/leaderboard/me").status_code == 401
+
+
+def test_top_pages_are_cached_until_invalidated(client, database, monkeypatch):
+    monkeypatch.setattr(leaderboard, "TOP_K", 3)
+    assert _names(client.get("/api/leaderboard", params={"limit": 3}).json()) == ["ben", "cat", "ann"]
+    with sqlite3.connect(database) as connection:
+        connection.execute("UPDATE users SET total_score = 100 WHERE username = 'eve'")
+    # The cached first page keeps the old order; the following pages read the table
+    first = client.get("/api/leaderboard", params={"limit": 3}).json()
+    assert _names(first) == ["ben", "cat", "ann"]
+    page = client.get("/api/leaderboard", params={"limit": 3, "after": first["next"]}).json()
+    assert _names(page) == ["dan"] and page["entries"][0]["rank"] == 5
+
+    asyncio.run(leaderboard.invalidate_leaderboard(cache_module.cache))
+    assert _names(client.get("/api/leaderboard", params={"limit": 3}).json()) == ["eve", "ben", "cat"]
+
+
+def test_queries_use_the_leaderboard_index(database):
+    engine = create_engine(f"sqlite:///{database}")
+    with engine.connect() as connection:
+        user = connection.execute(select(User).where(User.username == "ann")).one()
+        key = (user.total_score, user.win_count, user.id)
+        for query in (select(*leaderboard.COLUMNS).order_by(*leaderboard.ORDER).limit(10),
+                      select(*leaderboard.COLUMNS).where(leaderboard._after(key)).order_by(*leaderboard.ORDER).limit(10),
+                      select(User.id).where(User.total_score > user.total_score)):
+            compiled = query.compile(engine, compile_kwargs={"literal_binds": True})
+            plan = " ".join(row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}"))
+            assert "ix_users_leaderboard" in plan and "TEMP B-TREE" not in plan, plan
+    engine.dispose()
+
+
+def test_tables_submit_results_for_seated_players():
+    class Collector:
+        def __init__(self):
+            self.results = []
+
+        def submit(self, result):
+            self.results.append(result)
+
+    async def scenario():
+        collector = Collector()
+        manager = TableManager(turn_timeout=0, results=collector)
+        table = manager.create(seed=5)
+        table.sit(0, "ann")
+        table.sit(2, "cat")
+        while table.game < 2:
+            await asyncio.sleep(0)
+        await manager.shutdown()
+        return collector.results
+
+    results = asyncio.run(scenario())
+    assert len(results) == 1
+    result = results[0]
+    assert set(result.scores) == {"ann", "cat"}
+    if result.draw:
+        assert result.winner is None and set(result.scores.values()) == {0.0}
+    elif result.winner is not None:
+        assert result.scores[result.winner] > 0
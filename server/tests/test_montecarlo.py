@@ -0,0 +1,107 @@
+import numpy as np
+
+from mahjong.core.types import TileType, MahjongType
+from mahjong.core.env import MahjongEnv
+from mahjong.core.ruleset import get_ruleset
+from mahjong.ai.montecarlo import MonteCarloEvaluator, _playout_env, determinize, playout_values, sample_deals
+
+TSUMO = len(TileType) + 4
+
+
+def play(env, steps, rng):
+    for _ in range(steps):
+        _, _, terminated, truncated, info = env.step(int(rng.choice(np.flatnonzero(env.action_mask))))
+        assert not (terminated or truncated)
+
+
+def observations_equal(a, b):
+    for key, value in a.items():
+        np.testing.assert_array_equal(b[key], value, err_msg=key)
+
+
+def test_states_and_clones_replay_the_same_game():
+    env = MahjongEnv(mahjong_type=MahjongType.JAPAN)
+    env.reset(seed=6)
+    play(env, 20, np.random.default_rng(0))
+    state = env.get_state()
+    clone = env.clone()
+
+    actions = []
+    rng = np.random.default_rng(1)
+    for _ in range(30):
+        actions.append(int(rng.choice(np.flatnonzero(env.action_mask))))
+        expected = env.step(actions[-1])
+        observations_equal(expected[0], clone.step(actions[-1])[0])
+    final = env._get_observation()
+
+    env.set_state(state)
+    for action in actions:
+        env.step(action)
+    observations_equal(final, env._get_observation())
+    assert env.discard_lengths.tolist() == clone.discard_lengths.tolist()
+
+
+def test_determinize_keeps_what_the_seat_sees():
+    env = MahjongEnv()
+    env.reset(seed=2)
+    play(env, 25, np.random.default_rng(3))
+    seat = env.current_player
+    before = env.get_state().arrays()
+    determinize(env, seat, np.random.default_rng(4))
+
+    np.testing.assert_array_equal(env.hand_counts[seat], before['hand_counts'][seat])
+    np.testing.assert_array_equal(env.wall[:env.wall_pos], before['wall'][:env.wall_pos])
+    assert env.dora_indicators[0] == before['wall'][env.wall_end]
+    assert env.hand_counts.sum(axis=1).tolist() == before['hand_counts'].sum(axis=1).tolist()
+    assert not np.array_equal(env.hand_counts, before['hand_counts'])
+    # Every tile is still somewhere: in a hand, in the undrawn wall or discarded
+    total = env.hand_counts.sum(axis=0) + env.discard_counts
+    total += np.bincount(env.wall[env.wall_pos:], minlength=len(TileType)).astype(np.int8)
+    np.testing.assert_array_equal(total, get_ruleset(MahjongType.INTERNATIONAL).tile_counts)
+
+
+def test_evaluator_prefers_a_winning_tsumo():
+    env = MahjongEnv(mahjong_type=MahjongType.JAPAN)
+    env.reset(seed=3)
+    winning = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 9, 9, 27, 27]
+    env.hand_counts[0] = np.bincount(winning, minlength=len(TileType))
+    env.waiting_actions[4] = 1
+    env.claims.rebuild()
+    env._update_action_mask()
+
+    values = MonteCarloEvaluator(workers=0, seed=1).evaluate(env, determinizations=16)
+    assert set(values) == set(np.flatnonzero(env.action_mask).tolist())
+    assert values[TSUMO] == 15 == max(values.values())
+    assert values == MonteCarloEvaluator(workers=0, seed=1).evaluate(env, determinizations=16)
+
+
+def test_finished_playouts_stop_and_reset_reproducibly():
+    env = MahjongEnv()
+    env.reset(seed=4)
+    play(env, 12, np.random.default_rng(1))
+    state = env.get_state()
+    candidates = np.flatnonzero(env.action_mask)[:3].tolist()
+    deals = sample_deals(state, state.current_player, 4, np.random.default_rng(2))
+
+    walls = []
+    for _ in range(2):
+        values = playout_values(state, candidates, deals, np.random.default_rng(3))
+        batch = _playout_env(state.mahjong_type, 4, len(candidates) * len(deals), True)
+        # Every table was reset once when its playout ended and has not moved since
+        assert batch.wall_pos.tolist() == [4 * 13 + 1] * batch.num_envs
+        assert not batch.discard_lengths.any()
+        walls.append((values, batch.walls.copy()))
+    np.testing.assert_array_equal(walls[0][0], walls[1][0])
+    np.testing.assert_array_equal(walls[0][1], walls[1][1])
+
+
+def test_evaluator_process_pool_is_reproducible():
+    env = MahjongEnv()
+    env.reset(seed=8)
+    play(env, 10, np.random.default_rng(0))
+    results = []
+    for _ in range(2):
+        with MonteCarloEvaluator(workers=2, seed=5) as evaluator:
+            results.append(evaluator.evaluate(env, determinizations=8))
+    assert results[0] == results[1]
+    assert set(results[0]) == set(np.flatnonzero(env.action_mask).tolist())
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from mahjong.core.env import MahjongEnv
+from mahjong.core.record import ACCEPTED, TERMINATED, GameWriter, GameReader
+
+
+def play_games(env, num_games, seed, on_step=None):
+    rng = np.random.default_rng(seed)
+    obs, info = env.reset(seed=seed)
+    games = 0
+    while games < num_games:
+        action = int(rng.choice(np.flatnonzero(info['action_mask'])))
+        if rng.random() < 0.05:
+            action = int(rng.integers(env.action_space.n))
+        obs, reward, terminated, truncated, info = env.step(action)
+        if on_step is not None:
+            on_step(games, env)
+        if terminated or truncated:
+            games += 1
+            obs, info = env.reset()
+
+
+def snapshot(env):
+    obs = env._get_observation()
+    return {**{key: np.asarray(value).copy() for key, value in obs.items()},
+            'action_mask': env.action_masks(), 'hand_counts': env.hand_counts.copy(), 'wall_pos': env.wall_pos,
+            'seat_discards': env.seat_discards.copy(), 'discard_lengths': np.array(env.discard_lengths),
+            'discard_history': np.concatenate([row[:length] for row, length in zip(env.discard_history,
+                                                                                    env.discard_lengths)])}
+
+
+def test_round_trip_and_restore_any_turn(tmp_path):
+    path = str(tmp_path / "games.mjr")
+    states = []
+    with GameWriter(path, games_per_index=3) as writer:
+        env = MahjongEnv(recorder=writer)
+        play_games(env, 7, seed=1, on_step=lambda game, env: states.append((game, snapshot(env))))
+
+    with GameReader(path) as reader:
+        assert len(reader) == 7
+        assert reader[0].seed == 1 and reader[1].seed == -1
+        assert sum(len(game.steps) for game in reader) == len(states)
+
+        restored = MahjongEnv()
+        turns = {}
+        for game, state in states:
+            turns[game] = turns.get(game, 0) + 1
+            if turns[game] % 7 and turns[game] != len(reader[game].steps):
+                continue
+            reader.restore(restored, game, turns[game])
+            after = snapshot(restored)
+            for key in state:
+                np.testing.assert_array_equal(after[key], state[key], err_msg=key)
+
+
+def test_appending_and_recovering_an_unclosed_file(tmp_path):
+    path = str(tmp_path / "games.mjr")
+    with GameWriter(path) as writer:
+        play_games(MahjongEnv(recorder=writer), 2, seed=2)
+    with GameWriter(path) as writer:
+        play_games(MahjongEnv(recorder=writer), 3, seed=3)
+
+    crashed = GameWriter(path, games_per_index=2)
+    play_games(MahjongEnv(recorder=crashed), 3, seed=4)
+    crashed.flush()
+    with GameReader(path) as reader:
+        assert len(reader) == 8
+        assert [reader[i].seed for i in (0, 2, 5)] == [2, 3, 4]
+
+    with GameWriter(path) as writer:
+        play_games(MahjongEnv(recorder=writer), 1, seed=5)
+    with GameReader(path) as reader:
+        assert len(reader) == 9
+        assert reader[8].seed == 5
+
+
+def test_steps_keep_scored_rewards_and_outcomes(tmp_path):
+    path = str(tmp_path / "games.mjr")
+    with GameWriter(path) as writer:
+        writer.begin_game(np.zeros(136, dtype=np.int8), seed=7)
+        writer.add_step(0, 3, -1)
+        writer.add_step(0, 4, 0, accepted=True)
+        writer.add_step(1, 37, 32000, accepted=True)
+        with pytest.raises(ValueError):
+            writer.add_step(2, 4, 40001)
+        writer.add_step(3, 37, -96000, terminated=True, accepted=True)
+    with GameReader(path) as reader:
+        game = reader[0]
+        assert game.steps.itemsize == 4
+        assert game.rewards.tolist() == [-1, 0, 32000, -96000]
+        assert game.flags.tolist() == [0, ACCEPTED, ACCEPTED, ACCEPTED | TERMINATED]
+        assert game.players.tolist() == [0, 0, 1, 3] and game.actions.tolist() == [3, 4, 37, 37]
+
+
+def test_reader_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        GameReader(str(path))
@@ -0,0 +1,32 @@
+import numpy as np
+
+from mahjong.ai.buffers import TrajectoryBuffer, empty_batch
+from mahjong.ai.rollout import RolloutPool
+
+
+def test_trajectory_buffer_wraps_around():
+    buffer = TrajectoryBuffer(capacity=4)
+    try:
+        out = empty_batch(6)
+        for i in range(3):
+            assert buffer.put({'action': i, 'reward': i / 2})
+        assert buffer.take(out, 0, 2) == 2
+        for i in range(3, 6):
+            assert buffer.put({'action': i, 'reward': i / 2})
+        assert len(buffer) == 4
+        assert not buffer.put({'action': 9}, should_stop=lambda: True)
+        assert buffer.take(out, 2, 10) == 4
+        assert out['action'].tolist() == [0, 1, 2, 3, 4, 5]
+        assert out['reward'].tolist() == [0, 0.5, 1, 1.5, 2, 2.5]
+    finally:
+        buffer.close()
+
+
+def test_rollout_pool_collects_fixed_size_batches():
+    with RolloutPool(num_workers=2, envs_per_worker=2, capacity=256, seed=3) as pool:
+        for _ in range(3):
+            batch = pool.collect(300, timeout=30)
+            assert batch['action'].shape == (300,)
+            assert batch['hand'].shape == (300, 42)
+            assert batch['action_mask'][np.arange(300), batch['action']].all()
+            assert set(batch['env_id'].tolist()) <= {0, 1, 2, 3}
@@ -0,0 +1,137 @@
+import numpy as np
+import pytest
+
+from mahjong.core.types import TileType
+from mahjong.core.rules import MahjongRules
+from mahjong.core.decompose import is_complete_batch, is_complete_counts
+
+T = TileType
+
+
+def to_counts(hand):
+    counts = [0] * len(TileType)
+    for tile in hand:
+        counts[tile] += 1
+    return counts
+
+
+def reference_complete(counts, need_pair=True):
+    """Straightforward recursive oracle on count vectors"""
+    if need_pair:
+        for tile in range(34):
+            if counts[tile] >= 2:
+                counts[tile] -= 2
+                ok = reference_complete(counts, need_pair=False)
+                counts[tile] += 2
+                if ok:
+                    return True
+        return False
+    first = next((t for t in range(34) if counts[t]), None)
+    if first is None:
+        return True
+    if counts[first] >= 3:
+        counts[first] -= 3
+        ok = reference_complete(counts, need_pair=False)
+        counts[first] += 3
+        if ok:
+            return True
+    if first < 27 and first % 9 <= 6 and counts[first + 1] and counts[first + 2]:
+        for t in (first, first + 1, first + 2):
+            counts[t] -= 1
+        ok = reference_complete(counts, need_pair=False)
+        for t in (first, first + 1, first + 2):
+            counts[t] += 1
+        return ok
+    return False
+
+
+@pytest.mark.parametrize("hand, expected", [
+    ([T.MAN_1, T.MAN_2, T.MAN_3, T.MAN_4, T.MAN_5, T.MAN_6, T.MAN_7, T.MAN_8, T.MAN_9,
+      T.PIN_1, T.PIN_1, T.PIN_1, T.WIND_EAST, T.WIND_EAST], True),
+    ([T.MAN_1, T.MAN_1, T.MAN_1, T.MAN_2, T.MAN_3, T.MAN_4, T.MAN_5, T.MAN_6, T.MAN_7,
+      T.MAN_8, T.MAN_9, T.MAN_9, T.MAN_9, T.MAN_5], True),
+    ([T.MAN_8, T.MAN_9, T.PIN_1, T.SOU_2, T.SOU_2, T.SOU_2, T.DRAGON_RED, T.DRAGON_RED,
+      T.DRAGON_RED, T.WIND_NORTH, T.WIND_NORTH, T.WIND_NORTH, T.PIN_5, T.PIN_5], False),
+    # four pairs spread over four groups must not pass as a single pair
+    ([T.MAN_1, T.MAN_1, T.MAN_2, T.MAN_3, T.MAN_4, T.PIN_1, T.PIN_1, T.PIN_5, T.PIN_5,
+      T.PIN_5, T.SOU_1, T.SOU_1, T.WIND_EAST, T.WIND_EAST], False),
+    ([T.SPRING, T.SPRING, T.MAN_1, T.MAN_2, T.MAN_3, T.MAN_4, T.MAN_5, T.MAN_6, T.MAN_7,
+      T.MAN_8, T.MAN_9, T.PIN_1, T.PIN_1, T.PIN_1], False),
+    ([T.MAN_1, T.MAN_1], False),
+])
+def test_is_winning_hand(hand, expected):
+    assert MahjongRules.is_winning_hand(hand) is expected
+
+
+def test_is_winning_counts_accepts_hands_with_melds():
+    hand = [T.PIN_4, T.PIN_5, T.PIN_6, T.DRAGON_WHITE, T.DRAGON_WHITE]
+    assert MahjongRules.is_winning_counts(to_counts(hand))
+    assert not MahjongRules.is_winning_counts(to_counts(hand[:4]))
+
+
+def test_tables_match_reference_on_random_hands():
+    rng = np.random.default_rng(7)
+    wall = np.repeat(np.arange(34), 4)
+    hands = np.stack([rng.permutation(wall)[:14] for _ in range(3000)])
+    counts = np.zeros((len(hands), 34), dtype=np.int8)
+    np.add.at(counts, (np.arange(len(hands))[:, None], hands), 1)
+
+    batched = is_complete_batch(counts)
+    for row, hand in enumerate(hands.tolist()):
+        expected = reference_complete(counts[row].tolist())
+        assert MahjongRules.is_winning_hand([TileType(t) for t in hand]) is expected
+        assert is_complete_counts(counts[row]) is expected
+        assert bool(batched[row]) is expected
+
+
+@pytest.mark.parametrize("hand, expected_shanten, expected_waits", [
+    # 123m 456m 789m 111p + single 9s: tanki wait
+    ([T.MAN_1, T.MAN_2, T.MAN_3, T.MAN_4, T.MAN_5, T.MAN_6, T.MAN_7, T.MAN_8, T.MAN_9,
+      T.PIN_1, T.PIN_1, T.PIN_1, T.SOU_9], 0, {T.SOU_9}),
+    # 2345678m 9m 111p 99s: three-sided wait on 1m, 4m and 7m
+    ([T.MAN_2, T.MAN_3, T.MAN_4, T.MAN_5, T.MAN_6, T.MAN_7, T.MAN_8, T.MAN_9,
+      T.PIN_1, T.PIN_1, T.PIN_1, T.SOU_9, T.SOU_9], 0, {T.MAN_1, T.MAN_4, T.MAN_7}),
+    # seven pairs waiting on the single east wind
+    ([T.MAN_1, T.MAN_1, T.MAN_5, T.MAN_5, T.PIN_2, T.PIN_2, T.PIN_8, T.PIN_8,
+      T.SOU_3, T.SOU_3, T.DRAGON_RED, T.DRAGON_RED, T.WIND_EAST], 0, {T.WIND_EAST}),
+    # thirteen orphans, thirteen-sided wait
+    ([T.MAN_1, T.MAN_9, T.PIN_1, T.PIN_9, T.SOU_1, T.SOU_9, T.WIND_EAST, T.WIND_SOUTH,
+      T.WIND_WEST, T.WIND_NORTH, T.DRAGON_RED, T.DRAGON_GREEN, T.DRAGON_WHITE], 0,
+     {T.MAN_1, T.MAN_9, T.PIN_1, T.PIN_9, T.SOU_1, T.SOU_9, T.WIND_EAST, T.WIND_SOUTH,
+      T.WIND_WEST, T.WIND_NORTH, T.DRAGON_RED, T.DRAGON_GREEN, T.DRAGON_WHITE}),
+    # 147m 258p 369s 1234z: no partial sets, only seven pairs gets it down to 6
+    ([T.MAN_1, T.MAN_4, T.MAN_7, T.PIN_2, T.PIN_5, T.PIN_8, T.SOU_3, T.SOU_6, T.SOU_9,
+      T.WIND_EAST, T.WIND_SOUTH, T.WIND_WEST, T.WIND_NORTH], 6, set()),
+])
+def test_shanten_and_waits(hand, expected_shanten, expected_waits):
+    counts = to_counts(hand)
+    assert MahjongRules.shanten(counts) == expected_shanten
+    assert MahjongRules.waits(counts) == expected_waits
+
+
+def test_waits_match_completion_checks():
+    rng = np.random.default_rng(11)
+    wall = np.repeat(np.arange(34), 4)
+    for _ in range(300):
+        counts = np.bincount(rng.permutation(wall)[:13], minlength=len(TileType)).astype(np.int8)
+        expected = set()
+        for tile in range(34):
+            if counts[tile] < 4:
+                counts[tile] += 1
+                if is_complete_counts(counts):
+                    expected.add(tile)
+                counts[tile] -= 1
+        waits = MahjongRules.waits(counts, seven_pairs=False, thirteen_orphans=False)
+        assert waits == expected
+        if waits:
+            assert MahjongRules.shanten(counts, seven_pairs=False, thirteen_orphans=False) == 0
+        counts[int(rng.integers(34))] += 1
+        if counts.max() <= 4 and is_complete_counts(counts):
+            assert MahjongRules.shanten(counts) == -1
+
+
+def test_waits_need_a_single_pair():
+    # 123p, 55s and 22z already hold two pairs, so no man tile can complete the broken man group
+    counts = to_counts([T.MAN_1, T.MAN_3, T.MAN_5, T.MAN_7, T.MAN_9, T.MAN_9, T.PIN_1, T.PIN_2,
+                        T.PIN_3, T.SOU_5, T.SOU_5, T.WIND_SOUTH, T.WIND_SOUTH])
+    assert MahjongRules.waits(counts, seven_pairs=False, thirteen_orphans=False) == set()
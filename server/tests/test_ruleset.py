@@ -0,0 +1,109 @@
+import numpy as np
+
+from mahjong.core.types import ActionType, TileType, MahjongType
+from mahjong.core.env import MahjongEnv
+from mahjong.core.batch_env import BatchedMahjongEnv, claim_flags
+from mahjong.core.rules import MahjongRules
+from mahjong.core.wall import wall_tiles
+from mahjong.core import ruleset as ruleset_module
+from mahjong.core.ruleset import Ruleset, get_ruleset, register_ruleset
+
+from test_batch_env import pick_actions, assert_obs_equal
+
+T = TileType
+
+# 123m 456p 789s 777m 99p: complete, but spread over three suits
+THREE_SUITS = [T.MAN_1, T.MAN_2, T.MAN_3, T.PIN_4, T.PIN_5, T.PIN_6, T.SOU_7, T.SOU_8, T.SOU_9,
+               T.MAN_7, T.MAN_7, T.MAN_7, T.PIN_9, T.PIN_9]
+TWO_SUITS = [T.MAN_1, T.MAN_2, T.MAN_3, T.PIN_4, T.PIN_5, T.PIN_6, T.PIN_7, T.PIN_8, T.PIN_9,
+             T.MAN_7, T.MAN_7, T.MAN_7, T.PIN_9, T.PIN_9]
+SEVEN_PAIRS = [T.MAN_1, T.MAN_1, T.MAN_4, T.MAN_4, T.MAN_9, T.MAN_9, T.PIN_2, T.PIN_2,
+               T.PIN_5, T.PIN_5, T.PIN_7, T.PIN_7, T.PIN_8, T.PIN_8]
+THIRTEEN_ORPHANS = [T.MAN_1, T.MAN_9, T.PIN_1, T.PIN_9, T.SOU_1, T.SOU_9, T.WIND_EAST, T.WIND_SOUTH,
+                    T.WIND_WEST, T.WIND_NORTH, T.DRAGON_WHITE, T.DRAGON_GREEN, T.DRAGON_RED, T.DRAGON_RED]
+
+
+def counts_of(hand):
+    return np.bincount(hand, minlength=len(TileType))
+
+
+def test_wall_follows_the_tile_set_of_each_variant():
+    assert len(wall_tiles(MahjongType.INTERNATIONAL)) == 144
+    assert len(wall_tiles(MahjongType.JAPAN)) == 136
+    sichuan = wall_tiles(MahjongType.SICHUAN)
+    assert len(sichuan) == 108
+    assert max(sichuan) < T.WIND_EAST
+
+
+def test_winning_shapes_per_variant():
+    for mahjong_type in MahjongType:
+        sichuan = mahjong_type == MahjongType.SICHUAN
+        assert MahjongRules.is_winning_hand(THREE_SUITS, mahjong_type) is not sichuan
+        assert MahjongRules.is_winning_hand(TWO_SUITS, mahjong_type)
+        assert MahjongRules.is_winning_hand(SEVEN_PAIRS, mahjong_type)
+        assert MahjongRules.is_winning_hand(THIRTEEN_ORPHANS, mahjong_type) is not sichuan
+
+
+def test_winning_batch_matches_scalar():
+    rng = np.random.default_rng(3)
+    hands = [counts_of(hand) for hand in (THREE_SUITS, TWO_SUITS, SEVEN_PAIRS, THIRTEEN_ORPHANS)]
+    for _ in range(2000):
+        hands.append(counts_of(rng.permutation(np.repeat(np.arange(27), 4))[:14]))
+    counts = np.stack(hands).astype(np.int8)
+    for mahjong_type in MahjongType:
+        ruleset = get_ruleset(mahjong_type)
+        batched = ruleset.is_winning_batch(counts)
+        assert batched.tolist() == [ruleset.is_winning(row) for row in counts]
+
+
+def test_sichuan_never_offers_chi():
+    ruleset = get_ruleset(MahjongType.SICHUAN)
+    assert ruleset.claim_mask.tolist() == [False, True, True, True]
+    hands = np.stack([counts_of([T.MAN_2, T.MAN_3, T.MAN_5, T.MAN_5])] * 2)
+    flags = claim_flags(hands, np.array([T.MAN_1, T.MAN_5]), ruleset)
+    assert not flags[:, 0].any() and flags[1, 1]
+
+    env = MahjongEnv(mahjong_type=MahjongType.SICHUAN)
+    env.reset(seed=0)
+    for _ in range(300):
+        _, _, terminated, truncated, _ = env.step(int(np.flatnonzero(env.hand_counts[env.current_player])[0]))
+        assert not env.claim_options[:, 0].any()
+        assert not env.waiting_actions[0]
+        if terminated or truncated:
+            env.reset()
+
+
+def test_register_ruleset_replaces_a_variant():
+    original = ruleset_module.RULESETS[MahjongType.JAPAN]
+    try:
+        register_ruleset(Ruleset(MahjongType.JAPAN, claims=frozenset({ActionType.RON}), seven_pairs=False,
+                                 rewards=(1, 1, 2, 20, 30)))
+        ruleset = get_ruleset(MahjongType.JAPAN)
+        assert ruleset.claim_mask.tolist() == [False, False, False, True]
+        assert not MahjongRules.is_winning_hand(SEVEN_PAIRS, MahjongType.JAPAN)
+        assert MahjongEnv(mahjong_type=MahjongType.JAPAN).ruleset.rewards[4] == 30
+    finally:
+        register_ruleset(original)
+    assert get_ruleset(MahjongType.JAPAN).claim_mask.all()
+
+
+def test_batched_env_matches_scalar_env_for_sichuan():
+    num_envs, seed = 4, 77
+    batched = BatchedMahjongEnv(num_envs, mahjong_type=MahjongType.SICHUAN)
+    envs = [MahjongEnv(mahjong_type=MahjongType.SICHUAN) for _ in range(num_envs)]
+    obs, info = batched.reset(seed=seed)
+    for i, env in enumerate(envs):
+        scalar_obs, scalar_info = env.reset(seed=seed + i)
+        assert_obs_equal(obs, scalar_obs, i)
+
+    rng = np.random.default_rng(1)
+    for _ in range(300):
+        actions = pick_actions(rng, obs, info['action_mask'])
+        obs, rewards, terminated, truncated, info = batched.step(actions)
+        for i, env in enumerate(envs):
+            scalar_obs, reward, term, trunc, scalar_info = env.step(int(actions[i]))
+            assert rewards[i] == reward
+            if term or trunc:
+                scalar_obs, scalar_info = env.reset()
+            assert_obs_equal(obs, scalar_obs, i)
+            np.testing.assert_array_equal(info['action_mask'][i], scalar_info['action_mask'])
@@ -0,0 +1,155 @@
+import numpy as np
+import pytest
+
+from mahjong.core.types import ActionType, TileType, MahjongType
+from mahjong.core.env import MahjongEnv
+from mahjong.core.batch_env import BatchedMahjongEnv
+from mahjong.core.scoring import MCR, RIICHI, Meld, NO_SCORE, decompositions, score_batch, score_hand
+
+T = TileType
+
+# 234m 567m 345p 234s 66p
+PINFU = [T.MAN_2, T.MAN_3, T.MAN_4, T.MAN_5, T.MAN_6, T.MAN_7, T.PIN_3, T.PIN_4, T.PIN_5,
+         T.SOU_2, T.SOU_3, T.SOU_4, T.PIN_6, T.PIN_6]
+THIRTEEN_ORPHANS = [T.MAN_1, T.MAN_9, T.PIN_1, T.PIN_9, T.SOU_1, T.SOU_9, T.WIND_EAST, T.WIND_SOUTH,
+                    T.WIND_WEST, T.WIND_NORTH, T.DRAGON_WHITE, T.DRAGON_GREEN, T.DRAGON_RED, T.DRAGON_RED]
+SEVEN_PAIRS = [T.MAN_1, T.MAN_1, T.MAN_4, T.MAN_4, T.MAN_9, T.MAN_9, T.PIN_2, T.PIN_2,
+               T.PIN_5, T.PIN_5, T.PIN_7, T.PIN_7, T.PIN_8, T.PIN_8]
+NINE_GATES = [T.MAN_1, T.MAN_1, T.MAN_1, T.MAN_2, T.MAN_3, T.MAN_4, T.MAN_5, T.MAN_5, T.MAN_6, T.MAN_7,
+              T.MAN_8, T.MAN_9, T.MAN_9, T.MAN_9]
+
+
+def counts_of(hand):
+    return np.bincount(hand, minlength=len(TileType))
+
+
+def names(score):
+    return {name for name, _ in score.items}
+
+
+def random_winning_hands(rng, count):
+    hands = []
+    while len(hands) < count:
+        tiles = []
+        for _ in range(4):
+            if rng.random() < 0.6:
+                start = int(rng.integers(0, 3)) * 9 + int(rng.integers(0, 7))
+                tiles += [start, start + 1, start + 2]
+            else:
+                tiles += [int(rng.integers(0, 34))] * 3
+        tiles += [int(rng.integers(0, 34))] * 2
+        counts = counts_of(tiles)
+        if counts.max() <= 4:
+            hands.append((counts, int(rng.choice(tiles))))
+    return hands
+
+
+def test_decompositions_enumerate_every_split():
+    # 111222333m reads as three triplets or as three identical sequences
+    hand = [T.MAN_1] * 3 + [T.MAN_2] * 3 + [T.MAN_3] * 3 + [T.PIN_5, T.PIN_6, T.PIN_7, T.SOU_9, T.SOU_9]
+    found = decompositions(counts_of(hand))
+    assert {(d.sequences, d.triplets) for d in found} == {
+        ((T.PIN_5,), (T.MAN_1, T.MAN_2, T.MAN_3)),
+        ((T.MAN_1, T.MAN_1, T.MAN_1, T.PIN_5), ()),
+    }
+    assert all(d.pair == T.SOU_9 for d in found)
+    assert decompositions(counts_of(THIRTEEN_ORPHANS)) == ()
+
+
+@pytest.mark.parametrize("hand, win_tile, kwargs, points, han, fu, yaku", [
+    (PINFU, T.MAN_2, {}, 2000, 2, 30, {'Tanyao', 'Pinfu'}),
+    (PINFU, T.MAN_2, {'tsumo': True, 'riichi': True, 'dora': [T.PIN_5]}, 12000, 6, 20,
+     {'Riichi', 'Menzen Tsumo', 'Tanyao', 'Pinfu', 'Dora'}),
+    (PINFU, T.MAN_2, {'dealer': True}, 2900, 2, 30, {'Tanyao', 'Pinfu'}),
+    # Waiting on the middle of 345p is a closed wait: no pinfu, +2 fu
+    (PINFU, T.PIN_4, {}, 1300, 1, 40, {'Tanyao'}),
+    (SEVEN_PAIRS, T.PIN_8, {}, 1600, 2, 25, {'Chiitoitsu'}),
+    (THIRTEEN_ORPHANS, T.DRAGON_RED, {}, 32000, 13, 0, {'Kokushi Musou'}),
+    (THIRTEEN_ORPHANS, T.DRAGON_RED, {'dealer': True}, 48000, 13, 0, {'Kokushi Musou'}),
+    (NINE_GATES, T.MAN_5, {'tsumo': True}, 32000, 13, 0, {'Chuuren Poutou'}),
+])
+def test_riichi_scores(hand, win_tile, kwargs, points, han, fu, yaku):
+    score = score_hand(counts_of(hand), win_tile, RIICHI, **kwargs)
+    assert (score.points, score.value, score.fu) == (points, han, fu)
+    assert names(score) == yaku
+
+
+def test_riichi_hand_without_yaku_scores_nothing():
+    # 123m 789m 456p 789s 11s, open: nothing counts
+    hand = [T.MAN_1, T.MAN_2, T.MAN_3, T.PIN_4, T.PIN_5, T.PIN_6, T.SOU_1, T.SOU_1]
+    melds = (Meld(ActionType.CHI, T.MAN_7), Meld(ActionType.CHI, T.SOU_7))
+    assert score_hand(counts_of(hand), T.PIN_4, RIICHI, melds=melds) == NO_SCORE
+    assert score_hand(counts_of(PINFU[:-1] + [T.WIND_EAST]), T.MAN_2, RIICHI) == NO_SCORE
+
+
+def test_riichi_ron_on_a_triplet_opens_it():
+    # 222m 555p 888s triplets, 345s, 77p: a ron on the 8s makes only two concealed triplets
+    hand = [T.MAN_2] * 3 + [T.PIN_5] * 3 + [T.SOU_8] * 3 + [T.SOU_3, T.SOU_4, T.SOU_5, T.PIN_7, T.PIN_7]
+    assert 'Sanankou' in names(score_hand(counts_of(hand), T.SOU_8, RIICHI, tsumo=True))
+    assert 'Sanankou' in names(score_hand(counts_of(hand), T.SOU_4, RIICHI))
+    assert 'Sanankou' not in names(score_hand(counts_of(hand), T.SOU_8, RIICHI))
+
+
+def test_riichi_open_hand_loses_a_han_on_flushes():
+    # 123p 456p 999p + pon of east + 55p
+    hand = [T.PIN_1, T.PIN_2, T.PIN_3, T.PIN_4, T.PIN_5, T.PIN_6, T.PIN_9, T.PIN_9, T.PIN_9, T.PIN_5, T.PIN_5]
+    score = score_hand(counts_of(hand), T.PIN_1, RIICHI, melds=[Meld(ActionType.PON, T.WIND_EAST)])
+    assert dict(score.items) == {'Honitsu': 2, 'Yakuhai (seat wind)': 1, 'Yakuhai (round wind)': 1}
+
+
+def test_mcr_fans_and_exclusions():
+    score = score_hand(counts_of(SEVEN_PAIRS), T.PIN_8, MCR)
+    assert dict(score.items) == {'Seven Pairs': 24, 'No Honors': 1}
+    assert score.points == 25
+
+    score = score_hand(counts_of(THIRTEEN_ORPHANS), T.DRAGON_RED, MCR, tsumo=True)
+    assert dict(score.items) == {'Thirteen Orphans': 88, 'Self-Drawn': 1}
+
+    # 123m 456m 789m 123m 55m: full flush and pure straight, which absorb no honors and short straight
+    hand = [T.MAN_1, T.MAN_2, T.MAN_3] * 2 + [T.MAN_4, T.MAN_5, T.MAN_6, T.MAN_7, T.MAN_8, T.MAN_9, T.MAN_5, T.MAN_5]
+    items = dict(score_hand(counts_of(hand), T.MAN_7, MCR).items)
+    assert items['Full Flush'] == 24 and items['Pure Straight'] == 16 and items['Pure Double Chow'] == 1
+    assert 'No Honors' not in items and 'Short Straight' not in items and 'Half Flush' not in items
+
+    assert score_hand(counts_of(PINFU), T.MAN_2, MCR, flowers=2).items[-1] == ('Flower Tiles', 2)
+
+
+def test_batch_matches_scalar_and_memoizes():
+    rng = np.random.default_rng(5)
+    hands = random_winning_hands(rng, 500)
+    counts = np.stack([c for c, _ in hands])
+    win_tiles = np.array([w for _, w in hands])
+    tsumo = rng.random(len(hands)) < 0.5
+    dora = rng.integers(0, 34, size=len(hands))
+    for system in (MCR, RIICHI):
+        points = score_batch(counts, win_tiles, system, tsumo=tsumo, dora=dora)
+        expected = [score_hand(c, w, system, tsumo=t, dora=[d]).points
+                    for c, w, t, d in zip(counts, win_tiles, tsumo, dora)]
+        assert points.tolist() == expected
+    assert score_hand(counts[0], win_tiles[0], RIICHI) is score_hand(counts[0].tolist(), win_tiles[0], RIICHI)
+    assert score_batch(np.stack([counts_of(PINFU[:-1] + [T.WIND_EAST])]), [T.MAN_2], RIICHI).tolist() == [0]
+
+
+def test_envs_reward_wins_with_scored_points():
+    scalar = MahjongEnv(mahjong_type=MahjongType.JAPAN, score_wins=True)
+    scalar.reset(seed=3)
+    scalar.hand_counts[0] = counts_of(PINFU)
+    scalar.hand_sizes[0] = 14
+    scalar.wall[scalar.wall_pos - 1] = T.MAN_2
+    scalar.waiting_actions[4] = 1
+    tsumo = len(TileType) + 4
+    _, reward, terminated, _, _ = scalar.step(tsumo)
+    expected = score_hand(counts_of(PINFU), T.MAN_2, RIICHI, tsumo=True, dealer=True,
+                          dora=[scalar.dora_indicators[0]]).points
+    assert terminated and reward == expected >= 1500
+
+    batched = BatchedMahjongEnv(2, mahjong_type=MahjongType.JAPAN, score_wins=True)
+    batched.reset(seed=3)
+    batched.hands[0, 0] = counts_of(PINFU)
+    batched.walls[0, batched.wall_pos[0] - 1] = T.MAN_2
+    batched.waiting_actions[0, 4] = 1
+    indicator = batched.walls[0, batched.wall_end]
+    _, rewards, terminated, _, _ = batched.step(np.array([tsumo, tsumo]))
+    assert terminated.tolist() == [True, False]
+    assert rewards[0] == score_hand(counts_of(PINFU), T.MAN_2, RIICHI, tsumo=True, dealer=True,
+                                    dora=[indicator]).points
@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+LAZY_CORE = """
+import sys
+import mahjong.core as core
+from mahjong.core.types import TileType
+assert 'gymnasium' not in sys.modules and 'mahjong.core.rules' not in sys.modules
+assert 'MahjongEnv' in dir(core)
+assert core.MahjongRules.__module__ == 'mahjong.core.rules' and 'gymnasium' not in sys.modules
+from mahjong.core import MahjongEnv, instrument
+assert 'gymnasium' in sys.modules and instrument.enabled() is False
+try:
+    core.Missing
+except AttributeError:
+    pass
+else:
+    raise AssertionError
+"""
+
+APP_STARTUP = """
+import os
+import sqlite3
+from fastapi.testclient import TestClient
+from mahjong.app.main import app
+path = os.environ['DB_PATH']
+assert not os.path.exists(os.path.dirname(path))
+with TestClient(app):
+    pass
+tables = sqlite3.connect(path).execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()
+print(tables)
+"""
+
+
+def run(code, **env):
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                               env=dict(os.environ, **env), timeout=120)
+    assert completed.returncode == 0, completed.stderr
+    return completed.stdout
+
+
+def test_core_attributes_are_imported_on_first_access():
+    run(LAZY_CORE)
+
+
+@pytest.mark.parametrize("create_schema,expected", [("1", "[('users',)]"), ("0", "[]")])
+def test_schema_is_created_by_the_lifespan_not_the_import(tmp_path, create_schema, expected):
+    path = str(tmp_path / "data" / "app.db")
+    output = run(APP_STARTUP, DB_PATH=path, MAHJONG_DATABASE_URL=f"sqlite+aiosqlite:///{path}",
+                 MAHJONG_CREATE_SCHEMA=create_schema)
+    assert output.strip() == expected
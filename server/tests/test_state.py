@@ -0,0 +1,92 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from mahjong.core.env import MahjongEnv
+from mahjong.core.state import GameState
+from mahjong.core.types import MahjongType
+
+
+def advance(env, steps, seed=0):
+    rng = np.random.default_rng(seed)
+    for _ in range(steps):
+        env.step(int(rng.choice(np.flatnonzero(env.action_mask))))
+
+
+def trajectory(env, steps):
+    rewards = []
+    for _ in range(steps):
+        _, reward, terminated, truncated, info = env.step(int(np.flatnonzero(env.action_mask)[-1]))
+        rewards.append((reward, env.hand_counts.tobytes(), info['action_mask'].tobytes()))
+        if terminated or truncated:
+            break
+    return rewards
+
+
+@pytest.mark.parametrize("mahjong_type", list(MahjongType))
+def test_set_state_resumes_the_same_game(mahjong_type):
+    env = MahjongEnv(mahjong_type=mahjong_type)
+    env.reset(seed=4)
+    advance(env, 25)
+    state = env.get_state()
+    expected = trajectory(env, 40)
+
+    # Back on the same env, and on a fresh env through bytes and pickle
+    env.set_state(state)
+    assert trajectory(env, 40) == expected
+    other = MahjongEnv(mahjong_type=mahjong_type, zero_copy=True)
+    other.reset(seed=9)
+    seat, hand_view = other.current_player, other._get_observation()['hand']
+    other.set_state(pickle.loads(pickle.dumps(GameState.from_bytes(bytes(state)))))
+    # Zero-copy views handed out before still show the live state
+    assert np.array_equal(hand_view, state.arrays()['hand_counts'][seat])
+    assert trajectory(other, 40) == expected
+
+
+def test_states_of_the_same_position_are_equal():
+    env = MahjongEnv()
+    env.reset(seed=2)
+    advance(env, 12)
+    first = env.get_state()
+    clone = env.clone()
+    assert clone.get_state() == first and hash(clone.get_state()) == hash(first)
+    # Cached ron bitsets are not part of the position
+    for player in range(env.num_players):
+        env.claims.ron_bits(player)
+    assert env.get_state() == first and len({env.get_state(), first}) == 1
+
+    advance(clone, 1)
+    assert clone.get_state() != first
+    arrays = first.arrays()
+    assert not arrays['hand_counts'].flags.writeable
+    assert np.array_equal(arrays['wall'], env.wall) and first.wall_pos == env.wall_pos
+
+
+def test_scalars_live_in_the_state_buffer():
+    env = MahjongEnv()
+    env.reset(seed=5)
+    env.step(int(np.flatnonzero(env.action_mask)[0]))
+    state = env.get_state()
+    assert (state.wall_pos, state.current_player, state.discarder) == (env.wall_pos, env.current_player, env.discarder)
+    assert (state.last_action, state.last_discard, state.dora_revealed) == (env.last_action, env.last_discard, 1)
+    assert state.hand_sizes.tolist() == env.hand_counts.sum(axis=1).tolist()
+    assert state.discard_lengths.tolist() == env.discard_lengths.tolist()
+
+    # Scalars written on the env land in its buffer without a get_state in between
+    env.wall_pos += 1
+    env.discarder = None
+    assert GameState.from_bytes(env._state.tobytes()).wall_pos == state.wall_pos + 1
+    assert GameState.from_bytes(env._state.tobytes()).discarder is None
+
+
+def test_bad_buffers_are_rejected():
+    state = MahjongEnv().get_state()
+    with pytest.raises(ValueError):
+        GameState.from_bytes(bytes(state)[:-1])
+    with pytest.raises(ValueError):
+        GameState.from_bytes(b'\x02\x00' + bytes(state)[2:])
+    with pytest.raises(ValueError):
+        MahjongEnv(mahjong_type=MahjongType.JAPAN).set_state(state)
+    with pytest.raises(ValueError):
+        MahjongEnv(num_players=3).set_state(state)
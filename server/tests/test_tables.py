@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from mahjong.app.game import SeatTaken, TableManager, apply_diff
+
+
+def _login(client, username):
+    user = {"username": username, "email": f"{username}@example.com", "password": "secret"}
+    assert client.post("/api/users/register", json=user).status_code == 200
+    return client.post("/api/users/login", json={"username": username, "password": "secret"}).json()["access_token"]
+
+
+def test_bots_and_timeouts_keep_client_views_in_sync():
+    async def scenario():
+        manager = TableManager(turn_timeout=0.005)
+        table = manager.create(seed=3)
+        subscriptions = [table.subscribe(seat) for seat in range(4)]
+        views = [await subscription.get() for subscription in subscriptions]
+
+        # Seat 0 plays its own turns; everyone else is left to time out
+        for _ in range(120):
+            message = await subscriptions[0].get()
+            if message['type'] == 'state':
+                views[0] = message
+            else:
+                apply_diff(views[0], message)
+            if views[0].get('legal') and views[0]['turn'] == 0:
+                table.submit(0, views[0]['legal'][0])
+
+        for seat in (1, 2, 3):
+            while not subscriptions[seat].queue.empty():
+                message = subscriptions[seat].queue.get_nowait()
+                views[seat] = message if message['type'] == 'state' else apply_diff(views[seat], message)
+        for seat in range(4):
+            expected = table.state(seat)
+            for key in ('hand', 'discards', 'turn', 'left', 'waiting'):
+                assert views[seat][key] == expected[key], (seat, key)
+        assert table.timeouts > 0
+        await manager.shutdown()
+        assert not table.running
+
+    asyncio.run(scenario())
+
+
+def test_websocket_pushes_state_then_diffs(client):
+    headers = {"Authorization": f"Bearer {_login(client, 'alice')}"}
+    assert client.post("/api/tables", json={"seed": 1}).status_code == 401
+    table = client.post("/api/tables", json={"seed": 1}, headers=headers).json()
+    assert client.get("/api/tables").status_code == 401
+    listed = client.get("/api/tables", headers=headers).json()
+    assert any(t["id"] == table["id"] and t["creator"] == "alice" for t in listed)
+    assert table["bots"] == []
+    assert client.post("/api/tables", json={"bots": [4]}, headers=headers).status_code == 422
+
+    with client.websocket_connect(f"/api/tables/{table['id']}/ws?seat=0") as ws:
+        state = ws.receive_json()
+        assert state["type"] == "state" and state["seat"] == 0 and sum(state["hand"]) == 14
+        ws.send_text("not json")
+        assert ws.receive_json() == {"type": "error", "detail": "expected {\"action\": <int>}"}
+        ws.send_json({"action": -1})
+        assert ws.receive_json() == {"type": "error", "detail": "illegal action -1"}
+        ws.send_json({"action": state["legal"][0]})
+        diff = ws.receive_json()
+        assert diff["type"] == "diff" and diff["n"] == 1 and diff["a"] == state["legal"][0]
+        assert dict(diff["hand"])[state["legal"][0]] == state["hand"][state["legal"][0]] - 1
+    assert client.delete(f"/api/tables/{table['id']}").status_code == 401
+    bob = {"Authorization": f"Bearer {_login(client, 'bob')}"}
+    assert client.delete(f"/api/tables/{table['id']}", headers=bob).status_code == 403
+    assert client.delete(f"/api/tables/{table['id']}", headers=headers).status_code == 200
+    assert client.delete(f"/api/tables/{table['id']}", headers=headers).status_code == 404
+
+
+def test_signed_in_seats_only_take_their_holder(client):
+    alice, bob = _login(client, "alice"), _login(client, "bob")
+    table = client.post("/api/tables", json={"seed": 1}, headers={"Authorization": f"Bearer {alice}"}).json()
+    url = f"/api/tables/{table['id']}/ws"
+
+    with client.websocket_connect(f"{url}?seat=0&token={alice}") as ws:
+        assert ws.receive_json()["type"] == "state"
+        # Neither an anonymous client, another user nor a second seat for alice
+        for query in ("seat=0", f"seat=0&token={bob}", f"seat=1&token={alice}"):
+            with pytest.raises(WebSocketDisconnect):
+                with client.websocket_connect(f"{url}?{query}") as other:
+                    other.receive_json()
+    # Alice keeps the seat after disconnecting and may come back to it
+    with client.websocket_connect(f"{url}?seat=0&token={alice}") as ws:
+        assert ws.receive_json()["type"] == "state"
+    with client.websocket_connect(f"{url}?seat=1&token={bob}") as ws:
+        assert ws.receive_json()["seat"] == 1
+    client.delete(f"/api/tables/{table['id']}", headers={"Authorization": f"Bearer {alice}"})
+
+
+def test_sit_rejects_taken_seats_and_second_seats():
+    async def scenario():
+        manager = TableManager(turn_timeout=5)
+        table = manager.create(seed=1)
+        table.sit(0, "ann")
+        table.sit(0, "ann")
+        with pytest.raises(SeatTaken):
+            table.sit(0, "ben")
+        with pytest.raises(SeatTaken):
+            table.sit(1, "ann")
+        assert table.players == {0: "ann"}
+        assert table.may_act(0, "ann") and not table.may_act(0, None) and table.may_act(1, None)
+        await manager.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_checkpoint_resumes_on_another_table():
+    async def scenario():
+        manager = TableManager(turn_timeout=5)
+        table = manager.create(seed=5)
+        for _ in range(6):
+            table.submit(table.env.current_player, int(table.env.action_mask.argmax()))
+            await asyncio.sleep(0.01)
+        assert table.step_count == 6
+        data = table.checkpoint()
+        state = table.state(0)
+        await manager.shutdown()
+
+        other = manager.create(seed=6)
+        subscription = other.subscribe(0)
+        await subscription.get()
+        await other.stop()
+        other.resume(data)
+        resumed = await subscription.get()
+        return state, resumed, other.checkpoint() == data
+
+    state, resumed, same = asyncio.run(scenario())
+    assert same and resumed['type'] == 'state'
+    for key in ('hand', 'discards', 'turn', 'left', 'dora'):
+        assert resumed[key] == state[key], key
@@ -0,0 +1,54 @@
+import numpy as np
+
+from mahjong.core.types import TileType
+from mahjong.core.rules import MahjongRules
+from mahjong.core import tiles
+
+T = TileType
+
+
+def test_attribute_tables_match_enum_arithmetic():
+    for tile in TileType:
+        value = tile.value
+        if tile < T.WIND_EAST:
+            assert (tiles.SUIT[value], tiles.RANK[value]) == (value // 9, value % 9)
+        assert tiles.IS_HONOR[value] == (T.WIND_EAST <= tile <= T.DRAGON_WHITE)
+        assert tiles.IS_FLOWER[value] == (tile >= T.SPRING)
+        assert tiles.IS_SUIT[value] == (tile < T.WIND_EAST)
+        assert tiles.SUIT_OF[value] == tiles.SUIT[value] and tiles.RANK_OF[value] == tiles.RANK[value]
+    assert not tiles.SUIT.flags.writeable and not tiles.CHI_NEEDS.flags.writeable
+
+
+def test_chi_tables_list_every_sequence_through_a_tile():
+    for tile in range(tiles.NUM_TILE_TYPES):
+        sequences = [tuple(s) for s, valid in zip(tiles.CHI_SEQUENCES[tile], tiles.CHI_VALID[tile]) if valid]
+        expected = [(start, start + 1, start + 2) for start in range(27)
+                    if start % 9 <= 6 and start <= tile <= start + 2]
+        assert sorted(sequences) == sorted(expected)
+        assert sorted(tuple(sorted(pair)) for pair in tiles.CHI_PAIRS[tile]) == \
+            sorted(tuple(t for t in s if t != tile) for s in expected)
+    assert tiles.CHI_TARGETS[T.MAN_1] == (T.MAN_1, T.MAN_2, T.MAN_3)
+    assert tiles.CHI_TARGETS[T.PIN_5] == tuple(range(T.PIN_3, T.PIN_7 + 1))
+    assert tiles.CHI_TARGETS[T.WIND_EAST] == ()
+
+
+def test_dora_successor_wraps_within_each_group():
+    assert tiles.DORA_NEXT[T.MAN_1] == T.MAN_2
+    assert tiles.DORA_NEXT[T.SOU_9] == T.SOU_1
+    assert tiles.DORA_NEXT[T.WIND_NORTH] == T.WIND_EAST
+    assert tiles.DORA_NEXT[T.DRAGON_WHITE] == T.DRAGON_GREEN
+    assert tiles.DORA_NEXT[T.DRAGON_RED] == T.DRAGON_WHITE
+    assert tiles.DORA_NEXT[T.PLUM] == T.PLUM
+
+
+def test_chi_checks_agree_for_lists_and_counts():
+    rng = np.random.default_rng(0)
+    rules = MahjongRules()
+    for _ in range(2000):
+        hand = [TileType(int(t)) for t in rng.integers(0, 42, size=13)]
+        counts = np.bincount(hand, minlength=42)
+        target = int(rng.integers(0, 42))
+        assert rules.is_valid_chi(hand, TileType(target)) == rules.is_valid_chi_counts(counts, target)
+    assert rules.is_valid_chi([T.MAN_2, T.MAN_3], T.MAN_1)
+    assert not rules.is_valid_chi([T.MAN_8, T.MAN_9], T.PIN_1)
+    assert not rules.is_valid_chi([T.WIND_SOUTH, T.WIND_WEST], T.WIND_EAST)
@@ -0,0 +1,146 @@
+import asyncio
+import json
+
+import pytest
+
+from mahjong.app.main import app
+from mahjong.app.api.models.user import User
+from mahjong.app.config.database import get_db
+from mahjong.app.auth.hashing import PasswordHasher, HasherBusy, get_password_hasher
+from mahjong.app.auth.security import get_password_hash
+
+
+def test_register_login_and_me(client):
+    user = {"username": "alice", "email": "alice@example.com", "password": "secret"}
+    created = client.post("/api/users/register", json=user)
+    assert created.status_code == 200
+    assert client.post("/api/users/register", json=user).status_code == 400
+
+    assert client.post("/api/users/login", json={"username": "alice", "password": "wrong"}).status_code == 401
+    token = client.post("/api/users/login", json={"username": "alice", "password": "secret"}).json()["access_token"]
+    me = client.get("/api/users/me", headers={"Authorization": f"Bearer {token}"})
+    assert me.status_code == 200 and me.json()["username"] == "alice"
+
+    user_id = created.json()["id"]
+    assert client.get(f"/api/users/users/{user_id}").json()["email"] == "alice@example.com"
+    assert client.get("/api/users/users/999").status_code == 404
+
+
+def test_registration_racing_a_duplicate_answers_400(client):
+    class RacingHasher:
+        """Registers the same username while the request is hashing"""
+
+        async def hash(self, password):
+            async for db in app.dependency_overrides[get_db]():
+                db.add(User(username="carol", email="first@example.com", hashed_password="x"))
+                await db.commit()
+            return get_password_hash(password)
+
+    app.dependency_overrides[get_password_hasher] = RacingHasher
+    try:
+        response = client.post("/api/users/register",
+                               json={"username": "carol", "email": "second@example.com", "password": "secret"})
+    finally:
+        app.dependency_overrides.pop(get_password_hasher)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Username already registered"
+
+
+def test_full_hashing_queue_answers_503(client):
+    user = {"username": "bob", "email": "bob@example.com", "password": "secret"}
+    assert client.post("/api/users/register", json=user).status_code == 200
+    app.dependency_overrides[get_password_hasher] = lambda: PasswordHasher(max_workers=1, max_pending=0)
+    try:
+        response = client.post("/api/users/login", json={"username": "bob", "password": "secret"})
+    finally:
+        app.dependency_overrides.pop(get_password_hasher)
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_hasher_bounds_pending_work_and_reports_metrics():
+    hashed = get_password_hash("secret")
+
+    async def scenario():
+        hasher = PasswordHasher(max_workers=1, max_pending=2)
+        running = [asyncio.create_task(hasher.verify("secret", hashed)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(HasherBusy):
+            await hasher.verify("secret", hashed)
+        assert await asyncio.gather(*running) == [True, True]
+        metrics = hasher.metrics()
+        hasher.shutdown()
+        return metrics
+
+    metrics = asyncio.run(scenario())
+    assert metrics["completed"] == 2 and metrics["rejected"] == 1
+    assert metrics["max_queue_depth"] == 2 and metrics["queue_depth"] == 0
+    assert metrics["hash_ms_p50"] > 0
+
+
+def test_cancelled_callers_do_not_free_their_pending_slot():
+    hashed = get_password_hash("secret")
+
+    async def scenario():
+        hasher = PasswordHasher(max_workers=1, max_pending=2)
+        running = [asyncio.create_task(hasher.verify("secret", hashed)) for _ in range(2)]
+        await asyncio.sleep(0)
+        running[0].cancel()
+        await asyncio.sleep(0)
+        # The first verification is still on the worker and the second still queued behind it
+        assert hasher.pending == 2
+        with pytest.raises(HasherBusy):
+            await hasher.verify("secret", hashed)
+        assert await running[1]
+        for _ in range(100):
+            if not hasher.pending:
+                break
+            await asyncio.sleep(0.01)
+        hasher.shutdown()
+        return hasher.pending
+
+    assert asyncio.run(scenario()) == 0
+
+
+def _seed_users(client, count):
+    # Registration goes through bcrypt; insert directly instead
+    async def insert():
+        async for db in app.dependency_overrides[get_db]():
+            db.add_all([User(username=f"user{i:03d}", email=f"user{i:03d}@example.com", hashed_password="x")
+                        for i in range(count)])
+            await db.commit()
+
+    client.portal.call(insert)
+
+
+def test_batch_lookup_uses_ids_and_usernames(client):
+    _seed_users(client, 10)
+    response = client.post("/api/users/users/batch", json={"ids": [3, 1, 999], "usernames": ["user005", "nobody"]})
+    assert [user["username"] for user in response.json()] == ["user000", "user002", "user005"]
+    assert client.post("/api/users/users/batch", json={}).json() == []
+    assert client.post("/api/users/users/batch", json={"ids": list(range(501))}).status_code == 422
+
+
+@pytest.mark.parametrize("order", ["id", "created_at"])
+def test_keyset_pages_cover_every_user_once(client, order):
+    _seed_users(client, 25)
+    seen, after = [], None
+    while True:
+        params = {"limit": 10, "order": order, **({"after": after} if after else {})}
+        page = client.get("/api/users/users", params=params).json()
+        seen += [user["id"] for user in page["users"]]
+        after = page["next"]
+        if after is None:
+            break
+    assert seen == list(range(1, 26))
+    assert client.get("/api/users/users", params={"after": "nonsense", "order": order}).status_code == 400
+
+
+def test_ndjson_export_streams_from_cursor(client):
+    _seed_users(client, 5)
+    after = client.get("/api/users/users", params={"limit": 2}).json()["next"]
+    response = client.get("/api/users/users", params={"format": "ndjson", "after": after})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [user["username"] for user in lines] == ["user002", "user003", "user004"]
+    assert "hashed_password" not in lines[0]
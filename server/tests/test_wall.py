@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from mahjong.core.types import MahjongType
+from mahjong.core.env import MahjongEnv
+from mahjong.core.wall import wall_from_seed, encode_wall, decode_wall, wall_tiles
+
+
+def play(env, obs, info, steps=60):
+    trace = []
+    for _ in range(steps):
+        action = int(np.flatnonzero(info['action_mask'])[0])
+        obs, reward, terminated, truncated, info = env.step(action)
+        trace.append((action, reward, obs['hand'].tobytes(), obs['discards'].tobytes()))
+        if terminated or truncated:
+            break
+    return trace
+
+
+@pytest.mark.parametrize("mahjong_type", [MahjongType.INTERNATIONAL, MahjongType.JAPAN])
+def test_seed_and_ruleset_determine_the_wall(mahjong_type):
+    env = MahjongEnv(mahjong_type=mahjong_type)
+    env.reset(seed=11)
+    np.testing.assert_array_equal(env.wall, wall_from_seed(11, mahjong_type))
+    assert len(env.wall_bytes()) == len(wall_tiles(mahjong_type))
+    first = env.wall.copy()
+    env.reset(seed=12)
+    assert not np.array_equal(env.wall, first)
+
+
+def test_replaying_the_encoded_wall_replays_the_game():
+    env = MahjongEnv()
+    obs, info = env.reset(seed=4)
+    data = env.wall_bytes()
+    assert len(data) == 144
+    expected = play(env, obs, info)
+
+    replay = MahjongEnv()
+    obs, info = replay.reset(seed=99, options={'wall': data})
+    assert play(replay, obs, info) == expected
+
+
+def test_decode_rejects_foreign_walls():
+    data = encode_wall(wall_from_seed(0))
+    np.testing.assert_array_equal(decode_wall(data), wall_from_seed(0))
+    with pytest.raises(ValueError):
+        decode_wall(data, MahjongType.JAPAN)
+    with pytest.raises(ValueError):
+        decode_wall(data[:-1] + data[:1])